@@ -0,0 +1,59 @@
+"""
+Measure the throughput of AD graph construction, which is dominated by the
+allocation and deallocation of AD variables and edges.
+
+Usage: python benchmarks/ad_alloc.py [llvm|cuda] [--ops N] [--reps N]
+"""
+
+import argparse
+import time
+
+import drjit as dr
+
+
+def build(Float, ops):
+    x = dr.arange(Float, 16)
+    dr.enable_grad(x)
+    y = x
+    for _ in range(ops):
+        y = dr.fma(y, 0.5, x) * y
+    return y
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('backend', nargs='?', default='llvm',
+                        choices=['llvm', 'cuda'])
+    parser.add_argument('--ops', type=int, default=100000,
+                        help='Number of operations per AD graph')
+    parser.add_argument('--reps', type=int, default=5,
+                        help='Number of graphs to build')
+    args = parser.parse_args()
+
+    if args.backend == 'llvm':
+        from drjit.llvm.ad import Float
+    else:
+        from drjit.cuda.ad import Float
+
+    # Warm up
+    build(Float, args.ops)
+
+    for i in range(args.reps):
+        dr.detail.ad_alloc_stats(reset=True)
+        start = time.perf_counter()
+        y = build(Float, args.ops)
+        built = time.perf_counter()
+        del y
+        end = time.perf_counter()
+
+        stats = dr.detail.ad_alloc_stats()
+        n = stats['variables_allocated'] + stats['edges_allocated']
+        print(f'run {i}: {stats["variables_allocated"]} variables, '
+              f'{stats["edges_allocated"]} edges (peak: '
+              f'{stats["variables_peak"]}/{stats["edges_peak"]}), '
+              f'build {n / (built - start) / 1e6:.2f} M allocs/s, '
+              f'free {n / (end - built) / 1e6:.2f} M/s')
+
+
+if __name__ == '__main__':
+    main()
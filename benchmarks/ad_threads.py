@@ -0,0 +1,98 @@
+"""
+Measure how the construction and traversal of independent AD graphs scales
+with the number of Python threads.
+
+The AD graph state is split into shards, which lets threads that build
+and differentiate separate graphs proceed without contending for a single
+lock. Graph construction and traversal are timed separately. Scaling
+requires a free-threaded build of Python, since the GIL otherwise
+serializes the threads.
+
+Usage: python benchmarks/ad_threads.py [llvm|cuda] [--ops N] [--reps N]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import drjit as dr
+
+
+def build(Float, ops):
+    x = dr.arange(Float, 16)
+    dr.enable_grad(x)
+    y = x
+    for _ in range(ops):
+        y = dr.fma(y, 0.5, x) * y
+    return x, y
+
+
+def run(Float, n_threads, ops, reps):
+    """Return the time spent building and traversing graphs"""
+    barrier = threading.Barrier(n_threads + 1)
+    times = [[0.0, 0.0] for _ in range(n_threads)]
+
+    def worker(i):
+        barrier.wait()
+        for _ in range(reps):
+            t0 = time.perf_counter()
+            x, y = build(Float, ops)
+            t1 = time.perf_counter()
+            dr.backward_from(y)
+            t2 = time.perf_counter()
+            times[i][0] += t1 - t0
+            times[i][1] += t2 - t1
+
+    threads = [threading.Thread(target=worker, args=(i,))
+               for i in range(n_threads)]
+    for th in threads:
+        th.start()
+
+    barrier.wait()
+    for th in threads:
+        th.join()
+
+    # Threads run concurrently, report the average time per thread
+    return (sum(t[0] for t in times) / n_threads,
+            sum(t[1] for t in times) / n_threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('backend', nargs='?', default='llvm',
+                        choices=['llvm', 'cuda'])
+    parser.add_argument('--ops', type=int, default=1000,
+                        help='Number of operations per AD graph')
+    parser.add_argument('--reps', type=int, default=20,
+                        help='Number of graphs built by each thread')
+    args = parser.parse_args()
+
+    if args.backend == 'llvm':
+        from drjit.llvm.ad import Float
+    else:
+        from drjit.cuda.ad import Float
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'Python {sys.version.split()[0]}, GIL {"enabled" if gil else "disabled"}')
+
+    # Warm up
+    run(Float, 1, args.ops, 1)
+
+    base = None
+    n = 1
+    while n <= (os.cpu_count() or 1):
+        t_build, t_traverse = run(Float, n, args.ops, args.reps)
+        rates = (n * args.reps * args.ops / t_build,
+                 n * args.reps * args.ops / t_traverse)
+        base = base or rates
+        print(f'{n:3} thread(s): build {rates[0] / 1e6:8.3f} M ops/s '
+              f'(speedup {rates[0] / base[0]:5.2f}x), '
+              f'traverse {rates[1] / 1e6:8.3f} M ops/s '
+              f'(speedup {rates[1] / base[1]:5.2f}x)')
+        n *= 2
+
+
+if __name__ == '__main__':
+    main()
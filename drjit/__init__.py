@@ -29,6 +29,13 @@ del sys
 
 from .ast import syntax, hint
 from .interop import wrap
+from ._sort import sort, argsort, sort_by_key, unique, run_length_encode, \
+                   histogram, bincount
+from ._reduce import segment_reduce, segment_sum, reduce_by_key
+from ._distr import DiscreteDistribution, ContinuousDistribution, Distribution2D
+from ._kernel_cache import KernelCache, kernel_cache, dump_manifest
+from ._linalg import lu, solve, inverse, cholesky, eigh
+from ._checkpoint import checkpoint, checkpoint_loop
 import warnings as _warnings
 
 
@@ -345,12 +352,6 @@ def transpose(arg, /):
     return arg.T
 
 
-def inverse(arg, /):
-    _warnings.warn("inverse(x) is deprecated, please use rcp(x)",
-                   DeprecationWarning, stacklevel=2)
-    return rcp(arg)
-
-
 def wrap_ad(*args, **kwargs):
     _warnings.warn("@wrap_ad is deprecated, please use @wrap",
                    DeprecationWarning, stacklevel=2)
@@ -1826,16 +1827,16 @@ def upsample(t, shape=None, scale_factor=None):
         return type(t)(gather(type(t.array), t.array, index), tuple(shape))
 
 
-def binary_search(start, end, pred):
+def binary_search(start, end, pred, mode: Optional[str] = None):
     '''
     Perform a binary search over a range given a predicate ``pred``, which
     monotonically decreases over this range (i.e. max one ``True`` -> ``False``
     transition).
 
-    Given a (scalar) ``start`` and ``end`` index of a range, this function
-    evaluates a predicate ``floor(log2(end-start) + 1)`` times with index
-    values on the interval [start, end] (inclusive) to find the first index
-    that no longer satisfies it. Note that the template parameter ``Index`` is
+    Given a ``start`` and ``end`` index of a range, this function evaluates a
+    predicate at most ``floor(log2(end-start) + 1)`` times with index values
+    on the interval [start, end) to find the first index that no longer
+    satisfies it. Note that the template parameter ``Index`` is
     automatically inferred from the supplied predicate. Specifically, the
     predicate takes an index array as input argument. When ``pred`` is ``False``
     for all entries, the function returns ``start``, and when it is ``True`` for
@@ -1857,26 +1858,145 @@ def binary_search(start, end, pred):
             lambda index: dr.gather(dtype, data, index) < threshold
         )
 
+    The ``start`` and ``end`` arguments can be Python integers or Dr.Jit
+    index arrays. The latter enables searching a different range in each
+    thread, e.g., a separate row of a table.
+
+    When the predicate returns a JIT-compiled mask, the search is compiled into
+    a single :py:func:`drjit.while_loop`, whose size does not depend on the
+    length of the range. Otherwise, the iterations are unrolled in Python.
+
     Args:
-        start (int): Starting index for the search range
-        end (int): Ending index for the search range
+        start (int | ArrayBase): Starting index for the search range
+        end (int | ArrayBase): Ending index for the search range
         pred (function): The predicate function to be evaluated
+        mode (str | None): Optional compilation mode of the loop, see
+          :py:func:`drjit.while_loop` for details.
 
     Returns:
         Index array resulting from the binary search
     '''
-    assert isinstance(start, int) and isinstance(end, int)
+    if isinstance(start, int) and isinstance(end, int):
+        if start >= end:
+            return start
 
-    iterations = log2i(end - start) + 1 if start < end else 0
+        # Determine the index type from the predicate
+        cond = pred(start)
+        if not is_jit_v(cond):
+            iterations = log2i(end - start) + 1
 
-    for _ in range(iterations):
+            for _ in range(iterations):
+                middle = (start + end) >> 1
+
+                cond = pred(middle)
+                start = select(cond, minimum(middle + 1, end), start)
+                end = select(cond, end, middle)
+
+            return start
+
+        Index = uint32_array_t(type(cond))
+        width_ = width(cond)
+    else:
+        # The predicate may broadcast the search range (e.g., when searching
+        # a single sequence for many values)
+        Index = type(start) if is_array_v(start) else type(end)
+        width_ = width(start, end, pred(start))
+
+    start = zeros(Index, width_) + start
+    end = zeros(Index, width_) + end
+
+    def body(start, end):
         middle = (start + end) >> 1
+        cond = detach(pred(middle))
+        return select(cond, middle + 1, start), select(cond, end, middle)
+
+    return while_loop(
+        state=(start, end),
+        cond=lambda start, end: start < end,
+        body=body,
+        labels=('start', 'end'),
+        label='drjit.binary_search()',
+        mode=mode
+    )[0]
+
+
+def searchsorted(sorted_sequence, value, side: str = 'left'):
+    '''
+    Find the positions at which elements should be inserted into a sorted
+    sequence to maintain its order.
+
+    This function follows the conventions of :py:func:`numpy.searchsorted`.
+    With ``side="left"``, it returns the index of the first entry of
+    ``sorted_sequence`` that is greater than or equal to the corresponding
+    element of ``value``. With ``side="right"``, it returns the index of the
+    first entry that is strictly greater.
+
+    When ``sorted_sequence`` is a tensor with more than one dimension, each
+    slice along the last axis is searched separately. In this case, ``value``
+    must be a tensor whose leading dimensions match. For example, a sequence
+    of shape ``(N, M)`` storing ``N`` cumulative distribution functions can be
+    searched using values of shape ``(N, K)``. Otherwise, ``value`` can be an
+    arbitrary flat array or tensor.
 
-        cond = pred(middle)
-        start = select(cond, minimum(middle + 1, end), start)
-        end = select(cond, end, middle)
+    The search is implemented using :py:func:`drjit.binary_search`, which
+    compiles to a single loop regardless of the length of the sequence.
 
-    return start
+    Args:
+        sorted_sequence (ArrayBase): A 1D dynamic array or tensor whose slices
+          along the last axis are sorted in increasing order.
+
+        value (ArrayBase): The values to search for.
+
+        side (str): Must equal ``"left"`` or ``"right"``.
+
+    Returns:
+        ArrayBase: An unsigned 32-bit integer array or tensor with the same
+        shape as ``value`` storing positions within each slice.
+    '''
+    if side != 'left' and side != 'right':
+        raise RuntimeError('searchsorted(): \'side\' must equal "left" or "right"!')
+
+    Seq = type(sorted_sequence)
+    if is_tensor_v(Seq):
+        seq_shape = sorted_sequence.shape
+        seq = sorted_sequence.array
+    else:
+        seq_shape = (len(sorted_sequence),)
+        seq = sorted_sequence
+
+    Array = type(seq)
+    Index = uint32_array_t(Array)
+
+    if is_tensor_v(value):
+        shape = value.shape
+        value_flat = value.array
+    else:
+        shape = None
+        value_flat = value
+
+    value_flat = Array(value_flat)
+    n = seq_shape[-1] if len(seq_shape) > 0 else 1
+    offset = 0
+
+    if len(seq_shape) > 1:
+        if shape is None or shape[:-1] != seq_shape[:-1]:
+            raise RuntimeError('searchsorted(): the leading dimensions of '
+                               '\'value\' and \'sorted_sequence\' must match!')
+        # Row of the sorted sequence associated with each value
+        row = arange(Index, width(value_flat)) // shape[-1]
+        offset = row * n
+
+    if side == 'left':
+        pred = lambda i: gather(Array, seq, i) < value_flat
+    else:
+        pred = lambda i: gather(Array, seq, i) <= value_flat
+
+    result = binary_search(Index(offset), Index(offset) + n, pred) - offset
+
+    if shape is not None:
+        return uint32_array_t(type(value))(result, shape)
+    else:
+        return result
 
 
 def assert_true(
@@ -0,0 +1,296 @@
+import drjit as dr
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class CheckpointOp(dr.CustomOp):
+    '''
+    Custom operation that evaluates a function without recording an AD graph
+    and re-runs it with derivative tracking when gradients are propagated.
+    '''
+    def eval(self, fn, *args, **kwargs):
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        return fn(*args, **kwargs)
+
+    def _replay(self) -> Tuple[Tuple, Dict, Any]:
+        '''Re-run the function with fresh differentiable copies of the inputs'''
+        args, kwargs = dr.detach(self.args), dr.detach(self.kwargs)
+        dr.enable_grad(args, kwargs)
+        return args, kwargs, self.fn(*args, **kwargs)
+
+    def forward(self):
+        args, kwargs, out = self._replay()
+        dr.set_grad(args, self.grad_in('args'))
+        dr.set_grad(kwargs, self.grad_in('kwargs'))
+        dr.enqueue(dr.ADMode.Forward, args, kwargs)
+        dr.traverse(dr.ADMode.Forward)
+        self.set_grad_out(dr.grad(out))
+
+    def backward(self):
+        args, kwargs, out = self._replay()
+        dr.set_grad(out, self.grad_out())
+        dr.enqueue(dr.ADMode.Backward, out)
+        dr.traverse(dr.ADMode.Backward)
+        self.set_grad_in('args', dr.grad(args))
+        self.set_grad_in('kwargs', dr.grad(kwargs))
+
+    def name(self):
+        return "checkpoint"
+
+
+def checkpoint(fn: Callable[..., T], *args, **kwargs) -> T:
+    '''
+    Evaluate ``fn(*args, **kwargs)`` while trading memory for recomputation
+    during automatic differentiation.
+
+    Differentiating a long computation normally keeps the AD graph of every
+    intermediate step alive until the gradient is propagated. This function
+    instead evaluates ``fn`` without tracking derivatives and only stores its
+    inputs. When gradients are later propagated through the result (in forward
+    or reverse mode), it runs ``fn`` a second time with derivative tracking and
+    differentiates the recorded computation. This technique is also known as
+    *gradient checkpointing* or *rematerialization*.
+
+    Derivatives only propagate to the positional and keyword arguments, which
+    may be Dr.Jit arrays or :ref:`PyTrees <pytrees>`. Differentiable variables
+    that ``fn`` accesses in other ways (e.g., through a closure or an object
+    attribute) should be passed as arguments, otherwise their gradients are
+    lost. The function should furthermore be deterministic, since the
+    recomputation must reproduce the original result.
+
+    When none of the arguments have gradients enabled, this function simply
+    returns ``fn(*args, **kwargs)``.
+
+    .. code-block:: python
+
+       def step(x, params):
+           ... # costly differentiable computation
+
+       y = dr.checkpoint(step, x, params)
+
+    See :py:func:`drjit.checkpoint_loop()` for a variant that applies this
+    technique to long-running loops.
+
+    Args:
+        fn (Callable): The function to be evaluated.
+
+        *args (tuple): Positional arguments passed to ``fn``.
+
+        **kwargs (dict): Keyword arguments passed to ``fn``.
+
+    Returns:
+        object: The return value of ``fn(*args, **kwargs)``.
+    '''
+    if not dr.grad_enabled(args, kwargs):
+        return fn(*args, **kwargs)
+
+    return dr.custom(CheckpointOp, fn, *args, **kwargs)
+
+
+def _loop_segment(cond: Callable, body: Callable, count: int,
+                  options: Dict[str, Any], *state) -> Tuple:
+    '''Run up to ``count`` iterations of an evaluated loop'''
+    active = cond(*state)
+    UInt32 = dr.uint32_array_t(type(active))
+    limit = dr.opaque(UInt32, count)
+
+    return dr.while_loop(
+        state=(dr.zeros(UInt32, dr.width(active)), *state),
+        cond=lambda i, *s: (i < limit) & cond(*s),
+        body=lambda i, *s: (i + 1, *body(*s)),
+        **_loop_options(options)
+    )[1:]
+
+
+def checkpoint_loop(
+    state: Tuple[Any, ...],
+    cond: Callable[..., Any],
+    body: Callable[..., Tuple[Any, ...]],
+    interval: Optional[int] = None,
+    **kwargs
+) -> Tuple[Any, ...]:
+    '''
+    Run an evaluated loop with gradient checkpointing.
+
+    This function has the same semantics as :py:func:`drjit.while_loop()` in
+    evaluated mode. Reverse-mode differentiation of such a loop normally
+    requires the AD graph of all :math:`n` iterations. This function instead
+    splits the loop into segments that are evaluated via
+    :py:func:`drjit.checkpoint()`, which only stores the loop state at the
+    beginning of each segment. During differentiation, it re-runs the
+    iterations of one segment at a time.
+
+    By default, the :math:`i`-th segment consists of :math:`i` iterations.
+    The number of stored loop states and the length of the longest segment
+    then both grow as :math:`\\mathcal{O}(\\sqrt{n})` without knowing the
+    iteration count in advance, which bounds the memory footprint at the cost
+    of evaluating each iteration twice. Alternatively, specify ``interval``
+    to use segments with a fixed number of iterations.
+
+    As with :py:func:`drjit.checkpoint()`, derivatives only propagate to the
+    loop state. Differentiable parameters accessed by ``cond`` or ``body``
+    should be passed as (unmodified) loop state variables.
+
+    Args:
+        state (tuple): A tuple containing the initial values of the loop's state
+          variables.
+
+        cond (Callable): A function that will be invoked with ``*state``. It
+          must return a boolean-typed Dr.Jit array representing the loop
+          condition.
+
+        body (Callable): A function that will be invoked with ``*state``. It
+          must return a new tuple of state variables.
+
+        interval (Optional[int]): The number of iterations per checkpointed
+          segment. If not specified, the segment length grows linearly.
+
+        **kwargs (dict): Further keyword arguments (e.g., ``labels``,
+          ``label``, or ``compress``) that are forwarded to
+          :py:func:`drjit.while_loop()`.
+
+    Returns:
+        tuple: The final state of the loop variables.
+    '''
+    if interval is not None and interval < 1:
+        raise RuntimeError("drjit.checkpoint_loop(): 'interval' must be positive!")
+
+    state = tuple(state)
+    kwargs['mode'] = 'evaluated'
+
+    if not dr.grad_enabled(state):
+        return dr.while_loop(state=state, cond=cond, body=body, **kwargs)
+
+    segment = 1
+    while True:
+        active = cond(*state)
+        if not dr.is_array_v(active):
+            raise TypeError("drjit.checkpoint_loop(): the loop condition must "
+                            "be a Dr.Jit array!")
+        if not dr.any(active):
+            break
+
+        count = interval if interval is not None else segment
+        state = checkpoint(_loop_segment, cond, body, count, kwargs, *state)
+        segment += 1
+
+    return state
+
+
+class ReversibleLoopOp(dr.CustomOp):
+    '''
+    Custom operation that differentiates an evaluated loop by walking it
+    backwards using a user-provided inverse of the loop body. It only stores
+    the initial and final loop state along with per-lane iteration counts.
+    '''
+    def eval(self, state, cond, body, reverse_body, options):
+        self.cond, self.body, self.reverse_body = cond, body, reverse_body
+        self.options, self.state_in = options, state
+
+        active = cond(*state)
+        UInt32 = dr.uint32_array_t(type(active))
+
+        with dr.suspend_grad():
+            it, *state = dr.while_loop(
+                state=(dr.zeros(UInt32, dr.width(active)), *state),
+                cond=lambda it, *s: cond(*s),
+                body=lambda it, *s: (it + 1, *body(*s)),
+                **_loop_options(options)
+            )
+
+        self.it, self.state_out = it, tuple(state)
+        return self.state_out
+
+    def _step(self, state: Tuple) -> Tuple[Tuple, Tuple]:
+        '''Run the loop body while tracking derivatives with respect to ``state``'''
+        state = dr.detach(state)
+        dr.enable_grad(state)
+        with dr.suspend_grad():
+            with dr.resume_grad(state):
+                out = self.body(*state)
+        return state, out
+
+    def forward(self):
+        def body(state, grad):
+            state, out = self._step(state)
+            dr.set_grad(state, grad)
+            dr.enqueue(dr.ADMode.Forward, state)
+            dr.traverse(dr.ADMode.Forward)
+            return dr.detach(out), dr.grad(out)
+
+        cond = self.cond
+        _, grad = dr.while_loop(
+            state=(self.state_in, self.grad_in('state')),
+            cond=lambda s, g: cond(*s),
+            body=body,
+            **_loop_options(self.options, ' [ad, fwd]')
+        )
+        self.set_grad_out(grad)
+
+    def backward(self):
+        reverse_body = self.reverse_body
+
+        def body(it, state, grad):
+            prev = reverse_body(*state)
+            prev_ad, out = self._step(prev)
+            dr.set_grad(out, grad)
+            dr.enqueue(dr.ADMode.Backward, out)
+            dr.traverse(dr.ADMode.Backward)
+            return it - 1, tuple(prev), dr.grad(prev_ad)
+
+        _, _, grad = dr.while_loop(
+            state=(self.it, self.state_out, self.grad_out()),
+            cond=lambda it, s, g: it > 0,
+            body=body,
+            **_loop_options(self.options, ' [ad, bwd]')
+        )
+        self.set_grad_in('state', grad)
+
+    def name(self):
+        return "reversible loop"
+
+
+def _loop_options(options: Dict[str, Any], suffix: Optional[str] = None) -> Dict[str, Any]:
+    '''
+    Adapt the keyword arguments of a reversible loop to one of the loops run
+    by ``ReversibleLoopOp`` (or of a checkpointed loop to the segments run by
+    ``_loop_segment()``). The primal loop (``suffix=None``) has an extra
+    iteration counter. Derivative loops have a different state layout, hence
+    they don't receive labels and instead append ``suffix`` to the loop name.
+    '''
+    options = dict(options)
+    labels = options.pop('labels', ())
+    if suffix is None:
+        if labels:
+            options['labels'] = ('it', *labels)
+    elif options.get('label') is not None:
+        options['label'] += suffix
+    return options
+
+
+def reversible_loop(
+    state: Tuple[Any, ...],
+    cond: Callable[..., Any],
+    body: Callable[..., Tuple[Any, ...]],
+    reverse_body: Callable[..., Tuple[Any, ...]],
+    **kwargs
+) -> Tuple[Any, ...]:
+    '''
+    Implementation of :py:func:`drjit.while_loop()` when the ``reverse_body``
+    parameter is specified.
+    '''
+    mode = kwargs.pop('mode', None)
+    if mode not in (None, 'evaluated'):
+        raise RuntimeError("drjit.while_loop(): the 'reverse_body' parameter "
+                           "requires an evaluated loop!")
+    kwargs['mode'] = 'evaluated'
+    state = tuple(state)
+
+    active = cond(*state)
+    if not dr.is_jit_v(active) or not dr.grad_enabled(state):
+        if not dr.is_jit_v(active):
+            kwargs.pop('mode')
+        return dr.while_loop(state=state, cond=cond, body=body, **kwargs)
+
+    return dr.custom(ReversibleLoopOp, state, cond, body, reverse_body, kwargs)
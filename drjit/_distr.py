@@ -0,0 +1,332 @@
+import drjit as dr
+import sys
+from typing import Generic, Tuple, TypeVar, Any
+
+ArrayT = TypeVar("ArrayT", bound=dr.ArrayBase)
+
+
+def _check_array(value: Any, name: str, what: str) -> None:
+    tp = type(value)
+    if not dr.is_jit_v(tp) or not dr.is_float_v(tp) or \
+       dr.depth_v(tp) != 1 or dr.is_tensor_v(tp):
+        raise TypeError(f"drjit.{name}(): '{what}' must be a flat "
+                        "JIT-compiled floating point array!")
+
+
+class DiscreteDistribution(Generic[ArrayT]):
+    '''
+    Discrete 1D probability distribution for sampling and evaluating the
+    probability mass function (PMF) of ``n`` outcomes.
+
+    The constructor takes an unnormalized PMF, whose cumulative distribution
+    function (CDF) is computed using a parallel prefix sum. Sampling maps a
+    uniform variate to an outcome using :py:func:`drjit.binary_search`, which
+    compiles into a single loop with at most ``log2(n)+1`` iterations. The
+    size of the generated kernel is therefore independent of ``n``.
+
+    PMF evaluation is differentiable with respect to the constructor argument,
+    including the normalization constant.
+
+    .. code-block:: python
+
+       distr = dr.DiscreteDistribution(Float([1, 3, 0, 4]))
+       index, pmf = distr.sample_pmf(sampler.next_1d())
+
+    Args:
+        pmf (ArrayBase): A 1D floating point JIT array storing the unnormalized
+          probability of each outcome.
+    '''
+
+    def __init__(self, pmf: ArrayT):
+        _check_array(pmf, "DiscreteDistribution", "pmf")
+        if len(pmf) == 0:
+            raise RuntimeError("drjit.DiscreteDistribution(): 'pmf' is empty!")
+
+        Float = type(pmf)
+        self.pmf = pmf
+        self.cdf = dr.cumsum(dr.detach(pmf))
+        self.sum = dr.sum(pmf, axis=None)
+        self.normalization = dr.rcp(self.sum)
+        self.size = len(pmf)
+        dr.eval(self.cdf, self.sum, self.normalization)
+
+        # Total in the non-differentiable domain for sampling
+        self._sum_d = dr.gather(Float, self.cdf, self.size - 1)
+
+    def eval_pmf(self, index: Any, active: Any = True) -> ArrayT:
+        '''Evaluate the unnormalized PMF at the given index.'''
+        return dr.gather(type(self.pmf), self.pmf, index, active)
+
+    def eval_pmf_normalized(self, index: Any, active: Any = True) -> ArrayT:
+        '''Evaluate the normalized PMF at the given index.'''
+        return self.eval_pmf(index, active) * self.normalization
+
+    def eval_cdf(self, index: Any, active: Any = True) -> ArrayT:
+        '''Evaluate the unnormalized CDF (inclusive of ``index``).'''
+        return dr.gather(type(self.pmf), self.cdf, index, active)
+
+    def eval_cdf_normalized(self, index: Any, active: Any = True) -> ArrayT:
+        '''Evaluate the normalized CDF (inclusive of ``index``).'''
+        return self.eval_cdf(index, active) * dr.detach(self.normalization)
+
+    def sample(self, value: ArrayT, active: Any = True) -> Any:
+        '''
+        Map a uniformly distributed sample on the interval [0, 1) to an index
+        distributed according to the PMF.
+        '''
+        Float = type(self.pmf)
+        value = dr.detach(value) * self._sum_d
+
+        if self.size == 1:
+            return dr.zeros(dr.uint32_array_t(Float), dr.width(value))
+
+        return dr.binary_search(
+            0, self.size - 1,
+            lambda i: dr.gather(Float, self.cdf, i, active) <= value
+        )
+
+    def sample_pmf(self, value: ArrayT, active: Any = True) -> Tuple[Any, ArrayT]:
+        '''
+        Like :py:func:`sample`, but additionally returns the normalized
+        probability of the sampled index.
+        '''
+        index = self.sample(value, active)
+        return index, self.eval_pmf_normalized(index, active)
+
+    def sample_reuse(self, value: ArrayT, active: Any = True) -> Tuple[Any, ArrayT]:
+        '''
+        Like :py:func:`sample`, but additionally returns the sample rescaled to
+        the interval [0, 1) so that it can be reused for another sampling step.
+        '''
+        Float = type(self.pmf)
+        index = self.sample(value, active)
+        value = dr.detach(value) * self._sum_d
+
+        lower = dr.gather(Float, self.cdf, index - 1, (index > 0) & active)
+        pmf = dr.gather(Float, self.cdf, index, active) - lower
+
+        return index, dr.minimum((value - lower) / pmf,
+                                 dr.one_minus_epsilon(Float))
+
+    def sample_reuse_pmf(self, value: ArrayT, active: Any = True) -> Tuple[Any, ArrayT, ArrayT]:
+        '''
+        Combination of :py:func:`sample_pmf` and :py:func:`sample_reuse`.
+        '''
+        index, value = self.sample_reuse(value, active)
+        return index, value, self.eval_pmf_normalized(index, active)
+
+
+class ContinuousDistribution(Generic[ArrayT]):
+    '''
+    Continuous 1D probability distribution defined by a piecewise linear
+    density function sampled on a regular grid.
+
+    The density is specified via ``n >= 2`` unnormalized values covering the
+    interval ``range`` with equal spacing. The constructor integrates it using
+    a parallel prefix sum. Sampling locates the relevant linear segment using
+    :py:func:`drjit.binary_search` and then inverts the segment's quadratic
+    CDF analytically.
+
+    Density evaluation is differentiable with respect to the constructor
+    argument, including the normalization constant.
+
+    Args:
+        range (tuple[float, float]): The interval covered by the density.
+
+        pdf (ArrayBase): A 1D floating point JIT array storing the
+          unnormalized density at each grid point.
+    '''
+
+    def __init__(self, range: Tuple[float, float], pdf: ArrayT):
+        _check_array(pdf, "ContinuousDistribution", "pdf")
+        if len(pdf) < 2:
+            raise RuntimeError("drjit.ContinuousDistribution(): 'pdf' must "
+                               "have at least two entries!")
+        if not range[0] < range[1]:
+            raise RuntimeError("drjit.ContinuousDistribution(): invalid range!")
+
+        Float = type(pdf)
+        Index = dr.uint32_array_t(Float)
+        self.pdf = pdf
+        self.range = (float(range[0]), float(range[1]))
+        self.size = len(pdf)
+        self.interval_size = (self.range[1] - self.range[0]) / (self.size - 1)
+        self.inv_interval_size = 1 / self.interval_size
+
+        # Integral of each of the 'size-1' linear segments
+        i = dr.arange(Index, self.size - 1)
+        pdf_d = dr.detach(pdf)
+        segment = (dr.gather(Float, pdf_d, i) +
+                   dr.gather(Float, pdf_d, i + 1)) * (.5 * self.interval_size)
+        self.cdf = dr.cumsum(segment)
+
+        self.integral = (dr.sum(pdf, axis=None) -
+                         .5 * (dr.gather(Float, pdf, 0) +
+                               dr.gather(Float, pdf, self.size - 1))) \
+                        * self.interval_size
+        self.normalization = dr.rcp(self.integral)
+        dr.eval(self.cdf, self.integral, self.normalization)
+
+        self._integral_d = dr.gather(Float, self.cdf, self.size - 2)
+
+    def _segment(self, x: ArrayT, active: Any) -> Tuple[Any, ArrayT, Any]:
+        Float = type(self.pdf)
+        Index = dr.uint32_array_t(Float)
+        x = (x - self.range[0]) * self.inv_interval_size
+        active = (x >= 0) & (x <= self.size - 1) & active
+        index = Index(dr.clip(dr.floor(x), 0, self.size - 2))
+        return index, x - Float(index), active
+
+    def eval_pdf(self, x: ArrayT, active: Any = True) -> ArrayT:
+        '''Evaluate the unnormalized density at position ``x``.'''
+        Float = type(self.pdf)
+        index, t, active = self._segment(x, active)
+        y0 = dr.gather(Float, self.pdf, index, active)
+        y1 = dr.gather(Float, self.pdf, index + 1, active)
+        return dr.lerp(y0, y1, t)
+
+    def eval_pdf_normalized(self, x: ArrayT, active: Any = True) -> ArrayT:
+        '''Evaluate the normalized density at position ``x``.'''
+        return self.eval_pdf(x, active) * self.normalization
+
+    def eval_cdf(self, x: ArrayT, active: Any = True) -> ArrayT:
+        '''Evaluate the unnormalized cumulative distribution at position ``x``.'''
+        Float = type(self.pdf)
+        index, t, active_in = self._segment(x, active)
+        pdf_d = dr.detach(self.pdf)
+        y0 = dr.gather(Float, pdf_d, index, active_in)
+        y1 = dr.gather(Float, pdf_d, index + 1, active_in)
+        lower = dr.gather(Float, self.cdf, index - 1, active_in & (index > 0))
+        value = lower + (y0 + .5 * (y1 - y0) * t) * t * self.interval_size
+        x = dr.detach(x)
+        return dr.select(x > self.range[1], self._integral_d,
+                         dr.select(active_in, value, 0))
+
+    def eval_cdf_normalized(self, x: ArrayT, active: Any = True) -> ArrayT:
+        '''Evaluate the normalized cumulative distribution at position ``x``.'''
+        return self.eval_cdf(x, active) * dr.detach(self.normalization)
+
+    def sample(self, value: ArrayT, active: Any = True) -> ArrayT:
+        '''
+        Map a uniformly distributed sample on the interval [0, 1) to a position
+        distributed according to the density.
+        '''
+        Float = type(self.pdf)
+        value = dr.detach(value) * self._integral_d
+
+        if self.size == 2:
+            index = dr.zeros(dr.uint32_array_t(Float), dr.width(value))
+        else:
+            index = dr.binary_search(
+                0, self.size - 2,
+                lambda i: dr.gather(Float, self.cdf, i, active) <= value
+            )
+
+        pdf_d = dr.detach(self.pdf)
+        y0 = dr.gather(Float, pdf_d, index, active)
+        y1 = dr.gather(Float, pdf_d, index + 1, active)
+        lower = dr.gather(Float, self.cdf, index - 1, (index > 0) & active)
+        value = (value - lower) * self.inv_interval_size
+
+        # Invert the quadratic CDF of the linear segment
+        t_linear = (y0 - dr.safe_sqrt(dr.fma(y0, y0, 2 * value * (y1 - y0)))) / (y0 - y1)
+        t_const = value / y0
+        t = dr.select(y0 == y1, t_const, t_linear)
+
+        return dr.fma(Float(index) + dr.clip(t, 0, 1),
+                      self.interval_size, self.range[0])
+
+    def sample_pdf(self, value: ArrayT, active: Any = True) -> Tuple[ArrayT, ArrayT]:
+        '''
+        Like :py:func:`sample`, but additionally returns the normalized density
+        at the sampled position.
+        '''
+        x = self.sample(value, active)
+        return x, self.eval_pdf_normalized(x, active)
+
+
+class Distribution2D(Generic[ArrayT]):
+    '''
+    Piecewise constant 2D probability distribution, e.g., for importance
+    sampling environment maps.
+
+    The distribution is defined on the unit square by a 2D tensor of shape
+    ``(height, width)`` storing unnormalized, nonnegative values. It is
+    represented hierarchically using a marginal distribution over rows (see
+    :py:class:`drjit.DiscreteDistribution`) and a conditional CDF for each row.
+    The conditional CDFs of all rows are computed at once using a prefix sum
+    along the last axis of the tensor.
+
+    Sampling first selects a row and then searches the conditional CDF of that
+    row, which in both cases compiles into a constant-size search loop. The
+    density is differentiable with respect to the constructor argument.
+
+    Args:
+        data (TensorXf): A 2D floating point tensor.
+    '''
+
+    def __init__(self, data: Any):
+        tp = type(data)
+        if not dr.is_tensor_v(tp) or not dr.is_jit_v(tp) or \
+           not dr.is_float_v(tp) or data.ndim != 2:
+            raise TypeError("drjit.Distribution2D(): 'data' must be a 2D "
+                            "JIT-compiled floating point tensor!")
+
+        Float = type(data.array)
+        self.shape = data.shape
+        self.data = data.array
+        self.row_sum = dr.sum(data, axis=1).array
+        self.marginal = DiscreteDistribution(self.row_sum)
+        self.conditional_cdf = dr.cumsum(dr.detach(data), axis=1).array
+        dr.eval(self.conditional_cdf)
+
+        mod = sys.modules[Float.__module__]
+        self.Array2f = getattr(mod, 'Array2f' if dr.type_v(Float) ==
+                               dr.VarType.Float32 else 'Array2f64')
+
+    def sample(self, sample: Any, active: Any = True) -> Tuple[Any, ArrayT]:
+        '''
+        Map a uniformly distributed 2D sample on the unit square to a position
+        on the unit square distributed according to the density. Returns the
+        position along with the associated normalized density.
+        '''
+        Float = type(self.data)
+        height, width = self.shape
+
+        row, y = self.marginal.sample_reuse(sample[1], active)
+
+        # Search the conditional CDF of the selected row
+        offset = row * width
+        row_sum = dr.gather(Float, self.conditional_cdf, offset + width - 1, active)
+        value = dr.detach(sample[0]) * row_sum
+        index = dr.binary_search(
+            offset, offset + width - 1,
+            lambda i: dr.gather(Float, self.conditional_cdf, i, active) <= value
+        )
+
+        lower = dr.gather(Float, self.conditional_cdf, index - 1,
+                          (index > offset) & active)
+        upper = dr.gather(Float, self.conditional_cdf, index, active)
+        x = dr.minimum((value - lower) / (upper - lower),
+                       dr.one_minus_epsilon(Float))
+        col = index - offset
+
+        pos = self.Array2f((Float(col) + x) / width, (Float(row) + y) / height)
+        pdf = dr.gather(Float, self.data, index, active) * \
+            (self.marginal.normalization * (width * height))
+
+        return pos, pdf
+
+    def eval(self, pos: Any, active: Any = True) -> ArrayT:
+        '''
+        Evaluate the normalized density at a position on the unit square.
+        '''
+        Float = type(self.data)
+        Index = dr.uint32_array_t(Float)
+        height, width = self.shape
+
+        col = Index(dr.clip(pos[0] * width, 0, width - 1))
+        row = Index(dr.clip(pos[1] * height, 0, height - 1))
+        value = dr.gather(Float, self.data, row * width + col, active)
+
+        return value * (self.marginal.normalization * (width * height))
@@ -0,0 +1,306 @@
+import drjit as dr
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# Naming convention of the kernel binaries written by Dr.Jit-Core
+_entry_re = re.compile(r'^([0-9a-f]{32})\.(llvm|cuda)\.bin$')
+
+
+def _default_path() -> str:
+    """Return the location of Dr.Jit's on-disk kernel cache"""
+    if sys.platform == 'win32':
+        import tempfile
+        return os.path.join(tempfile.gettempdir(), 'drjit')
+    else:
+        return os.path.join(os.path.expanduser("~"), ".drjit")
+
+
+class KernelCache:
+    '''
+    Interface to manage Dr.Jit's persistent on-disk kernel cache.
+
+    Whenever the LLVM backend compiles a kernel, it stores the resulting
+    binary in a cache directory (``~/.drjit`` on Linux/macOS, and
+    ``%AppData%\\Local\\Temp\\drjit`` on Windows) so that later sessions
+    running the same computation can skip code generation and compilation.
+    Each file is identified by the hash of the kernel that is also reported by
+    :py:func:`drjit.kernel_history()`.
+
+    This class provides control over this directory: it can enumerate and
+    evict entries, impose a size budget with least-recently-used (LRU)
+    eviction, and export/import the cache contents to/from a single bundle
+    file. The latter is useful to pre-warm the cache of fresh worker processes
+    so that they start without any codegen or compilation latency:
+
+    .. code-block:: python
+
+       # On a machine that ran a representative workload
+       dr.kernel_cache.export_bundle('kernels.tar.gz')
+
+       # On a fresh worker, before the first trace
+       dr.kernel_cache.import_bundle('kernels.tar.gz')
+
+    A single instance of this class is available as :py:data:`drjit.kernel_cache`.
+
+    .. note::
+
+       The cache directory used by the JIT compiler is fixed when Dr.Jit-Core
+       is initialized. Setting :py:attr:`path` redirects the operations of this
+       class (e.g., to manage a shared cache on a network file system that is
+       subsequently imported), but does not relocate the compiler's own cache.
+    '''
+
+    def __init__(self) -> None:
+        self._path: Optional[str] = None
+        self._budget: Optional[int] = None
+        self._atexit: bool = False
+
+    @property
+    def path(self) -> str:
+        '''Directory containing the cached kernels.'''
+        if self._path is None:
+            return _default_path()
+        return self._path
+
+    @path.setter
+    def path(self, value: Optional[str]) -> None:
+        self._path = None if value is None else os.fspath(value)
+
+    @property
+    def budget(self) -> Optional[int]:
+        '''
+        Size budget of the on-disk cache in bytes, or ``None`` (the default)
+        when the cache may grow without bounds.
+
+        Assigning a budget immediately evicts the least recently used entries
+        until the cache fits. Since new kernels are added as the program runs,
+        the budget is also enforced when the Python interpreter shuts down.
+        '''
+        return self._budget
+
+    @budget.setter
+    def budget(self, value: Optional[int]) -> None:
+        if value is not None:
+            value = int(value)
+            if value < 0:
+                raise ValueError("drjit.kernel_cache.budget: the budget must be nonnegative!")
+        self._budget = value
+
+        if value is not None:
+            if not self._atexit:
+                import atexit
+                atexit.register(self._trim_at_exit)
+                self._atexit = True
+            self.trim()
+
+    def entries(self) -> List[Dict[str, object]]:
+        '''
+        Return a list describing the entries of the cache, ordered from least
+        to most recently used.
+
+        Each entry is a dictionary with the keys ``hash`` (hexadecimal kernel
+        hash as in :py:func:`drjit.kernel_history()`), ``backend``
+        (:py:class:`drjit.JitBackend`), ``size`` (file size in bytes),
+        ``last_used`` (time stamp in seconds since the epoch), and ``filename``.
+        '''
+        path = self.path
+        try:
+            names = os.listdir(path)
+        except OSError:
+            return []
+
+        result: List[Dict[str, object]] = []
+        for name in names:
+            m = _entry_re.match(name)
+            if m is None:
+                continue
+            filename = os.path.join(path, name)
+            try:
+                st = os.stat(filename)
+            except OSError:
+                # The entry was removed concurrently
+                continue
+            result.append({
+                'hash': m.group(1),
+                'backend': dr.JitBackend.LLVM if m.group(2) == 'llvm' \
+                           else dr.JitBackend.CUDA,
+                'size': st.st_size,
+                'last_used': max(st.st_atime, st.st_mtime),
+                'filename': filename
+            })
+
+        result.sort(key=lambda e: e['last_used'])
+        return result
+
+    def size(self) -> int:
+        '''Return the total size of the cached kernels in bytes.'''
+        return sum(e['size'] for e in self.entries()) # type: ignore
+
+    def evict(self, hashes: Union[str, Iterable[str]]) -> int:
+        '''
+        Remove the entries with the given kernel hash(es) from the cache and
+        return the number of removed files.
+        '''
+        if isinstance(hashes, str):
+            hashes = (hashes,)
+        hashes = set(h.lower() for h in hashes)
+
+        count = 0
+        for e in self.entries():
+            if e['hash'] in hashes:
+                count += self._remove(e)
+        return count
+
+    def trim(self, budget: Optional[int] = None) -> int:
+        '''
+        Evict least recently used entries until the total cache size is below
+        ``budget`` (which defaults to :py:attr:`budget`). Returns the number of
+        removed files.
+        '''
+        if budget is None:
+            budget = self._budget
+        if budget is None:
+            return 0
+
+        entries = self.entries()
+        total = sum(e['size'] for e in entries) # type: ignore
+        count = 0
+        for e in entries:
+            if total <= budget:
+                break
+            if self._remove(e):
+                total -= e['size'] # type: ignore
+                count += 1
+        return count
+
+    def clear(self) -> None:
+        '''
+        Remove all entries from the on-disk cache and release the kernels that
+        are currently resident in memory (see :py:func:`drjit.flush_kernel_cache`).
+        '''
+        for e in self.entries():
+            self._remove(e)
+        dr.flush_kernel_cache()
+
+    def export_bundle(self, filename: str, hashes: Optional[Iterable[str]] = None) -> int:
+        '''
+        Write cache entries to the compressed archive ``filename``.
+
+        When ``hashes`` is specified, only the kernels with matching hashes
+        are exported. This can, e.g., be combined with
+        :py:func:`drjit.kernel_history()` to ship just the kernels of a
+        particular workload. Returns the number of exported entries.
+        '''
+        import tarfile
+
+        if hashes is not None:
+            hashes = set(h.lower() for h in hashes)
+
+        count = 0
+        with tarfile.open(filename, 'w:gz') as tar:
+            for e in self.entries():
+                if hashes is not None and e['hash'] not in hashes:
+                    continue
+                fname = str(e['filename'])
+                try:
+                    tar.add(fname, arcname=os.path.basename(fname))
+                except OSError:
+                    continue
+                count += 1
+        return count
+
+    def import_bundle(self, filename: str, overwrite: bool = False) -> int:
+        '''
+        Add the entries of an archive created by :py:func:`export_bundle` to
+        the cache. Existing entries are kept unless ``overwrite=True``.
+        Returns the number of imported entries.
+        '''
+        import tarfile
+
+        path = self.path
+        os.makedirs(path, exist_ok=True)
+
+        count = 0
+        with tarfile.open(filename, 'r:*') as tar:
+            for member in tar:
+                # Only accept plain files following the cache naming scheme
+                if not member.isfile() or _entry_re.match(member.name) is None:
+                    continue
+                target = os.path.join(path, member.name)
+                if not overwrite and os.path.exists(target):
+                    continue
+                src = tar.extractfile(member)
+                if src is None:
+                    continue
+                tmp = f"{target}.{os.getpid()}.tmp"
+                with src, open(tmp, 'wb') as f:
+                    f.write(src.read())
+                os.replace(tmp, target)
+                count += 1
+
+        self.trim()
+        return count
+
+    def _remove(self, entry: Dict[str, object]) -> bool:
+        try:
+            os.remove(str(entry['filename']))
+            return True
+        except OSError:
+            return False
+
+    def _trim_at_exit(self) -> None:
+        try:
+            self.trim()
+        except Exception:
+            pass
+
+    def __repr__(self) -> str:
+        return f"KernelCache[path='{self.path}', budget={self._budget}]"
+
+
+kernel_cache = KernelCache()
+
+
+def dump_manifest(filename: str,
+                  history: Optional[List[Dict[str, Any]]] = None) -> int:
+    '''
+    Bundle the compiled kernels launched by a representative workload.
+
+    This function collects the hashes of the distinct kernels in ``history``,
+    which should be the output of :py:func:`drjit.kernel_history()`, and
+    writes their binaries from the on-disk cache (see
+    :py:data:`drjit.kernel_cache`) to the archive ``filename`` via
+    :py:func:`KernelCache.export_bundle()`. When ``history`` is not
+    specified, this function queries it directly, which requires that the
+    workload ran with the :py:attr:`drjit.JitFlag.KernelHistory` flag
+    enabled:
+
+    .. code-block:: python
+
+       with dr.scoped_set_flag(dr.JitFlag.KernelHistory):
+           run_workload()
+       dr.dump_manifest('workload.tar.gz')
+
+    Pass the archive to :py:func:`KernelCache.import_bundle()` at the start of
+    another process to install the kernels into its cache. In contrast to
+    :py:func:`KernelCache.export_bundle()` without arguments, the archive only
+    contains the kernels of the workload. Kernels without a cached binary
+    (e.g., CUDA kernels, which are cached by the CUDA driver) are skipped.
+
+    Args:
+        filename (str): Output filename.
+
+        history (list[dict] | None): Kernel history entries.
+
+    Returns:
+        int: The number of exported kernels.
+    '''
+    if history is None:
+        history = dr.kernel_history((dr.KernelType.JIT,))
+
+    hashes = set(h['hash'] for h in history
+                 if h['type'] == dr.KernelType.JIT)
+
+    return kernel_cache.export_bundle(filename, hashes)
@@ -0,0 +1,339 @@
+import drjit as dr
+import warnings as _warnings
+from typing import Any, List, Optional, Tuple, TypeVar
+
+ArrayT = TypeVar("ArrayT", bound=dr.ArrayBase)
+
+# The functions in this file operate on small matrices (2x2, 3x3, 4x4) that
+# are stored as Dr.Jit arrays with one matrix per lane. All algorithms are
+# fully unrolled in Python, which means that they compile into straight-line
+# code within a single kernel, and that automatic differentiation propagates
+# through them like through any other arithmetic expression.
+
+# Default number of Jacobi sweeps used by eigh() for each matrix size
+_eigh_sweeps = {2: 1, 3: 5, 4: 6}
+
+
+def _matrix_check(name: str, arg: Any) -> int:
+    tp = type(arg)
+    if not dr.is_matrix_v(tp) or dr.size_v(tp) not in (2, 3, 4):
+        raise TypeError(f"drjit.{name}(): expected a 2x2, 3x3, or 4x4 "
+                        "Dr.Jit matrix type!")
+    return dr.size_v(tp)
+
+
+def _load(arg: Any, n: int) -> List[List[Any]]:
+    '''Convert a matrix into a nested list of its entries'''
+    return [[arg[i, j] for j in range(n)] for i in range(n)]
+
+
+def _store(tp: Any, a: List[List[Any]]) -> Any:
+    '''Convert a nested list of entries into a matrix of type ``tp``'''
+    Row = dr.value_t(tp)
+    return tp(*[Row(*row) for row in a])
+
+
+def _swap_rows(a: List[List[Any]], i: int, k: int, cond: Any) -> None:
+    '''Swap rows ``i`` and ``k`` in lanes where ``cond`` is ``True``'''
+    for j in range(len(a[i])):
+        ai, ak = a[i][j], a[k][j]
+        a[i][j] = dr.select(cond, ak, ai)
+        a[k][j] = dr.select(cond, ai, ak)
+
+
+def _eliminate(a: List[List[Any]], n: int, width: int) -> None:
+    '''
+    In-place Gaussian elimination with partial pivoting.
+
+    The leading ``n`` columns of the augmented rows ``a`` are overwritten with
+    the compact LU factorization (unit-diagonal ``L`` below the diagonal,
+    ``U`` on and above it). Row swaps are applied to all columns, while the
+    elimination steps only touch the first ``width`` columns.
+    '''
+    for k in range(n):
+        # Move the entry with the largest magnitude into the pivot position
+        for i in range(k + 1, n):
+            _swap_rows(a, k, i, dr.abs(a[i][k]) > dr.abs(a[k][k]))
+
+        r = dr.rcp(a[k][k])
+        for i in range(k + 1, n):
+            f = a[i][k] * r
+            a[i][k] = f
+            for j in range(k + 1, width):
+                a[i][j] = dr.fma(-f, a[k][j], a[i][j])
+
+
+def _solve(a: List[List[Any]], n: int, m: int) -> List[List[Any]]:
+    '''
+    Solve the linear system stored in the augmented rows ``a`` (``n``
+    columns of the system matrix followed by ``m`` right hand sides) and
+    return the ``m`` solution columns.
+    '''
+    _eliminate(a, n, n + m)
+
+    rdiag = [dr.rcp(a[i][i]) for i in range(n)]
+    cols = []
+    for c in range(n, n + m):
+        x: List[Any] = [None] * n
+        for i in reversed(range(n)):
+            v = a[i][c]
+            for j in range(i + 1, n):
+                v = dr.fma(-a[i][j], x[j], v)
+            x[i] = v * rdiag[i]
+        cols.append(x)
+    return cols
+
+
+def lu(arg: ArrayT, /) -> Tuple[ArrayT, ArrayT, ArrayT]:
+    '''
+    Compute the LU factorization of a batch of small matrices with partial
+    pivoting.
+
+    The function returns a tuple ``(P, L, U)`` of matrices satisfying ``P @ A
+    == L @ U``, where ``P`` is a permutation matrix, ``L`` is lower triangular
+    with a unit diagonal, and ``U`` is upper triangular. The pivot is chosen
+    separately for each lane.
+
+    The factorization is fully unrolled and compiles into straight-line code
+    that is fused with the surrounding computation. It supports automatic
+    differentiation.
+
+    Args:
+        arg (drjit.ArrayBase): A 2x2, 3x3, or 4x4 Dr.Jit matrix.
+
+    Returns:
+        tuple[drjit.ArrayBase, drjit.ArrayBase, drjit.ArrayBase]: The
+        permutation matrix ``P`` and triangular factors ``L`` and ``U``.
+    '''
+    n = _matrix_check('lu', arg)
+    tp = type(arg)
+    Float = dr.value_t(dr.value_t(tp))
+    one, zero = Float(1), Float(0)
+
+    # Track the row permutation by augmenting with the identity matrix
+    a = _load(arg, n)
+    for i in range(n):
+        a[i] += [one if i == j else zero for j in range(n)]
+
+    _eliminate(a, n, n)
+
+    P = [row[n:] for row in a]
+    L = [[a[i][j] if j < i else (one if j == i else zero)
+          for j in range(n)] for i in range(n)]
+    U = [[a[i][j] if j >= i else zero
+          for j in range(n)] for i in range(n)]
+
+    return _store(tp, P), _store(tp, L), _store(tp, U)
+
+
+def solve(a: ArrayT, b: Any, /) -> Any:
+    '''
+    Solve the linear system ``a @ x == b`` for a batch of small matrices.
+
+    The right hand side ``b`` can either be a vector (e.g.,
+    :py:class:`drjit.cuda.Array3f` when ``a`` is a
+    :py:class:`drjit.cuda.Matrix3f`) or a matrix of the same type as ``a``,
+    in which case each of its columns is treated as a separate right hand
+    side. The result has the same type as ``b``.
+
+    The implementation performs Gaussian elimination with partial pivoting
+    followed by back substitution. It is fully unrolled, compiles into
+    straight-line code that is fused with the surrounding computation, and
+    supports automatic differentiation with respect to both ``a`` and ``b``.
+
+    Compared to ``dr.rcp(a) @ b``, this function is more accurate when ``a``
+    is poorly conditioned and cheaper when there are few right hand sides.
+
+    Args:
+        a (drjit.ArrayBase): A 2x2, 3x3, or 4x4 Dr.Jit matrix.
+
+        b (drjit.ArrayBase): A vector or matrix with compatible size.
+
+    Returns:
+        drjit.ArrayBase: The solution ``x`` with the same type as ``b``.
+    '''
+    n = _matrix_check('solve', a)
+    tb = type(b)
+    is_matrix = dr.is_matrix_v(tb)
+
+    if not dr.is_array_v(tb) or dr.size_v(tb) != n or \
+       dr.depth_v(tb) != dr.depth_v(a) - (0 if is_matrix else 1):
+        raise TypeError("drjit.solve(): 'b' must be a vector or matrix "
+                        "whose size matches 'a'!")
+
+    m = n if is_matrix else 1
+    rows = _load(a, n)
+    for i in range(n):
+        rows[i] += [b[i, j] for j in range(m)] if is_matrix else [b[i]]
+
+    cols = _solve(rows, n, m)
+
+    if is_matrix:
+        return _store(tb, [[cols[j][i] for j in range(m)] for i in range(n)])
+    else:
+        return tb(*cols[0])
+
+
+def inverse(arg: ArrayT, /, pivoting: bool = False) -> ArrayT:
+    '''
+    Compute the inverse of a batch of small matrices.
+
+    By default, this function is equivalent to :py:func:`drjit.rcp`, which
+    evaluates the inverse using cofactor expansion. This is the fastest
+    option, but it can be inaccurate when the matrix is poorly conditioned.
+    Specify ``pivoting=True`` to instead compute the inverse using Gaussian
+    elimination with partial pivoting (see :py:func:`drjit.solve`).
+
+    Both variants compile into straight-line code that is fused with the
+    surrounding computation and support automatic differentiation.
+
+    Calling this function with a non-matrix argument is deprecated, please
+    use :py:func:`drjit.rcp` in that case.
+
+    Args:
+        arg (drjit.ArrayBase): A 2x2, 3x3, or 4x4 Dr.Jit matrix.
+
+        pivoting (bool): Use Gaussian elimination with partial pivoting.
+
+    Returns:
+        drjit.ArrayBase: The inverse of ``arg``.
+    '''
+    if not dr.is_matrix_v(arg):
+        _warnings.warn("inverse(x) is deprecated, please use rcp(x)",
+                       DeprecationWarning, stacklevel=2)
+        return dr.rcp(arg)
+
+    if not pivoting:
+        return dr.rcp(arg)
+
+    n = _matrix_check('inverse', arg)
+    tp = type(arg)
+    Float = dr.value_t(dr.value_t(tp))
+    one, zero = Float(1), Float(0)
+
+    rows = _load(arg, n)
+    for i in range(n):
+        rows[i] += [one if i == j else zero for j in range(n)]
+
+    cols = _solve(rows, n, n)
+    return _store(tp, [[cols[j][i] for j in range(n)] for i in range(n)])
+
+
+def cholesky(arg: ArrayT, /) -> ArrayT:
+    '''
+    Compute the Cholesky factorization of a batch of small symmetric
+    positive definite matrices.
+
+    The function returns the lower triangular matrix ``L`` with a positive
+    diagonal satisfying ``L @ L.T == arg``. Only the lower triangular part of
+    ``arg`` is accessed. The result contains NaN values in lanes where
+    ``arg`` is not positive definite.
+
+    The factorization is fully unrolled and compiles into straight-line code
+    that is fused with the surrounding computation. It supports automatic
+    differentiation.
+
+    Args:
+        arg (drjit.ArrayBase): A 2x2, 3x3, or 4x4 Dr.Jit matrix.
+
+    Returns:
+        drjit.ArrayBase: The lower triangular Cholesky factor.
+    '''
+    n = _matrix_check('cholesky', arg)
+    tp = type(arg)
+    Float = dr.value_t(dr.value_t(tp))
+
+    a = _load(arg, n)
+    L = [[Float(0)] * n for _ in range(n)]
+
+    for j in range(n):
+        s = a[j][j]
+        for k in range(j):
+            s = dr.fma(-L[j][k], L[j][k], s)
+        d = dr.sqrt(s)
+        L[j][j] = d
+        r = dr.rcp(d)
+
+        for i in range(j + 1, n):
+            s = a[i][j]
+            for k in range(j):
+                s = dr.fma(-L[i][k], L[j][k], s)
+            L[i][j] = s * r
+
+    return _store(tp, L)
+
+
+def eigh(arg: ArrayT, /, sweeps: Optional[int] = None) -> Tuple[Any, ArrayT]:
+    '''
+    Compute the eigendecomposition of a batch of small symmetric matrices.
+
+    The function returns a tuple ``(w, V)``, where ``w`` is a vector of
+    eigenvalues in ascending order, and the columns of the orthogonal matrix
+    ``V`` hold the associated eigenvectors, i.e., ``arg == V @ dr.diag(w) @
+    V.T``.
+
+    The implementation performs a fixed number of cyclic Jacobi sweeps, each
+    of which applies a plane rotation for every off-diagonal entry. This is
+    fully unrolled, compiles into straight-line code that is fused with the
+    surrounding computation, and supports automatic differentiation. The
+    default number of sweeps (1, 5, and 6 for 2x2, 3x3, and 4x4 matrices)
+    achieves single precision accuracy. Gradients are ill-defined when
+    eigenvalues are repeated.
+
+    Args:
+        arg (drjit.ArrayBase): A symmetric 2x2, 3x3, or 4x4 Dr.Jit matrix.
+
+        sweeps (int | None): Number of Jacobi sweeps.
+
+    Returns:
+        tuple[drjit.ArrayBase, drjit.ArrayBase]: The eigenvalues and a matrix
+        with the associated eigenvectors as columns.
+    '''
+    n = _matrix_check('eigh', arg)
+    tp = type(arg)
+    Float = dr.value_t(dr.value_t(tp))
+    one, zero = Float(1), Float(0)
+
+    if sweeps is None:
+        sweeps = _eigh_sweeps[n]
+
+    a = _load(arg, n)
+    v = [[one if i == j else zero for j in range(n)] for i in range(n)]
+
+    for _ in range(sweeps):
+        for p in range(n - 1):
+            for q in range(p + 1, n):
+                # Rotation angle that annihilates the entry a[p][q]
+                apq = a[p][q]
+                is_zero = apq == 0
+                theta = (a[q][q] - a[p][p]) / dr.select(is_zero, 1, 2 * apq)
+                t = dr.rcp(dr.abs(theta) + dr.sqrt(dr.fma(theta, theta, 1)))
+                t = dr.select(is_zero, 0, dr.mulsign(t, theta))
+                c = dr.rsqrt(dr.fma(t, t, 1))
+                s = t * c
+
+                # a <- J^T a J, v <- v J
+                for m in (a, v):
+                    for k in range(n):
+                        mkp, mkq = m[k][p], m[k][q]
+                        m[k][p] = dr.fma(c, mkp, -s * mkq)
+                        m[k][q] = dr.fma(s, mkp, c * mkq)
+
+                for k in range(n):
+                    apk, aqk = a[p][k], a[q][k]
+                    a[p][k] = dr.fma(c, apk, -s * aqk)
+                    a[q][k] = dr.fma(s, apk, c * aqk)
+
+    # Sort the eigenvalues (and eigenvector columns) using a sorting network
+    w = [a[i][i] for i in range(n)]
+    for i in range(n - 1):
+        for j in range(n - 1 - i):
+            cond = w[j] > w[j + 1]
+            wj, wj1 = w[j], w[j + 1]
+            w[j], w[j + 1] = dr.select(cond, wj1, wj), dr.select(cond, wj, wj1)
+            for k in range(n):
+                vj, vj1 = v[k][j], v[k][j + 1]
+                v[k][j] = dr.select(cond, vj1, vj)
+                v[k][j + 1] = dr.select(cond, vj, vj1)
+
+    return dr.value_t(tp)(*w), _store(tp, v)
@@ -0,0 +1,236 @@
+import drjit as dr
+import math
+from typing import Dict, Tuple, TypeVar
+from ._reduce import _compute_strides
+
+ArrayT = TypeVar("ArrayT", bound=dr.ArrayBase)
+
+# Size of the register tile (rows x columns of the output) that each thread
+# of a tensor matrix multiplication computes. Larger tiles reuse each loaded
+# entry of the operands more often but reduce the available parallelism.
+_matmul_tile: Dict[dr.JitBackend, int] = {
+    dr.JitBackend.LLVM: 4,
+    dr.JitBackend.CUDA: 2,
+}
+
+# Fully unroll the inner product if the contracted dimension is at most this
+# large. Otherwise, the kernel contains a symbolic loop.
+_matmul_unroll: int = 16
+
+
+def _broadcast_batch(s0: Tuple[int, ...], s1: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Broadcast the leading (batch) dimensions of two matmul operands"""
+    n = max(len(s0), len(s1))
+    s0 = (1,) * (n - len(s0)) + s0
+    s1 = (1,) * (n - len(s1)) + s1
+    result = []
+    for a, b in zip(s0, s1):
+        if a != b and a != 1 and b != 1:
+            raise RuntimeError("drjit.matmul(): incompatible batch dimensions!")
+        result.append(max(a, b))
+    return tuple(result)
+
+
+def _operand_strides(shape: Tuple[int, ...], batch: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    Compute the strides of a contiguous matmul operand with the given shape,
+    where batch dimensions that are broadcast receive a zero stride.
+    """
+    strides = _compute_strides(shape)
+    pad = len(batch) - (len(shape) - 2)
+    bstrides = tuple(0 if s == 1 else st
+                     for s, st in zip(shape[:-2], strides[:-2]))
+    return (0,) * pad + bstrides + strides[-2:]
+
+
+def _reduce_axes(shape: Tuple[int, ...], batch: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Return the batch axes over which the operand ``shape`` was broadcast"""
+    pad = len(batch) - (len(shape) - 2)
+    return tuple(i for i in range(len(batch))
+                 if i < pad or (shape[i - pad] == 1 and batch[i] != 1))
+
+
+def _matmul_impl(
+    a: ArrayT,
+    sa: Tuple[int, ...],
+    b: ArrayT,
+    sb: Tuple[int, ...],
+    batch: Tuple[int, ...],
+    m: int,
+    k: int,
+    n: int
+) -> ArrayT:
+    """
+    Multiply a batch of ``m x k`` matrices stored in the flat array ``a`` by
+    a batch of ``k x n`` matrices stored in ``b``. The tuples ``sa`` and
+    ``sb`` specify the strides of the batch dimensions followed by those of the
+    row and column dimensions, which means that transposed operands don't
+    need to be copied. Returns a flat C-contiguous array of shape ``batch +
+    (m, n)``.
+
+    Each thread computes a tile of the output, which lets it reuse every
+    loaded operand entry several times.
+    """
+    Value = type(a)
+    Index = dr.uint32_array_t(Value)
+
+    tile = _matmul_tile.get(dr.backend_v(a), 1)
+    tm, tn = min(tile, m), min(tile, n)
+    mt, nt = (m + tm - 1) // tm, (n + tn - 1) // tn
+    batch_size = math.prod(batch)
+    out_size = batch_size * m * n
+
+    if out_size == 0:
+        return dr.zeros(Value, 0)
+
+    # Map thread indices to (batch, tile row, tile column)
+    idx = dr.arange(Index, batch_size * mt * nt)
+    tj = idx % nt
+    idx //= nt
+    ti = idx % mt
+    bi = idx // mt
+
+    offset_a, offset_b = Index(0), Index(0)
+    pos = Index(bi)
+    for d in reversed(range(len(batch))):
+        if batch[d] == 1:
+            continue
+        p = pos % batch[d]
+        pos //= batch[d]
+        offset_a = dr.fma(p, sa[d], offset_a)
+        offset_b = dr.fma(p, sb[d], offset_b)
+
+    rows = [ti * tm + r for r in range(tm)]
+    cols = [tj * tn + c for c in range(tn)]
+
+    # Clamp to stay within bounds, the corresponding outputs are masked below
+    row_offset = [dr.fma(dr.minimum(i, m - 1), sa[-2], offset_a) for i in rows]
+    col_offset = [dr.fma(dr.minimum(j, n - 1), sb[-1], offset_b) for j in cols]
+
+    def step(kk, acc):
+        av = [dr.gather(Value, a, o + kk * sa[-1]) for o in row_offset]
+        bv = [dr.gather(Value, b, o + kk * sb[-2]) for o in col_offset]
+        return tuple(dr.fma(av[r], bv[c], acc[r * tn + c])
+                     for r in range(tm) for c in range(tn))
+
+    acc = tuple(dr.zeros(Value, len(bi)) for _ in range(tm * tn))
+
+    if k <= _matmul_unroll:
+        for kk in range(k):
+            acc = step(kk, acc)
+    else:
+        _, acc = dr.while_loop(
+            label="Matrix multiplication",
+            labels=("k", "acc"),
+            state=(Index(0), acc),
+            cond=lambda kk, acc: kk < k,
+            body=lambda kk, acc: (kk + 1, step(kk, acc))
+        )
+
+    out = dr.zeros(Value, out_size)
+    base = bi * m
+    for r in range(tm):
+        for c in range(tn):
+            dr.scatter(
+                target=out,
+                value=acc[r * tn + c],
+                index=dr.fma(base + rows[r], n, cols[c]),
+                active=(rows[r] < m) & (cols[c] < n)
+            )
+
+    return out
+
+
+class MatmulOp(dr.CustomOp):
+    def eval(self, a: ArrayT, b: ArrayT, shape_a: Tuple[int, ...],
+             shape_b: Tuple[int, ...], batch: Tuple[int, ...]) -> ArrayT:
+        self.a, self.b = a, b
+        self.shape_a, self.shape_b, self.batch = shape_a, shape_b, batch
+        self.m, self.k = shape_a[-2:]
+        self.n = shape_b[-1]
+        self.sa = _operand_strides(shape_a, batch)
+        self.sb = _operand_strides(shape_b, batch)
+
+        return _matmul_impl(a, self.sa, b, self.sb, batch,
+                            self.m, self.k, self.n)
+
+    def forward(self):
+        m, k, n, batch = self.m, self.k, self.n, self.batch
+        grad_a, grad_b = self.grad_in('a'), self.grad_in('b')
+        self.set_grad_out(
+            _matmul_impl(grad_a, self.sa, self.b, self.sb, batch, m, k, n) +
+            _matmul_impl(self.a, self.sa, grad_b, self.sb, batch, m, k, n)
+        )
+
+    def backward(self):
+        m, k, n, batch = self.m, self.k, self.n, self.batch
+        grad_out = self.grad_out()
+        sg = _compute_strides(batch + (m, n))
+        sa, sb = self.sa, self.sb
+
+        # grad_a = grad_out @ b^T, grad_b = a^T @ grad_out
+        grad_a = _matmul_impl(grad_out, sg, self.b,
+                              sb[:-2] + (sb[-1], sb[-2]), batch, m, n, k)
+        grad_b = _matmul_impl(self.a, sa[:-2] + (sa[-1], sa[-2]),
+                              grad_out, sg, batch, k, m, n)
+
+        self.set_grad_in('a', _unbroadcast(grad_a, batch + (m, k), self.shape_a, batch))
+        self.set_grad_in('b', _unbroadcast(grad_b, batch + (k, n), self.shape_b, batch))
+
+
+def _unbroadcast(value: ArrayT, shape: Tuple[int, ...],
+                 target: Tuple[int, ...], batch: Tuple[int, ...]) -> ArrayT:
+    """Sum a gradient of the given shape over broadcast batch dimensions"""
+    axes = _reduce_axes(target, batch)
+    if not axes:
+        return value
+    Tensor = dr.tensor_t(type(value))
+    return dr.sum(Tensor(value, shape), axis=axes).array
+
+
+def tensor_matmul(a: ArrayT, b: ArrayT) -> ArrayT:
+    """
+    Matrix multiplication of tensors following the conventions of NumPy's
+    ``matmul``. This function is invoked by :py:func:`drjit.matmul()` and the
+    ``@`` operator when an operand is a tensor.
+    """
+    Tensor = type(a)
+    if not dr.is_tensor_v(Tensor) or type(b) is not Tensor:
+        raise TypeError("drjit.matmul(): tensor operands must have the same type!")
+    if not dr.is_float_v(Tensor):
+        raise TypeError("drjit.matmul(): tensor operands must be floating point arrays!")
+
+    shape_a, shape_b = a.shape, b.shape
+    if len(shape_a) == 0 or len(shape_b) == 0:
+        raise RuntimeError("drjit.matmul(): tensor operands must have at least "
+                           "one dimension!")
+
+    # Promote 1D operands to matrices (the extra dimension is removed below)
+    vec_a, vec_b = len(shape_a) == 1, len(shape_b) == 1
+    if vec_a:
+        shape_a = (1,) + shape_a
+    if vec_b:
+        shape_b = shape_b + (1,)
+
+    m, k = shape_a[-2:]
+    k2, n = shape_b[-2:]
+    if k != k2:
+        raise RuntimeError(f"drjit.matmul(): incompatible shapes {a.shape} "
+                           f"and {b.shape}!")
+
+    batch = _broadcast_batch(shape_a[:-2], shape_b[:-2])
+
+    out_shape = batch
+    if not vec_a:
+        out_shape += (m,)
+    if not vec_b:
+        out_shape += (n,)
+
+    if dr.grad_enabled(a, b):
+        result = dr.custom(MatmulOp, a.array, b.array, shape_a, shape_b, batch)
+    else:
+        result = _matmul_impl(a.array, _operand_strides(shape_a, batch),
+                              b.array, _operand_strides(shape_b, batch),
+                              batch, m, k, n)
+
+    return Tensor(result, out_shape)
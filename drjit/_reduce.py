@@ -1,5 +1,5 @@
 import drjit as dr
-from typing import Dict, TypeVar, Tuple, Literal, Protocol, cast
+from typing import Dict, List, NamedTuple, Optional, TypeVar, Tuple, Literal, Protocol, cast
 
 ArrayT = TypeVar("ArrayT", bound=dr.ArrayBase)
 
@@ -58,47 +58,23 @@ def reduce_recursive(
         )[3]
 
 
-def tensor_reduce(
-    op: dr.ReduceOp,
-    value: ArrayT,
-    axis: Tuple[int, ...],
-    mode: Literal["symbolic", "evaluated", None],
-) -> ArrayT:
-    """
-    This function uses the operation ``op`` to reduce the tensor ``value``
-    along the given axis/axes. It is an implementation detail of the top-level
-    function ``drjit.reduce()`` used to handle tensor arguments.
-
-    The function supports multiple evaluation strategies:
-
-    1. If the desired reduction is over contiguous blocks, it recursively calls
-       :py:func:`drjit.block_reduce` with the same ``mode`` parameter, which is
-       potentially more efficient.
-
-    2. ``mode="evaluated"``: Evaluate the input tensor, then gather and reduce
-       within a symbolic loop to compute the elements of the output tensor.
+class _ReduceGeometry(NamedTuple):
+    """Shape/stride information characterizing a tensor reduction"""
+    axis: Tuple[int, ...]
+    in_shape: Tuple[int, ...]
+    in_strides: Tuple[int, ...]
+    out_shape: Tuple[int, ...]
+    out_strides_i: Tuple[int, ...]
+    out_strides_o: Tuple[int, ...]
+    block_shape: Tuple[int, ...]
+    block_strides: Tuple[int, ...]
+    in_size: int
+    out_size: int
+    block_size: int
 
-       **Caveats**: can be slow when the reduced tensor is small, in which case
-       there isn't enough parallelism to perform the operation efficiently.
-       This strategy requires evaluating the input array, which is potentially
-       costly in terms of CPU/GPU memory.
-
-    3. ``mode="symbolic"``: Issue atomic scatter-reductions to populate the
-       output tensor. Since explicit evaluation and storage are not required,
-       this mode is preferable when the input tensor is very large (e.g., when
-       it would not fit into memory).
-
-       **Caveats**:  Sum reductions are subject to nondeterministic rounding
-       error, and reductions to just a few elements can be subject to
-       *contention*. See :py:func:`drjit.scatter_reduce` for a discussion of
-       both points).
-    """
-    Tensor = type(value)
-    Value = dr.array_t(value)
-    Index = dr.uint32_array_t(Value)
 
-    # Some information about the input shape
-    in_shape = value.shape
+def _reduce_geometry(in_shape: Tuple[int, ...], axis: Tuple[int, ...]) -> _ReduceGeometry:
+    """Compute the shape and strides of a tensor reduction along ``axis``"""
     in_strides = _compute_strides(in_shape)
 
     # Compute the shape and strides of the reduced array, and the
@@ -120,83 +96,112 @@ def tensor_reduce(
             out_shape.append(size)
             out_strides_i.append(in_strides[i])
 
-    # Convert to tuples and compute strides
-    block_shape = tuple(block_shape)
-    block_strides = tuple(block_strides)
-    out_shape = tuple(out_shape)
-    out_strides_o = _compute_strides(out_shape)
+    return _ReduceGeometry(
+        axis=tuple(axis),
+        in_shape=tuple(in_shape),
+        in_strides=in_strides,
+        out_shape=tuple(out_shape),
+        out_strides_i=tuple(out_strides_i),
+        out_strides_o=_compute_strides(tuple(out_shape)),
+        block_shape=tuple(block_shape),
+        block_strides=tuple(block_strides),
+        in_size=dr.prod(in_shape),
+        out_size=dr.prod(out_shape),
+        block_size=dr.prod(block_shape)
+    )
 
-    in_size = dr.prod(in_shape)
-    out_size = dr.prod(out_shape)
-    block_size = dr.prod(block_shape)
-    in_array = value.array
 
-    if mode == "symbolic":
-        symbolic = True
-    elif mode == "evaluated":
-        symbolic = False
-    elif mode is None:
-        state = in_array.state
+# Desired number of threads launched by the first pass of a tree reduction
+_tree_threads: Dict[dr.JitBackend, int] = {
+    dr.JitBackend.LLVM: 1 << 16,
+    dr.JitBackend.CUDA: 1 << 20
+}
 
-        if state is dr.VarState.Symbolic:
-            # Reducing a symbolic variable is probably a bad idea.
-            # As a default policy, let's error out here by trying
-            # to evaluate the variable, which will display a long
-            # and informative error message to the user.
-            #
-            # If a symbolic reduction of a symbolic variable is
-            # truly desired, the user may specify mode="symbolic".
+# Minimum number of elements reduced by each thread of a tree reduction
+_tree_min_chunk: int = 16
 
-            dr.eval(in_array)
 
-        can_reduce = dr.detail.can_scatter_reduce(Value, op)
-        if not can_reduce:
-            symbolic = False
-        else:
-            # Would it be reasonable to evaluate the input array?
-            is_evaluated = state is dr.VarState.Evaluated or state is dr.VarState.Dirty
-            is_big_array = dr.itemsize_v(Value) * in_size > 1024 * 1024 * 1024  # 1 GiB
-            symbolic = not is_evaluated and is_big_array
-    else:
-        raise RuntimeError(
-            'tensor_reduce(): \'mode\' must be "symbolic", "evaluated", or None.'
-        )
+def _tree_parts(in_array: ArrayT, g: _ReduceGeometry) -> int:
+    """
+    Return the number of partial results (a power of two) per output element
+    that a tree reduction should compute, or 1 if it wouldn't be beneficial.
+    """
+    if not g.block_shape:
+        return 1
 
-    if in_size == out_size:
-        # No-op
-        out_array = in_array
-    elif len(block_strides) == 1 and block_strides[0] == 1 and \
+    threads = _tree_threads.get(dr.backend_v(in_array), 0)
+    limit = min(threads // max(g.out_size, 1),
+                g.block_shape[0] // _tree_min_chunk)
+
+    parts = 1
+    while parts * 2 <= limit:
+        parts *= 2
+    return parts
+
+
+def _reduce_strategies(op: dr.ReduceOp, in_array: ArrayT, g: _ReduceGeometry) -> List[str]:
+    """Return the list of strategies that can perform the given reduction"""
+    Value = type(in_array)
+    result = []
+
+    if len(g.block_strides) == 1 and g.block_strides[0] == 1 and \
         (dr.backend_v(in_array) is not dr.JitBackend.CUDA or
-         block_size & (block_size - 1) == 0):
+         g.block_size & (g.block_size - 1) == 0):
+        result.append("block")
+
+    result.append("evaluated")
+
+    if _tree_parts(in_array, g) > 1:
+        result.append("tree")
+
+    if dr.detail.can_scatter_reduce(Value, op):
+        result.append("symbolic")
+
+    return result
+
+
+def _reduce_impl(
+    strategy: str,
+    op: dr.ReduceOp,
+    in_array: ArrayT,
+    g: _ReduceGeometry,
+    mode: Optional[str]
+) -> ArrayT:
+    """Perform a tensor reduction using the specified strategy"""
+    Value = type(in_array)
+    Index = dr.uint32_array_t(Value)
+
+    if strategy == "block":
         # The requested reduction is also doable via dr.block_reduce(), which
         # is going to be more optimized than the other strategies in this file.
-        out_array = dr.block_reduce(op, in_array, block_size, mode)
-    elif out_size == 1:
+        return dr.block_reduce(op, in_array, g.block_size, mode)
+    elif strategy == "flat":
         # The requested reduction is also doable via dr.reduce() in 1D, which
         # is going to be more optimized than the other strategies in this file.
-        out_array = dr.reduce(op, in_array, 0, mode)
-    elif symbolic:
-        index = dr.arange(Index, in_size)
-        offset = dr.zeros(Index, in_size)
+        return dr.reduce(op, in_array, 0, mode)
+    elif strategy == "symbolic":
+        index = dr.arange(Index, g.in_size)
+        offset = dr.zeros(Index, g.in_size)
         ctr = 0
 
-        for i, stride_i in enumerate(in_strides):
+        for i, stride_i in enumerate(g.in_strides):
             pos = index // stride_i
 
-            if i not in axis:
-                offset = dr.fma(pos, out_strides_o[ctr], offset)
+            if i not in g.axis:
+                offset = dr.fma(pos, g.out_strides_o[ctr], offset)
                 ctr += 1
 
             index -= pos * stride_i
 
-        out_array = dr.detail.reduce_identity(Value, op, out_size)
+        out_array = dr.detail.reduce_identity(Value, op, g.out_size)
 
         dr.scatter_reduce(op, out_array, in_array, offset)
-    else:
-        index = dr.arange(Index, out_size)
-        offset = dr.zeros(Index, out_size)
+        return out_array
+    elif strategy == "evaluated":
+        index = dr.arange(Index, g.out_size)
+        offset = dr.zeros(Index, g.out_size)
 
-        for stride_o, stride_i in zip(out_strides_o, out_strides_i):
+        for stride_o, stride_i in zip(g.out_strides_o, g.out_strides_i):
             if stride_i == stride_o:
                 offset += index
                 break
@@ -207,16 +212,274 @@ def tensor_reduce(
 
         out_array = dr.detail.reduce_identity(Value, op)
 
-        out_array = reduce_recursive(
+        return reduce_recursive(
             op=op,
             value=in_array,
-            shape=block_shape,
-            strides=block_strides,
+            shape=g.block_shape,
+            strides=g.block_strides,
             accum=out_array,
             offset=offset,
         )
+    elif strategy == "tree":
+        # First pass: split the outermost block axis into 'parts' chunks that
+        # are reduced in parallel. The partial results of each output element
+        # are stored contiguously, which permits a block reduction in the
+        # second pass.
+        parts = _tree_parts(in_array, g)
+        n0, stride0 = g.block_shape[0], g.block_strides[0]
+        chunk = (n0 + parts - 1) // parts
+
+        index = dr.arange(Index, g.out_size * parts)
+        index_o = index // parts
+        part = index - index_o * parts
+
+        offset = dr.zeros(Index, g.out_size * parts)
+        for stride_o, stride_i in zip(g.out_strides_o, g.out_strides_i):
+            if stride_i == stride_o:
+                offset += index_o
+                break
+
+            pos = index_o // stride_o
+            offset = dr.fma(pos, stride_i, offset)
+            index_o -= pos * stride_o
+
+        start = part * chunk
+        end = dr.minimum(start + chunk, n0)
+        offset = dr.fma(start, stride0, offset)
+
+        partials = dr.while_loop(
+            label="Tree reduction",
+            labels=("k", "offset", "value", "accum"),
+            state=(start, offset, in_array, dr.detail.reduce_identity(Value, op)),
+            cond=lambda k, *args: k < end,
+            body=lambda k, offset, value, accum: (
+                k + 1,
+                offset + Index(stride0),
+                value,
+                reduce_recursive(op, value, g.block_shape[1:],
+                                 g.block_strides[1:], offset, accum),
+            ),
+            max_iterations=-1 if op is dr.ReduceOp.Add else None,
+        )[3]
+
+        # Second pass
+        return dr.block_reduce(op, partials, parts, mode)
+    else:
+        raise RuntimeError(f"tensor_reduce(): unknown strategy \"{strategy}\"!")
+
+
+# In-memory copy of the autotuning cache (lazily loaded from disk)
+_autotune_cache: Optional[Dict[str, str]] = None
+
+# Number of timed repetitions per candidate strategy
+_autotune_reps: int = 3
+
+
+def _autotune_cache_path() -> str:
+    """Return the location of the on-disk autotuning cache"""
+    import os
+    return os.path.join(os.path.expanduser("~"), ".drjit", "reduce_autotune.json")
+
+
+def _autotune_load() -> Dict[str, str]:
+    global _autotune_cache
+    if _autotune_cache is None:
+        import json
+        try:
+            with open(_autotune_cache_path(), "r") as f:
+                _autotune_cache = dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            _autotune_cache = {}
+    return _autotune_cache
+
+
+def _autotune_save() -> None:
+    import os, json
+    path = _autotune_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(_autotune_cache, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError:
+        # The cache is an optimization, don't fail if it can't be written
+        pass
+
+
+def autotune_clear() -> None:
+    """Erase the in-memory and on-disk tensor reduction autotuning cache"""
+    import os
+    global _autotune_cache
+    _autotune_cache = {}
+    try:
+        os.remove(_autotune_cache_path())
+    except OSError:
+        pass
+
+
+def _autotune(
+    op: dr.ReduceOp,
+    in_array: ArrayT,
+    g: _ReduceGeometry,
+    candidates: List[str]
+) -> str:
+    """
+    Benchmark the candidate strategies for a tensor reduction and return the
+    fastest one. Results are cached in memory and on disk.
+    """
+    key = "%s/%s/%s/%s/%s" % (
+        dr.backend_v(in_array).name, op.name, dr.type_v(in_array).name,
+        ",".join(str(s) for s in g.in_shape),
+        ",".join(str(a) for a in g.axis)
+    )
+
+    cache = _autotune_load()
+    strategy = cache.get(key)
+    if strategy in candidates:
+        return strategy
+
+    import time
+
+    # Don't include the cost of computing the input in the measurements
+    dr.eval(in_array)
+    value = dr.detach(in_array)
+
+    timings: Dict[str, float] = {}
+    with dr.suspend_grad():
+        for name in candidates:
+            best = float("inf")
+
+            # The first run compiles the kernel and is not counted
+            for i in range(_autotune_reps + 1):
+                dr.sync_thread()
+                t0 = time.perf_counter()
+                dr.eval(_reduce_impl(name, op, value, g, None))
+                dr.sync_thread()
+                if i > 0:
+                    best = min(best, time.perf_counter() - t0)
+
+            timings[name] = best
+
+    strategy = min(timings, key=lambda k: timings[k])
+    cache[key] = strategy
+    _autotune_save()
+    return strategy
+
+
+def tensor_reduce(
+    op: dr.ReduceOp,
+    value: ArrayT,
+    axis: Tuple[int, ...],
+    mode: Literal["symbolic", "evaluated", "autotune", None],
+) -> ArrayT:
+    """
+    This function uses the operation ``op`` to reduce the tensor ``value``
+    along the given axis/axes. It is an implementation detail of the top-level
+    function ``drjit.reduce()`` used to handle tensor arguments.
 
-    return Tensor(out_array, out_shape)
+    The function supports multiple evaluation strategies:
+
+    1. If the desired reduction is over contiguous blocks, it recursively calls
+       :py:func:`drjit.block_reduce` with the same ``mode`` parameter, which is
+       potentially more efficient.
+
+    2. ``mode="evaluated"``: Evaluate the input tensor, then gather and reduce
+       within a symbolic loop to compute the elements of the output tensor.
+
+       **Caveats**: can be slow when the reduced tensor is small, in which case
+       there isn't enough parallelism to perform the operation efficiently.
+       This strategy requires evaluating the input array, which is potentially
+       costly in terms of CPU/GPU memory.
+
+       When no ``mode`` is specified and the output is small compared to the
+       size of the reduced blocks, the function instead performs a *tree
+       reduction*: the first pass splits the outermost reduced axis into many
+       chunks that are reduced in parallel, and the second pass combines these
+       partial results using :py:func:`drjit.block_reduce`. An explicit
+       ``mode="evaluated"`` always uses the single-pass strategy.
+
+    3. ``mode="symbolic"``: Issue atomic scatter-reductions to populate the
+       output tensor. Since explicit evaluation and storage are not required,
+       this mode is preferable when the input tensor is very large (e.g., when
+       it would not fit into memory).
+
+       **Caveats**:  Sum reductions are subject to nondeterministic rounding
+       error, and reductions to just a few elements can be subject to
+       *contention*. See :py:func:`drjit.scatter_reduce` for a discussion of
+       both points).
+
+    4. ``mode="autotune"``: Benchmark all applicable strategies the first time
+       that a reduction with a given operation, type, shape, axis, and backend
+       is encountered, and use the fastest one. The choice is stored in an
+       on-disk cache (``~/.drjit/reduce_autotune.json``) so that later runs
+       skip the measurements. Symbolic inputs fall back to ``mode=None``.
+    """
+    Tensor = type(value)
+    Value = dr.array_t(value)
+
+    g = _reduce_geometry(value.shape, axis)
+    in_array = value.array
+    state = in_array.state
+
+    if mode == "autotune" and (not dr.is_jit_v(Value) or
+                               state is dr.VarState.Symbolic):
+        # Benchmarking requires evaluation, which isn't possible here
+        mode = None
+
+    if mode is None:
+        if state is dr.VarState.Symbolic:
+            # Reducing a symbolic variable is probably a bad idea.
+            # As a default policy, let's error out here by trying
+            # to evaluate the variable, which will display a long
+            # and informative error message to the user.
+            #
+            # If a symbolic reduction of a symbolic variable is
+            # truly desired, the user may specify mode="symbolic".
+
+            dr.eval(in_array)
+    elif mode != "symbolic" and mode != "evaluated" and mode != "autotune":
+        raise RuntimeError(
+            'tensor_reduce(): \'mode\' must be "symbolic", "evaluated", '
+            '"autotune", or None.'
+        )
+
+    if g.in_size == g.out_size:
+        # No-op
+        return Tensor(in_array, g.out_shape)
+
+    candidates = _reduce_strategies(op, in_array, g)
+
+    # Only substitute the tree reduction when the caller didn't pick a mode
+    auto = mode is None
+
+    if mode == "autotune":
+        if g.out_size == 1 and "block" not in candidates:
+            strategy = "flat"
+        else:
+            strategy = _autotune(op, in_array, g, candidates)
+        mode = None
+    elif "block" in candidates:
+        strategy = "block"
+    elif g.out_size == 1:
+        strategy = "flat"
+    elif mode == "symbolic":
+        strategy = "symbolic"
+    elif mode == "evaluated" or "symbolic" not in candidates:
+        strategy = "evaluated"
+    else:
+        # Would it be reasonable to evaluate the input array?
+        is_evaluated = state is dr.VarState.Evaluated or state is dr.VarState.Dirty
+        is_big_array = dr.itemsize_v(Value) * g.in_size > 1024 * 1024 * 1024  # 1 GiB
+        strategy = "symbolic" if not is_evaluated and is_big_array else "evaluated"
+
+    if auto and strategy == "evaluated" and "tree" in candidates:
+        # Too few outputs to keep the device busy, use a two-pass reduction
+        strategy = "tree"
+
+    out_array = _reduce_impl(strategy, op, in_array, g, mode)
+
+    return Tensor(out_array, g.out_shape)
 
 class PrefixRedOp(dr.CustomOp):
     def eval(self, op: dr.ReduceOp, value: ArrayT, axis: int, exclusive: bool, reverse: bool) -> ArrayT:
@@ -346,3 +609,339 @@ def prefix_reduce(
 
     return result
 
+
+def _segmented_scan(
+    op: dr.ReduceOp,
+    value: ArrayT,
+    seg: dr.AnyArray,
+    max_length: int,
+    arg: Optional[dr.AnyArray] = None
+) -> Tuple[ArrayT, Optional[dr.AnyArray]]:
+    """
+    Compute an inclusive scan over runs of consecutive entries that share the
+    same segment ID ``seg``, where runs have at most ``max_length`` entries.
+
+    The implementation uses recursive doubling: step ``k`` combines every entry
+    with the one ``2**k`` positions earlier if both belong to the same
+    segment. This requires ``ceil(log2(max_length))`` parallel passes over the
+    data. The order of operations only depends on the segment layout, hence the
+    result is deterministic. The last entry of each segment holds its
+    reduction.
+
+    For minimum/maximum reductions, ``arg`` may specify an index associated
+    with each entry. The function then also returns the index of the first
+    entry attaining the minimum/maximum of each prefix.
+    """
+    Value = type(value)
+    Index = type(seg)
+    red_op = _reduce_ops[op]
+    i = dr.arange(Index, len(value))
+
+    step = 1
+    while step < max_length:
+        j = i - step
+        same = i >= step
+        same &= dr.gather(Index, seg, j, same) == seg
+        prev = dr.gather(Value, value, j, same)
+
+        if arg is None:
+            value = dr.select(same, red_op(prev, value), value)
+            dr.eval(value)
+        else:
+            # Ties retain the earlier entry
+            better = (value < prev) if op is dr.ReduceOp.Min else (value > prev)
+            same &= ~better
+            value = dr.select(same, prev, value)
+            arg = dr.select(same, dr.gather(Index, arg, j, same), arg)
+            dr.eval(value, arg)
+
+        step *= 2
+
+    return value, arg
+
+
+def scatter_add_deterministic(
+    target: ArrayT,
+    value: ArrayT,
+    index: dr.AnyArray,
+    active: dr.AnyArray
+) -> None:
+    """
+    Reproducible alternative to ``dr.scatter_add(target, value, index, active)``.
+
+    This function implements the ``deterministic=True`` mode of
+    :py:func:`drjit.scatter_reduce()` and :py:func:`drjit.scatter_add()` for
+    floating point arrays. It stably sorts the updates by their target index,
+    accumulates each resulting segment using a parallel segmented scan with a
+    fixed evaluation order, and finally adds the per-element totals to
+    ``target`` using a conflict-free scatter. The result is bit-wise identical
+    across runs. Besides the sort, the cost is ``O(log m)`` parallel passes,
+    where ``m`` is the largest number of updates targeting the same element.
+    """
+    if dr.flag(dr.JitFlag.SymbolicScope):
+        raise RuntimeError(
+            "drjit.scatter_reduce(): deterministic=True requires the "
+            "evaluation of intermediate results, which is not possible "
+            "within symbolic loops, calls, and conditionals."
+        )
+
+    Value = type(target)
+    Index = dr.uint32_array_t(Value)
+    size = dr.width(value, index, active)
+    target_size = len(target)
+
+    if size == 0 or target_size == 0:
+        return
+
+    def broadcast(arg):
+        return arg if len(arg) == size else dr.tile(arg, size)
+
+    # Disabled and out-of-range entries use the key 'target_size' and thus end
+    # up at the end (the atomic variant ignores out-of-range indices as well)
+    active = active & (index < target_size)
+    key = broadcast(dr.select(active, index, Index(target_size)))
+    value = broadcast(value)
+    dr.eval(key, value)
+
+    from ._sort import radix_sort
+    key, perm = radix_sort(key, target_size.bit_length())
+
+    # Determine the segment of the sorted array that belongs to each target
+    # element. Integer atomics are exact, hence the order does not matter.
+    count = dr.zeros(Index, target_size)
+    dr.scatter_add(count, Index(1), key, key < target_size)
+    end = dr.cumsum(count)
+    valid = count > 0
+
+    # The last entry of each segment holds its total
+    value = dr.gather(Value, value, perm)
+    value = _segmented_scan(dr.ReduceOp.Add, value, key,
+                            dr.max(count, axis=None)[0])[0]
+    accum = dr.gather(Value, value, end - 1, valid)
+
+    dr.scatter_reduce(dr.ReduceOp.Add, target, accum,
+                      dr.arange(Index, target_size), valid,
+                      mode=dr.ReduceMode.NoConflicts)
+
+
+def _segment_reduce_impl(
+    op: dr.ReduceOp,
+    value: ArrayT,
+    offsets: dr.AnyArray,
+    track_arg: bool = False
+) -> Tuple[ArrayT, Optional[dr.AnyArray]]:
+    """
+    Reduce the segments ``value[offsets[i]:offsets[i+1]]`` using a parallel
+    segmented scan (see ``_segmented_scan()``). When ``track_arg`` is set, the
+    function additionally returns the index of the first element attaining
+    the minimum/maximum of each segment.
+    """
+    if dr.flag(dr.JitFlag.SymbolicScope):
+        raise RuntimeError(
+            "drjit.segment_reduce(): this operation requires the evaluation "
+            "of intermediate results, which is not possible within symbolic "
+            "loops, calls, and conditionals."
+        )
+
+    Value = type(value)
+    Index = dr.uint32_array_t(Value)
+    count = len(offsets) - 1
+    size = len(value)
+
+    start = dr.gather(Index, offsets, dr.arange(Index, count))
+    end = dr.gather(Index, offsets, dr.arange(Index, 1, count + 1))
+    identity = dr.detail.reduce_identity(Value, op, count)
+    arg = Index(start) if track_arg else None
+
+    if count == 0 or size == 0:
+        return identity, arg
+
+    # Entries outside of all segments receive a separate ID
+    ids, valid = _segment_ids(offsets, size)
+    ids = dr.select(valid, ids, Index(0xFFFFFFFF))
+
+    value, arg = _segmented_scan(
+        op, value, ids, dr.max(end - start, axis=None)[0],
+        dr.arange(Index, size) if track_arg else None)
+
+    # The last entry of each nonempty segment holds its reduction
+    nonempty = end > start
+    last = end - 1
+    result = dr.select(nonempty, dr.gather(Value, value, last, nonempty), identity)
+    if track_arg:
+        arg = dr.gather(Index, arg, last, nonempty)
+
+    return result, arg
+
+
+def _segment_ids(offsets: dr.AnyArray, size: int) -> Tuple[dr.AnyArray, dr.AnyArray]:
+    """
+    Map every entry of an array with ``size`` elements to the ID of the
+    segment containing it. Returns the IDs along with a mask that identifies
+    entries that are not part of any segment.
+    """
+    Index = type(offsets)
+    count = len(offsets) - 1
+    ids = dr.zeros(Index, size)
+
+    if count > 1:
+        bounds = dr.gather(Index, offsets, dr.arange(Index, 1, count))
+        dr.scatter_add(ids, 1, bounds, bounds < size)
+
+    i = dr.arange(Index, size)
+    valid = (i >= dr.gather(Index, offsets, Index(0))) & \
+            (i < dr.gather(Index, offsets, Index(count)))
+
+    return dr.cumsum(ids), valid
+
+
+class SegmentRedOp(dr.CustomOp):
+    def eval(self, op: dr.ReduceOp, value: ArrayT, offsets: dr.AnyArray) -> ArrayT:
+        self.op = op
+        self.offsets = offsets
+        self.size = len(value)
+
+        result, self.arg = _segment_reduce_impl(
+            op, value, offsets, track_arg=op is not dr.ReduceOp.Add)
+
+        if self.arg is not None:
+            # Empty segments don't have an associated entry
+            Index = type(offsets)
+            count = len(offsets) - 1
+            self.valid = dr.gather(Index, offsets, dr.arange(Index, 1, count + 1)) > \
+                         dr.gather(Index, offsets, dr.arange(Index, count))
+            dr.eval(self.arg, self.valid)
+
+        return result
+
+    def forward(self):
+        grad_in = self.grad_in('value')
+        if self.arg is None:
+            grad_out = _segment_reduce_impl(self.op, grad_in, self.offsets)[0]
+        else:
+            grad_out = dr.gather(type(grad_in), grad_in, self.arg, self.valid)
+        self.set_grad_out(grad_out)
+
+    def backward(self):
+        grad_out = self.grad_out()
+        Value = type(grad_out)
+        if self.arg is None:
+            ids, valid = _segment_ids(self.offsets, self.size)
+            grad_in = dr.gather(Value, grad_out, ids, valid)
+        else:
+            grad_in = dr.zeros(Value, self.size)
+            dr.scatter(grad_in, grad_out, self.arg, self.valid)
+        self.set_grad_in('value', grad_in)
+
+
+def segment_reduce(op: dr.ReduceOp, value: ArrayT, offsets: dr.AnyArray) -> ArrayT:
+    '''
+    Reduce variable-length segments of a flat array.
+
+    Given an array ``offsets`` with ``n+1`` nondecreasing entries (in the style
+    of the *compressed sparse row* format), this function reduces each range
+    ``value[offsets[i]:offsets[i+1]]`` and returns an array with ``n``
+    entries. Empty segments produce the identity element of the reduction
+    (e.g., ``0`` for :py:attr:`drjit.ReduceOp.Add`). This generalizes
+    :py:func:`drjit.block_reduce()` to segments of varying size.
+
+    The implementation computes a parallel segmented scan that requires
+    ``O(log m)`` evaluated passes over the input, where ``m`` is the length of
+    the longest segment. In contrast to the alternative of calling
+    :py:func:`drjit.scatter_reduce()` with per-element segment indices, this
+    avoids atomic operations and produces deterministic results. For the same
+    reason, this operation cannot be used within symbolic loops, calls, or
+    conditionals.
+
+    The operation is differentiable for :py:attr:`drjit.ReduceOp.Add`,
+    :py:attr:`drjit.ReduceOp.Min`, and :py:attr:`drjit.ReduceOp.Max`. In the
+    latter two cases, gradients propagate to the first entry attaining the
+    minimum/maximum value of each segment.
+
+    Args:
+        op (drjit.ReduceOp): The reduction to perform.
+
+        value (ArrayBase): A 1D dynamic array storing the input.
+
+        offsets (ArrayBase): A 1D dynamic unsigned 32-bit integer array
+          specifying the segment boundaries.
+
+    Returns:
+        object: An array of type ``type(value)`` with ``len(offsets)-1``
+        entries storing the reduced segments.
+    '''
+    Value = type(value)
+    if not dr.is_dynamic_v(Value) or dr.depth_v(Value) != 1 or dr.is_tensor_v(Value):
+        raise TypeError("drjit.segment_reduce(): 'value' must be a flat dynamic array!")
+
+    Index = dr.uint32_array_t(Value)
+    if not isinstance(offsets, Index):
+        offsets = Index(offsets)
+
+    if len(offsets) == 0:
+        raise RuntimeError("drjit.segment_reduce(): 'offsets' must contain at least one entry!")
+
+    if dr.grad_enabled(value):
+        if op not in (dr.ReduceOp.Add, dr.ReduceOp.Min, dr.ReduceOp.Max):
+            raise RuntimeError(
+                "drjit.segment_reduce(): differentiation support has only been "
+                "implemented for Add, Min, and Max reductions")
+        return dr.custom(SegmentRedOp, op, value, offsets)
+
+    return _segment_reduce_impl(op, value, offsets)[0]
+
+
+def segment_sum(value: ArrayT, offsets: dr.AnyArray) -> ArrayT:
+    '''
+    Sum variable-length segments of a flat array.
+
+    This function is equivalent to :py:func:`drjit.segment_reduce(drjit.ReduceOp.Add, ...)
+    <segment_reduce>`. The mean value of each segment can be computed by
+    dividing the result by the segment sizes ``offsets[1:] - offsets[:-1]``.
+    '''
+    return segment_reduce(dr.ReduceOp.Add, value, offsets)
+
+
+def reduce_by_key(op: dr.ReduceOp, keys: ArrayT, value: ArrayT) -> Tuple[ArrayT, ArrayT]:
+    '''
+    Reduce runs of consecutive entries that share the same key.
+
+    This function splits ``keys`` into maximal runs of equal consecutive values
+    and reduces the associated entries of ``value`` via
+    :py:func:`drjit.segment_reduce()`. It returns the key of each run along
+    with the reduced values. To reduce *all* entries with the same key
+    regardless of their position, sort the input first, e.g., using
+    :py:func:`drjit.sort_by_key()`.
+
+    .. code-block:: python
+
+       keys, value = dr.sort_by_key(keys, value)
+       unique_keys, sums = dr.reduce_by_key(dr.ReduceOp.Add, keys, value)
+
+    This operation requires evaluating ``keys`` and cannot be used within
+    symbolic loops, calls, or conditionals.
+
+    Args:
+        op (drjit.ReduceOp): The reduction to perform.
+
+        keys (ArrayBase): A 1D dynamic array of keys.
+
+        value (ArrayBase): A 1D dynamic array of the same size storing the
+          values to be reduced.
+
+    Returns:
+        tuple: A pair containing the key of each run and the reduced values.
+    '''
+    Keys = type(keys)
+    Index = dr.uint32_array_t(Keys)
+    size = len(keys)
+
+    if dr.width(value) != size:
+        raise RuntimeError("drjit.reduce_by_key(): 'keys' and 'value' must have the same size!")
+
+    from ._sort import run_offsets
+    offsets = run_offsets(dr.detach(keys))
+    start = dr.gather(Index, offsets, dr.arange(Index, len(offsets) - 1))
+
+    return (dr.gather(Keys, keys, start),
+            segment_reduce(op, value, offsets))
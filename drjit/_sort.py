@@ -0,0 +1,603 @@
+import drjit as dr
+from typing import Dict, Optional, Tuple, TypeVar, Any
+
+ArrayT = TypeVar("ArrayT", bound=dr.ArrayBase)
+
+# Number of key bits processed by each pass of the radix sort
+_sort_digit_bits: int = 8
+
+# Number of threads that the radix sort aims to launch on each backend
+_sort_threads: Dict[dr.JitBackend, int] = {
+    dr.JitBackend.LLVM: 1 << 14,
+    dr.JitBackend.CUDA: 1 << 16,
+}
+
+# Minimum number of elements that a thread should process sequentially
+_sort_min_chunk: int = 256
+
+
+def radix_sort(
+    key: ArrayT,
+    bits: int,
+    perm: Optional[dr.AnyArray] = None
+) -> Tuple[ArrayT, dr.AnyArray]:
+    """
+    Stably sort an unsigned 32/64-bit integer JIT array whose entries are
+    smaller than ``2**bits``.
+
+    This is a least significant digit radix sort processing
+    ``_sort_digit_bits`` bits per pass. The input is split into contiguous
+    chunks that are processed sequentially by separate threads. Each pass
+    first builds a histogram of digits per chunk, then converts it into
+    output offsets via a prefix sum over the digit-major histogram table, and
+    finally moves every element to its destination. Each chunk owns a private
+    set of counters, hence there is no contention, and elements are never
+    reordered within a digit. The result is therefore deterministic.
+
+    When specified, ``perm`` provides an initial permutation that is reordered
+    along with the keys (this enables multi-key sorts). The function returns
+    the sorted keys along with the resulting permutation.
+    """
+    Key = type(key)
+    Index = dr.uint32_array_t(Key)
+    size = len(key)
+
+    if perm is None:
+        perm = dr.arange(Index, size)
+
+    if size <= 1 or bits <= 0:
+        return key, perm
+
+    chunks = max(1, min(size // _sort_min_chunk,
+                        _sort_threads[dr.backend_v(Key)]))
+    chunk_size = (size + chunks - 1) // chunks
+    chunks = (size + chunk_size - 1) // chunk_size
+
+    thread = dr.arange(Index, chunks)
+    start = thread * chunk_size
+    end = dr.minimum(start + chunk_size, size)
+
+    for shift in range(0, bits, _sort_digit_bits):
+        digit_mask = (1 << min(_sort_digit_bits, bits - shift)) - 1
+        buckets = digit_mask + 1
+
+        def slot(k):
+            return Index((k >> shift) & digit_mask) * chunks + thread
+
+        # Pass 1: digit histogram of each chunk
+        hist = dr.zeros(Index, buckets * chunks)
+
+        def count_body(i):
+            dr.scatter_add(hist, 1, slot(dr.gather(Key, key, i)))
+            return (i + 1,)
+
+        dr.while_loop(
+            label="Radix sort (histogram)",
+            labels=("i",),
+            state=(Index(start),),
+            cond=lambda i: i < end,
+            body=count_body,
+        )
+
+        # Pass 2: move elements to their sorted position
+        offset = dr.prefix_sum(hist)
+        key_out = dr.empty(Key, size)
+        perm_out = dr.empty(Index, size)
+
+        def move_body(i):
+            k = dr.gather(Key, key, i)
+            pos = dr.scatter_inc(offset, slot(k))
+            dr.scatter(key_out, k, pos)
+            dr.scatter(perm_out, dr.gather(Index, perm, i), pos)
+            return (i + 1,)
+
+        dr.while_loop(
+            label="Radix sort (scatter)",
+            labels=("i",),
+            state=(Index(start),),
+            cond=lambda i: i < end,
+            body=move_body,
+        )
+
+        key, perm = key_out, perm_out
+        dr.eval(key, perm)
+
+    return key, perm
+
+
+def _sort_key(value: ArrayT, descending: bool) -> Tuple[Any, int]:
+    """
+    Map the entries of a flat JIT array to unsigned integers with the same
+    ordering. Returns the converted keys and their bit count.
+    """
+    Value = type(value)
+    vt = dr.type_v(Value)
+
+    if vt == dr.VarType.Bool or not (dr.is_float_v(Value) or
+                                     dr.is_integral_v(Value)):
+        raise TypeError("drjit.sort(): unsupported array type!")
+
+    if vt == dr.VarType.Float16:
+        value = dr.float32_array_t(Value)(value)
+    elif dr.itemsize_v(Value) < 4:
+        value = (dr.int32_array_t(Value) if dr.is_signed_v(Value)
+                 else dr.uint32_array_t(Value))(value)
+
+    Value = type(value)
+    bits = dr.itemsize_v(Value) * 8
+    Key = dr.uint32_array_t(Value) if bits == 32 else dr.uint64_array_t(Value)
+    sign = 1 << (bits - 1)
+
+    if dr.is_float_v(Value):
+        key = dr.reinterpret_array(Key, value)
+        key = dr.select(key >= sign, ~key, key | sign)
+    elif dr.is_signed_v(Value):
+        key = dr.reinterpret_array(Key, value) ^ sign
+    else:
+        key = Key(value)
+
+    if descending:
+        key = ~key
+
+    return key, bits
+
+
+def _argsort_flat(value: ArrayT, segment_size: int, descending: bool) -> dr.AnyArray:
+    """
+    Stable argsort of a flat array consisting of contiguous segments of size
+    ``segment_size`` that are sorted independently. The returned indices are
+    relative to the start of the array.
+    """
+    Value = type(value)
+    Index = dr.uint32_array_t(Value)
+    size = len(value)
+    segments = size // segment_size if segment_size > 0 else 0
+
+    if not dr.is_jit_v(Value):
+        # Sort on the host
+        perm = []
+        for s in range(segments):
+            base = s * segment_size
+            perm.extend(sorted(range(base, base + segment_size),
+                               key=lambda i: value[i], reverse=descending))
+        return Index(perm)
+
+    key, bits = _sort_key(value, descending)
+    dr.eval(key)
+    key, perm = radix_sort(key, bits)
+
+    # A stable sort by the segment ID preserves the order within segments
+    if segments > 1:
+        segment_id = perm // segment_size
+        _, perm = radix_sort(segment_id, (segments - 1).bit_length(), perm)
+
+    return perm
+
+
+def _sort_impl(value, axis: int, descending: bool, name: str):
+    """
+    Shared implementation of :py:func:`sort` and :py:func:`argsort`. Returns
+    the argsort result along with the flat gather indices that produce the
+    sorted array.
+    """
+    Value = type(value)
+
+    if dr.is_tensor_v(Value):
+        shape = value.shape
+        flat = value.array
+    elif dr.is_dynamic_v(Value) and dr.depth_v(Value) == 1:
+        shape = (len(value),)
+        flat = value
+    else:
+        raise TypeError(f"drjit.{name}(): expected a flat dynamic array or "
+                        "a tensor!")
+
+    ndim = len(shape)
+    if axis < 0:
+        axis += ndim
+    if axis < 0 or axis >= ndim:
+        raise RuntimeError(f"drjit.{name}(): axis is out of bounds!")
+
+    Index = dr.uint32_array_t(type(flat))
+    n = shape[axis]
+    inner = 1
+    for s in shape[axis + 1:]:
+        inner *= s
+
+    # When the sorting axis is not the last one, first gather the elements
+    # so that every sorted slice is contiguous in memory
+    transpose = inner > 1 and dr.width(flat) > 0
+    if transpose:
+        t = dr.arange(Index, len(flat))
+        seg, j = t // n, t % n
+        o, i = seg // inner, seg % inner
+        to_flat = (o * n + j) * inner + i
+        flat = dr.gather(type(flat), flat, to_flat)
+
+    perm = _argsort_flat(dr.detach(flat), n, descending)
+
+    if transpose:
+        # Undo the transposition
+        f = dr.arange(Index, len(flat))
+        o, rem = f // (n * inner), f % (n * inner)
+        j, i = rem // inner, rem % inner
+        perm = dr.gather(Index, perm, (o * inner + i) * n + j)
+        src = dr.gather(Index, to_flat, perm)
+    else:
+        src = perm
+
+    return perm % n if n > 0 else perm, src, shape
+
+
+def sort(value: ArrayT, axis: int = -1, descending: bool = False) -> ArrayT:
+    '''
+    Sort the entries of a flat array or tensor along the specified axis.
+
+    The sort is *stable*, i.e., it preserves the relative order of equal
+    elements. On the JIT backends, it is implemented using a parallel radix sort
+    that processes 8 bits of the (suitably transformed) key per pass, which
+    makes its cost proportional to the bit width of the input type. Floating
+    point values are ordered according to their sign and magnitude, with
+    negative and positive NaN values ending up at the beginning and end of the
+    array, respectively.
+
+    The operation is differentiable: the output is computed using a
+    :py:func:`drjit.gather()` with the sorting permutation, hence gradients
+    propagate to the associated input entries.
+
+    This function requires evaluating the input array and cannot be used within
+    symbolic loops, calls, or conditionals.
+
+    Args:
+        value (ArrayBase): A 1D dynamic array or tensor storing integers or
+          floating point values.
+
+        axis (int): The axis along which to sort. The default (``-1``) refers to
+          the last axis.
+
+        descending (bool): Sort in descending order? The default is ``False``.
+
+    Returns:
+        object: A sorted copy of the input with the same type and shape.
+    '''
+    _, src, shape = _sort_impl(value, axis, descending, "sort")
+    Value = type(value)
+
+    if dr.is_tensor_v(Value):
+        return Value(dr.gather(type(value.array), value.array, src), shape)
+    else:
+        return dr.gather(Value, value, src)
+
+
+def argsort(value: ArrayT, axis: int = -1, descending: bool = False) -> Any:
+    '''
+    Return the indices that sort a flat array or tensor along the specified axis.
+
+    This function is analogous to :py:func:`drjit.sort()`, but it returns the
+    positions of the sorted elements along ``axis`` instead of their values.
+    The result uses the unsigned 32-bit counterpart of the input type (e.g.,
+    :py:class:`drjit.cuda.UInt` for :py:class:`drjit.cuda.Float`, or
+    :py:class:`drjit.cuda.TensorXu` for :py:class:`drjit.cuda.TensorXf`).
+
+    The permutation is stable and deterministic, which makes it useful to
+    reorder work items before dispatching them with :py:func:`drjit.switch()`
+    or a vectorized method call so that threads with the same callee are
+    processed together:
+
+    .. code-block:: python
+
+       perm = dr.argsort(callee_index)
+       callee_index = dr.gather(UInt32, callee_index, perm)
+       args = dr.gather(type(args), args, perm)
+       result = dr.switch(callee_index, funcs, args)
+
+       # Scatter the results back to their original position
+       result_orig = dr.empty(type(result), dr.width(result))
+       dr.scatter(result_orig, result, perm)
+
+    Args:
+        value (ArrayBase): A 1D dynamic array or tensor storing integers or
+          floating point values.
+
+        axis (int): The axis along which to sort. The default (``-1``) refers to
+          the last axis.
+
+        descending (bool): Sort in descending order? The default is ``False``.
+
+    Returns:
+        object: The sorting permutation.
+    '''
+    perm, _, shape = _sort_impl(value, axis, descending, "argsort")
+    Value = type(value)
+
+    if dr.is_tensor_v(Value):
+        return dr.uint32_array_t(Value)(perm, shape)
+    else:
+        return perm
+
+
+def sort_by_key(keys: ArrayT, values: Any, descending: bool = False) -> Tuple[ArrayT, Any]:
+    '''
+    Sort an array of keys and reorder associated values accordingly.
+
+    This function stably sorts the 1D array ``keys`` (see
+    :py:func:`drjit.sort()` for details) and applies the same permutation to
+    ``values``, which can be an arbitrary Dr.Jit array or :ref:`PyTree
+    <pytrees>` with compatible width (e.g., a :py:class:`drjit.cuda.Array3f`
+    or a dataclass holding per-thread state).
+
+    Gradients propagate through both outputs.
+
+    Args:
+        keys (ArrayBase): A 1D dynamic array storing integers or floating
+          point values.
+
+        values (object): The values associated with each key.
+
+        descending (bool): Sort in descending order? The default is ``False``.
+
+    Returns:
+        tuple: The sorted keys and reordered values.
+    '''
+    Keys = type(keys)
+    if not dr.is_dynamic_v(Keys) or dr.depth_v(Keys) != 1 or dr.is_tensor_v(Keys):
+        raise TypeError("drjit.sort_by_key(): 'keys' must be a flat dynamic array!")
+
+    perm = _argsort_flat(dr.detach(keys), len(keys), descending)
+
+    return (dr.gather(Keys, keys, perm),
+            dr.gather(type(values), values, perm))
+
+
+def run_offsets(value: ArrayT) -> dr.AnyArray:
+    """
+    Split a flat array into maximal runs of equal consecutive entries and
+    return CSR-style offsets with one more entry than there are runs.
+    """
+    Value = type(value)
+    Index = dr.uint32_array_t(Value)
+    size = len(value)
+
+    i = dr.arange(Index, size)
+    prev = dr.gather(Value, value, i - 1, i > 0)
+    start = dr.compress((i == 0) | (value != prev))
+    count = len(start)
+
+    offsets = dr.empty(Index, count + 1)
+    dr.scatter(offsets, start, dr.arange(Index, count))
+    dr.scatter(offsets, size, Index(count))
+    return offsets
+
+
+def _histogram_impl(
+    index: dr.AnyArray,
+    bins: int,
+    active: dr.AnyArray,
+    weights: Optional[ArrayT] = None
+) -> Any:
+    """
+    Accumulate ``weights`` (or ones) into ``bins`` bins selected by ``index``.
+
+    The input is split into contiguous chunks that are processed sequentially
+    by separate threads, each of which owns a private sub-histogram. A final
+    block reduction merges them. This avoids the heavy contention of a direct
+    atomic scatter-addition when there are few bins, and the accumulation
+    order is deterministic.
+    """
+    Index = type(index)
+    Mask = dr.mask_t(Index)
+    Count = Index if weights is None else type(weights)
+    active = Mask(active)
+    size = max(len(index), len(active), 0 if weights is None else len(weights))
+
+    # Privatization only pays off when there are many updates per bin. It
+    # also doesn't support differentiation through the symbolic loop below.
+    chunks = min(size // _sort_min_chunk,
+                 _sort_threads[dr.backend_v(Index)],
+                 (4 * size) // max(bins, 1))
+
+    if chunks <= 1 or (weights is not None and dr.grad_enabled(weights)):
+        hist = dr.zeros(Count, bins)
+        dr.scatter_add(hist, 1 if weights is None else weights, index, active)
+        return hist
+
+    def broadcast(arg):
+        return arg if len(arg) == size else dr.tile(arg, size)
+
+    index, active = broadcast(index), broadcast(active)
+    if weights is not None:
+        weights = broadcast(weights)
+        dr.eval(weights)
+    dr.eval(index, active)
+
+    chunk_size = (size + chunks - 1) // chunks
+    chunks = (size + chunk_size - 1) // chunk_size
+
+    thread = dr.arange(Index, chunks)
+    start = thread * chunk_size
+    end = dr.minimum(start + chunk_size, size)
+
+    hist = dr.zeros(Count, bins * chunks)
+
+    def body(i):
+        w = 1 if weights is None else dr.gather(Count, weights, i)
+        dr.scatter_add(hist, w,
+                       dr.gather(Index, index, i) * chunks + thread,
+                       dr.gather(Mask, active, i))
+        return (i + 1,)
+
+    dr.while_loop(
+        label="Histogram",
+        labels=("i",),
+        state=(Index(start),),
+        cond=lambda i: i < end,
+        body=body,
+    )
+
+    return dr.block_sum(hist, chunks)
+
+
+def histogram(
+    values: ArrayT,
+    bins: int,
+    range: Optional[Tuple[float, float]] = None,
+    weights: Optional[ArrayT] = None
+) -> Tuple[Any, ArrayT]:
+    '''
+    Compute a histogram of a flat JIT array.
+
+    This function follows the conventions of :py:func:`numpy.histogram`: it
+    partitions the interval ``range`` into ``bins`` equal-sized bins and counts
+    the entries of ``values`` (or accumulates the associated ``weights``) that
+    fall into each of them. The last bin includes the upper end of the
+    interval. Entries outside of the interval and NaN values are ignored.
+
+    Each thread accumulates a contiguous part of the input into a private
+    sub-histogram, and these are merged at the end. Building histograms with
+    few bins therefore does not serialize on a handful of atomic counters.
+
+    When ``range`` is not specified, it defaults to the minimum and maximum of
+    ``values``, which requires evaluating the input. A user-specified ``range``
+    must have an upper end that is larger than its lower end.
+
+    Args:
+        values (ArrayBase): A 1D dynamic floating point or integer array.
+
+        bins (int): The number of bins.
+
+        range (tuple[float, float] | None): The lower and upper end of the
+          binned interval.
+
+        weights (ArrayBase | None): Optional weights that should be accumulated
+          instead of counting entries.
+
+    Returns:
+        tuple: The histogram (an unsigned 32-bit integer array, or an array of
+        type ``type(weights)`` when weights are given) and the ``bins+1`` bin
+        edges.
+    '''
+    Value = type(values)
+    if not dr.is_jit_v(Value) or dr.depth_v(Value) != 1 or dr.is_tensor_v(Value):
+        raise TypeError("drjit.histogram(): 'values' must be a flat JIT array!")
+    if bins <= 0:
+        raise RuntimeError("drjit.histogram(): 'bins' must be positive!")
+
+    Index = dr.uint32_array_t(Value)
+    Float = dr.float32_array_t(Value) if dr.itemsize_v(Value) <= 4 \
+        else dr.float64_array_t(Value)
+    x = Float(dr.detach(values))
+
+    if range is None:
+        lo, hi = dr.min(x, axis=None)[0], dr.max(x, axis=None)[0]
+        if hi <= lo:
+            hi = lo + 1
+    else:
+        lo, hi = range
+        if not hi > lo:
+            raise RuntimeError("drjit.histogram(): the upper end of 'range' "
+                               "must be larger than the lower end!")
+
+    scale = bins / (hi - lo)
+    active = (x >= lo) & (x <= hi)
+    index = Index(dr.minimum(dr.floor((x - lo) * scale), bins - 1))
+
+    hist = _histogram_impl(index, bins, active, weights)
+    return hist, dr.linspace(Float, lo, hi, bins + 1)
+
+
+def bincount(
+    value: dr.AnyArray,
+    weights: Optional[ArrayT] = None,
+    minlength: int = 0
+) -> Any:
+    '''
+    Count the number of occurrences of each value in an array of nonnegative
+    integers.
+
+    This function follows the conventions of :py:func:`numpy.bincount`. The
+    result has ``max(dr.max(value)+1, minlength)`` entries, which requires
+    evaluating the input unless it is empty. Like NumPy, the function raises
+    an exception when a signed input contains negative entries. See
+    :py:func:`drjit.histogram()` for details on how counts are accumulated.
+
+    Args:
+        value (ArrayBase): A 1D dynamic integer array.
+
+        weights (ArrayBase | None): Optional weights that should be accumulated
+          instead of counting entries.
+
+        minlength (int): Minimum number of bins.
+
+    Returns:
+        object: The bin counts (an unsigned 32-bit integer array, or an array
+        of type ``type(weights)`` when weights are given).
+    '''
+    Value = type(value)
+    if not dr.is_jit_v(Value) or dr.depth_v(Value) != 1 or dr.is_tensor_v(Value):
+        raise TypeError("drjit.bincount(): 'value' must be a flat JIT array!")
+
+    if dr.is_signed_v(Value) and len(value) > 0 and \
+       dr.min(value, axis=None)[0] < 0:
+        raise RuntimeError("drjit.bincount(): 'value' must not contain "
+                           "negative entries!")
+
+    Index = dr.uint32_array_t(Value)
+    value = Index(value)
+    bins = minlength
+    if len(value) > 0:
+        bins = max(bins, dr.max(value, axis=None)[0] + 1)
+
+    return _histogram_impl(value, bins, True, weights)
+
+
+def run_length_encode(value: ArrayT) -> Tuple[ArrayT, dr.AnyArray]:
+    '''
+    Compress runs of equal consecutive entries of a flat JIT array.
+
+    For example, the input ``[5, 5, 1, 1, 1, 5]`` produces the values
+    ``[5, 1, 5]`` and counts ``[2, 3, 1]``. This operation requires evaluating
+    the input array.
+
+    Args:
+        value (ArrayBase): A 1D dynamic array.
+
+    Returns:
+        tuple: The value of each run, and the run lengths stored in an unsigned
+        32-bit integer array.
+    '''
+    Value = type(value)
+    if not dr.is_jit_v(Value) or dr.depth_v(Value) != 1 or dr.is_tensor_v(Value):
+        raise TypeError("drjit.run_length_encode(): 'value' must be a flat JIT array!")
+
+    Index = dr.uint32_array_t(Value)
+    offsets = run_offsets(dr.detach(value))
+    count = len(offsets) - 1
+    start = dr.gather(Index, offsets, dr.arange(Index, count))
+    end = dr.gather(Index, offsets, dr.arange(Index, 1, count + 1))
+
+    return dr.gather(Value, value, start), end - start
+
+
+def unique(value: ArrayT, return_counts: bool = False) -> Any:
+    '''
+    Return the sorted unique entries of a flat JIT array.
+
+    This function sorts the input using :py:func:`drjit.sort()` and then
+    removes duplicates using :py:func:`drjit.run_length_encode()`.
+
+    Args:
+        value (ArrayBase): A 1D dynamic integer or floating point array.
+
+        return_counts (bool): If set to ``True``, the function additionally
+          returns the number of occurrences of each unique entry.
+
+    Returns:
+        object: The unique entries, or a tuple additionally containing the
+        counts stored in an unsigned 32-bit integer array.
+    '''
+    result, counts = run_length_encode(sort(value))
+
+    if return_counts:
+        return result, counts
+    else:
+        return result
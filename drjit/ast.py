@@ -29,7 +29,7 @@ T = TypeVar("T")
 T2 = TypeVar("T2")
 
 class _SyntaxVisitor(ast.NodeTransformer):
-    def __init__(self, recursive, filename, line_offset):
+    def __init__(self, recursive, filename, line_offset, dr_names=()):
         super().__init__()
 
         # Keep track of read/written variables
@@ -52,6 +52,9 @@ class _SyntaxVisitor(ast.NodeTransformer):
         self.filename = filename
         self.line_offset = line_offset
 
+        # Global names that refer to the 'drjit' module (e.g., 'dr')
+        self.dr_names = set(dr_names)
+
     def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
         if self.recursive or self.depth == 0:
             # Process only the outermost function
@@ -224,6 +227,15 @@ class _SyntaxVisitor(ast.NodeTransformer):
                         "a list of names (e.g., [a, b]). General expressions "
                         "are not allowed here.",
                     )
+            elif k.arg == "hoist":
+                if not isinstance(k.value, ast.Constant) or \
+                   not isinstance(k.value.value, bool):
+                    self.raise_syntax_error(
+                        node,
+                        "The 'hoist' parameter of dr.hint() must be set to "
+                        "the constant True or False.",
+                    )
+                value = k.value
             else:
                 value = k.value
             hints[k.arg] = value
@@ -236,6 +248,8 @@ class _SyntaxVisitor(ast.NodeTransformer):
             "max_iterations",
             "strict",
             "compress",
+            "block_iterations",
+            "hoist",
         ]
         for k2 in hints.keys():
             if k2 not in valid_keys:
@@ -427,7 +441,7 @@ class _SyntaxVisitor(ast.NodeTransformer):
         ]
 
         for k, v in hints.items():
-            if k == "include" or k == "exclude":
+            if k == "include" or k == "exclude" or k == "hoist":
                 continue
             call_kwargs.append(ast.keyword(arg=k, value=v))
 
@@ -487,11 +501,142 @@ class _SyntaxVisitor(ast.NodeTransformer):
             comment_end,
         ]
 
+    def hoist_invariants(self, node: ast.While, state: List[str]) -> List[ast.stmt]:
+        """
+        Move loop-invariant assignments out of a transformed ``while`` loop.
+
+        A top-level statement ``name = expr`` of the loop body is hoisted when
+        ``expr`` is free of side effects, when none of the variables it reads
+        are written or possibly mutated by the loop, and when ``name`` is a
+        temporary of the loop body (i.e., not part of the loop state, assigned
+        only once, and not read before this assignment). The statement then
+        runs once before the loop, and the loop body and condition refer to
+        the result, which reduces the size of the generated loop.
+        """
+
+        # Names written anywhere in the loop (including nested constructs)
+        written = set()
+        assign_count: dict = {}
+        for n in ast.walk(node):
+            if isinstance(n, ast.Name) and not isinstance(n.ctx, ast.Load):
+                written.add(n.id)
+                assign_count[n.id] = assign_count.get(n.id, 0) + 1
+            elif isinstance(n, ast.arg):
+                written.add(n.arg)
+
+        # Names that may be mutated in-place (attribute/subscript stores,
+        # method calls, and arguments of arbitrary function calls)
+        def base_name(n: ast.AST) -> Optional[str]:
+            while isinstance(n, (ast.Attribute, ast.Subscript, ast.Starred)):
+                n = n.value
+            return n.id if isinstance(n, ast.Name) else None
+
+        mutated = set()
+        for n in ast.walk(node):
+            if isinstance(n, (ast.Attribute, ast.Subscript)) and \
+               not isinstance(n.ctx, ast.Load):
+                mutated.add(base_name(n))
+            elif isinstance(n, ast.Call) and not self.is_pure_call(n):
+                mutated.add(base_name(n.func))
+                for a in list(n.args) + [k.value for k in n.keywords]:
+                    mutated.add(base_name(a))
+
+        variant = written | mutated
+        read_before = set()
+        for n in ast.walk(node.test):
+            if isinstance(n, ast.Name):
+                read_before.add(n.id)
+
+        hoisted, body = [], []
+        for stmt in node.body:
+            target = None
+            if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and \
+               isinstance(stmt.targets[0], ast.Name):
+                target = stmt.targets[0].id
+
+            if target is not None and \
+               assign_count.get(target, 0) == 1 and \
+               target not in read_before and \
+               target not in state and \
+               self.is_pure_expr(stmt.value, variant):
+                hoisted.append(stmt)
+                variant.discard(target)
+                continue
+
+            # Everything read or written by this statement precedes later ones
+            for n in ast.walk(stmt):
+                if isinstance(n, ast.Name):
+                    read_before.add(n.id)
+            body.append(stmt)
+
+        if not body:
+            # Keep the loop body syntactically valid
+            body.append(ast.Pass())
+        node.body = body
+
+        return hoisted
+
+    # Functions that are known to be free of side effects
+    pure_funcs = {
+        "abs", "sqrt", "rsqrt", "rcp", "cbrt", "exp", "exp2", "log", "log2",
+        "sin", "cos", "tan", "asin", "acos", "atan", "atan2", "sinh", "cosh",
+        "tanh", "asinh", "acosh", "atanh", "erf", "erfinv", "power", "square",
+        "minimum", "maximum", "clip", "clamp", "fma", "select", "floor", "ceil",
+        "round", "trunc", "sign", "copysign", "mulsign", "lerp", "dot", "norm",
+        "squared_norm", "normalize", "cross", "safe_sqrt", "safe_asin",
+        "safe_acos", "detach", "deg2rad", "rad2deg", "sincos", "isnan", "isinf",
+        "isfinite",
+    }
+
+    def is_pure_call(self, node: ast.Call) -> bool:
+        # Only recognize calls like 'dr.sqrt(..)', where 'dr' is a global
+        # name referring to the Dr.Jit module
+        return isinstance(node.func, ast.Attribute) and \
+            isinstance(node.func.value, ast.Name) and \
+            node.func.value.id in self.dr_names and \
+            node.func.attr in self.pure_funcs
+
+    def is_pure_expr(self, node: ast.AST, variant: set) -> bool:
+        """
+        Check if an expression is free of side effects and only reads names
+        that aren't in the set ``variant``
+        """
+        if isinstance(node, ast.Name):
+            return node.id not in variant
+        elif isinstance(node, ast.Constant):
+            return True
+        elif isinstance(node, ast.Attribute):
+            return self.is_pure_expr(node.value, variant)
+        elif isinstance(node, ast.BinOp):
+            return self.is_pure_expr(node.left, variant) and \
+                self.is_pure_expr(node.right, variant)
+        elif isinstance(node, ast.UnaryOp):
+            return not isinstance(node.op, ast.Not) and \
+                self.is_pure_expr(node.operand, variant)
+        elif isinstance(node, (ast.Tuple, ast.List)):
+            return all(self.is_pure_expr(e, variant) for e in node.elts)
+        elif isinstance(node, ast.Subscript):
+            return self.is_pure_expr(node.value, variant) and \
+                self.is_pure_expr(node.slice, variant)
+        elif isinstance(node, ast.Call):
+            return self.is_pure_call(node) and \
+                self.is_pure_expr(node.func, variant) and \
+                all(self.is_pure_expr(a, variant) for a in node.args) and \
+                all(k.arg is not None and self.is_pure_expr(k.value, variant)
+                    for k in node.keywords)
+        return False
+
     def visit_While(self, node: ast.While):
         (node, state, _, hints, is_scalar) = self.rewrite_and_track(node)
         if is_scalar:
             return node
 
+        # Move loop-invariant computation out of the loop (opt-in)
+        hoisted = []
+        hoist = hints.get("hoist", None)
+        if isinstance(hoist, ast.Constant) and hoist.value is True:
+            hoisted = self.hoist_invariants(node, state)
+
         # 1. Names of generated functions
         loop_name = "_loop"
         cond_name = loop_name + "_cond"
@@ -556,7 +701,7 @@ class _SyntaxVisitor(ast.NodeTransformer):
             ),
         ]
         for k, v in hints.items():
-            if k == "include" or k == "exclude":
+            if k == "include" or k == "exclude" or k == "hoist":
                 continue
             call_kwargs.append(ast.keyword(arg=k, value=v))
 
@@ -604,6 +749,7 @@ class _SyntaxVisitor(ast.NodeTransformer):
 
         return [
             comment_start,
+            *hoisted,
             cond_func,
             body_func,
             comment_mid,
@@ -865,7 +1011,8 @@ def syntax(
     if print_code:
         print(f"Input code\n----------\n{ast.unparse(old_ast)}\n")
 
-    new_ast = _SyntaxVisitor(recursive, filename, line_offset).visit(old_ast)
+    dr_names = [k for k, v in f.__globals__.items() if v is sys.modules["drjit"]]
+    new_ast = _SyntaxVisitor(recursive, filename, line_offset, dr_names).visit(old_ast)
     new_ast = ast.fix_missing_locations(new_ast)
 
     if print_ast:
@@ -896,7 +1043,8 @@ def hint(
     label: Optional[str] = None,
     include: Optional[List[object]] = None,
     exclude: Optional[List[object]] = None,
-    strict: bool = True
+    strict: bool = True,
+    hoist: bool = False
 ) -> T:
     """
     Within ordinary Python code, this function is unremarkable: it returns the
@@ -1019,5 +1167,23 @@ def hint(
        manually include or exclude a local variable from this process---
        specify a list of such variables to the :py:func:`drjit.hint`
        annotation to do so.
+
+    6. ``hoist=True`` enables the hoisting of loop-invariant computation.
+
+       When this hint is specified on a ``while`` loop, the
+       :py:func:`@drjit.syntax <drjit.syntax>` decorator moves simple
+       assignments of the form ``name = expr`` out of the loop body when they
+       compute the same value in every iteration. This is the case when
+       ``expr`` only consists of arithmetic, indexing, attribute lookups, and
+       calls to side effect-free Dr.Jit functions accessed through the
+       ``drjit`` module (e.g., ``dr.sqrt()``), and when it only reads
+       variables that the loop does not modify. Such expressions are then
+       evaluated once instead of being part of every iteration, which shrinks
+       the generated loop.
+
+       The transformation is disabled by default, since it assumes that
+       indexing and attribute lookups are free of side effects. Note also
+       that hoisted expressions are evaluated even when the loop performs
+       zero iterations.
     """
     return arg
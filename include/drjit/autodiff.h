@@ -53,6 +53,14 @@ enum class ADFlag : uint32_t {
     /// Don't fail when the input to a ``dr::forward`` or ``backward`` operation
     /// is not a differentiable array.
     AllowNoGrad = 8,
+
+    /// Reduce all gradient contributions to a scalar variable at once instead
+    /// of launching a separate reduction for each edge.
+    FuseAccum = 16,
+
+    /// Skip edges that cannot affect any gradient observable after the
+    /// traversal (backward mode only, requires ``ClearInterior``).
+    Prune = 32,
 };
 
 constexpr uint32_t operator |(ADFlag f1, ADFlag f2)   { return (uint32_t) f1 | (uint32_t) f2; }
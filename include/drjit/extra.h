@@ -213,6 +213,33 @@ extern DRJIT_EXTRA_EXPORT const char *ad_var_whos();
 /// Return GraphViz markup describing registered variables and their connectivity
 extern DRJIT_EXTRA_EXPORT const char *ad_var_graphviz();
 
+/// AD memory allocation statistics reported by \ref ad_alloc_stats()
+struct ADAllocStats {
+    /// Number of variables and edges that are currently in use
+    size_t variables, edges;
+
+    /// Largest number of simultaneously used variables and edges
+    size_t variables_peak, edges_peak;
+
+    /// Number of variable and edge allocations
+    uint64_t variables_allocated, edges_allocated;
+
+    /// Time in seconds, over which the above peak and allocation counts were
+    /// collected (i.e., since the last reset)
+    double elapsed;
+};
+
+/**
+ * \brief Query statistics about the allocation of AD variables and edges
+ *
+ * When ``reset`` is nonzero, the function subsequently restarts the
+ * collection of peak usage and allocation counts.
+ */
+extern DRJIT_EXTRA_EXPORT void ad_alloc_stats(ADAllocStats *stats, int reset);
+
+/// Return the number of edges skipped by the calling thread's last traversal
+extern DRJIT_EXTRA_EXPORT size_t ad_pruned_edges();
+
 /// Indicate that the program entered a scope which modifies the AD layer's behavior
 extern DRJIT_EXTRA_EXPORT void ad_scope_enter(drjit::ADScope type, size_t size,
                                               const uint64_t *indices, int symbolic);
@@ -364,7 +391,22 @@ typedef void (*ad_loop_delete)(void *payload);
  * \param compress
  *     Set this to \c 1 for compress the state of evaluated loops at each
  *     operation, \c 0 to use a simpler masking-based implementation, and \c -1
- *     to select the mode automatically.
+ *     to select the mode automatically. The value \c 2 selects an adaptive
+ *     mode that masks inactive entries until their fraction drops below
+ *     \c compress_threshold, and then compresses the loop state.
+ *
+ * \param compress_threshold
+ *     Fraction of active entries (in the interval [0, 1]) below which the
+ *     adaptive mode (<tt>compress == 2</tt>) switches to compression. This
+ *     parameter is ignored by the other modes.
+ *
+ * \param block_iterations
+ *     When this value is greater than one, each kernel launch of an evaluated
+ *     loop runs a nested symbolic loop performing up to this many iterations
+ *     while keeping the loop state in registers. The loop state is written
+ *     back (and potentially compressed) between these blocks. This is not
+ *     compatible with derivative tracking, in which case the loop falls back
+ *     to one iteration per launch. Symbolic loops ignore this parameter.
  *
  * \param name
  *     A descriptive name used in debug message / GraphViz visualizations
@@ -405,12 +447,24 @@ typedef void (*ad_loop_delete)(void *payload);
  * already been destroyed.
  */
 extern DRJIT_EXTRA_EXPORT bool ad_loop(JitBackend backend, int symbolic, int compress,
+                                       float compress_threshold,
                                        long long max_iterations,
+                                       uint32_t block_iterations,
                                        const char *name, void *payload,
                                        ad_loop_read read_cb, ad_loop_write write_cb,
                                        ad_loop_cond cond_cb, ad_loop_body body_cb,
                                        ad_loop_delete delete_cb, bool ad);
 
+/**
+ * \brief Return the number of active entries in each iteration of the most
+ * recent evaluated loop that ran in compressed or adaptive mode (for profiling)
+ *
+ * When the loop executed blocks of several iterations per kernel launch, the
+ * function instead reports the number of active entries at the beginning of
+ * each block.
+ */
+extern DRJIT_EXTRA_EXPORT void ad_loop_active_counts(drjit::vector<uint32_t> &counts);
+
 // Callbacks used by \ref ad_cond() below. See the interface for details
 typedef void (*ad_cond_body)(void *payload, bool value,
                              const drjit::vector<uint64_t> &args_i,
@@ -84,7 +84,7 @@ StateD while_loop_impl(std::index_sequence<Is...>, State &&state_, Cond &&cond,
             new Payload{ std::forward<State>(state_), std::forward<Cond>(cond),
                          std::forward<Body>(body), Mask() });
 
-        bool all_done = ad_loop(Mask::Backend, -1, -1, 0, name, payload.get(), read_cb,
+        bool all_done = ad_loop(Mask::Backend, -1, -1, 0.f, 0, 1, name, payload.get(), read_cb,
                                 write_cb, cond_cb, body_cb, delete_cb, true);
 
         StateD state = std::move(payload->state);
@@ -8,7 +8,7 @@
  *
  * Forward and reverse-mode traversal build on three main data structures:
  *
- * - ``state.variable``: A list that stores ``Variable`` instances underlying
+ * - ``state.variables``: A list that stores ``Variable`` instances underlying
  *   variable IDs. It stores the gradient associated with each variable and
  *   links into the ``state.edges`` list to specify the variable's connectivity.
  *
@@ -23,6 +23,15 @@
  *   call to ``ad_traverse()``. This list is thread-local in contrast to the
  *   previous two data structures that are shared by all threads.
  *
+ * The variable and edge lists are split into several *shards*, each with its
+ * own lock. The high bits of a variable or edge index identify its shard.
+ * Threads allocate variables in separate shards. Frequent operations that only
+ * involve variables of a single shard (e.g., arithmetic, reference counting,
+ * gradient access, and the enqueuing and traversal of graphs that don't leave
+ * the shard) just lock that shard, which allows threads that build and
+ * differentiate independent AD graphs to proceed concurrently. All other
+ * operations lock the entire state (see ``StateGuard``).
+ *
  * To understand how everything fits together, start by looking at an arithmetic
  * operation like ``ad_var_add()``, which triggers ``ad_var_new()`` to allocate
  * a new variable. Next, look at and ``ad_traverse()``, which traverses the AD
@@ -52,8 +61,10 @@
 #include <tsl/robin_set.h>
 #include <tsl/robin_map.h>
 #include <nanobind/intrusive/counter.inl>
-#include <queue>
+#include <chrono>
 #include <mutex>
+#include <shared_mutex>
+#include <atomic>
 
 namespace dr = drjit;
 
@@ -71,10 +82,10 @@ using nanobind::ref;
 // Aliases for various indices to clarify their use in the code below
 // ==========================================================================
 
-/// Index of an AD edge within ``state.edges``
+/// Index of an AD edge (the high bits identify the shard, see ``shard_id()``)
 using EdgeIndex = uint32_t;
 
-/// Index of an AD variable within ``state.variables``
+/// Index of an AD variable (the high bits identify the shard)
 using ADIndex   = uint32_t;
 
 /// Index of a Jit variable managed by drjit-core
@@ -208,7 +219,10 @@ enum VariableFlags : uint8_t {
     Visited = 1 << 4,
 
     /// Is this variable on an iteration boundary of an evaluated loop?
-    LoopBoundary = 1 << 5
+    LoopBoundary = 1 << 5,
+
+    /// Is this variable connected to a variable in another shard?
+    CrossShard = 1 << 6
 };
 
 /**
@@ -287,6 +301,16 @@ struct Variable {
             free(label);
     }
 
+    /// Return the edge weight ``v2``, or zero where the gradient ``v1`` is zero
+    static JitVar masked_weight(const JitVar &v1, const JitVar &v2) {
+        // Elide the zero check if ``v2`` is known not to be NaN/infinite
+        if (jit_var_is_finite_literal(v2.index()))
+            return v2;
+
+        JitVar zero = scalar(v1.index(), 0.f);
+        return dr::select(v1 == zero, zero, v2);
+    }
+
     /**
      * \brief Multiply-accumulate a gradient (i.e., ``grad += v1*v2``), where
      * ``v2`` is typically the weight of an AD edge.
@@ -301,13 +325,7 @@ struct Variable {
      * implementation considers a few different cases and optimizations.
      */
     void mul_accum(const JitVar &v1, const JitVar &v2, size_t src_size) {
-        JitVar zero = scalar(v1.index(), 0.f), weight;
-
-        // Elide the zero check if ``v2`` is known not to be NaN/infinite
-        if (jit_var_is_finite_literal(v2.index()))
-            weight = v2;
-        else
-            weight = dr::select(v1 == zero, zero, v2);
+        JitVar weight = masked_weight(v1, v2);
 
         if (size == 1 && src_size != 1) {
             /* When this variable is scalar (size == 1) and the source is
@@ -336,6 +354,32 @@ struct Variable {
         }
     }
 
+    /**
+     * \brief Variant of \ref mul_accum() that postpones the reduction needed
+     * when this variable is scalar and the source is not.
+     *
+     * The unreduced product ``v1*v2`` is accumulated into ``partial``, which
+     * the caller must later pass to \ref accum(). This turns a sequence of
+     * edges into a scalar variable into a single reduction. The function
+     * returns ``false`` and does nothing if the reduction cannot be
+     * postponed, or when ``partial`` holds a value of a different size.
+     */
+    bool mul_accum_partial(JitVar &partial, const JitVar &v1,
+                           const JitVar &v2, size_t src_size) const {
+        if (size != 1 || src_size == 1 || v1.size() != src_size ||
+            (partial.valid() && partial.size() != src_size))
+            return false;
+
+        JitVar weight = masked_weight(v1, v2);
+
+        if (partial.valid())
+            partial = dr::fmadd(v1, weight, partial);
+        else
+            partial = v1 * weight;
+
+        return true;
+    }
+
     /**
      * \brief Accumulate a gradient 'v' originating from another variable of
      * size 'src_size' into the current variable.
@@ -373,35 +417,101 @@ struct Variable {
     }
 };
 
-/// Represents the global state of the AD system
-struct State {
-    /// std::mutex protecting the state data structure
+/// Number of bits of a variable/edge index that identify its shard
+static constexpr uint32_t ShardBits = 3;
+
+/// Number of shards of the AD state
+static constexpr uint32_t ShardCount = 1u << ShardBits;
+
+/// Bit position and mask of the shard-local part of a variable/edge index
+static constexpr uint32_t ShardShift = 32 - ShardBits,
+                          ShardMask = (1u << ShardShift) - 1;
+
+/// Return the shard associated with a variable or edge index
+inline uint32_t shard_id(uint32_t index) { return index >> ShardShift; }
+
+/// A part of the global AD state that can be locked independently
+struct Shard {
+    /// std::mutex protecting the shard data structure
     std::mutex mutex;
 
-    /// Hash table mapping variable IDs to variable instances
+    /// Variable instances indexed by the low part of the variable ID
     std::vector<Variable> variables;
 
     /// List of all edges (used and unused ones)
     std::vector<Edge> edges;
 
-    /// Sorted list of currently unused edges and vertices
-    std::priority_queue<ADIndex, std::vector<ADIndex>, std::greater<uint32_t>> unused_variables;
-    std::priority_queue<EdgeIndex, std::vector<EdgeIndex>, std::greater<uint32_t>> unused_edges;
+    /// Stacks of currently unused variables and edges (most recent on top)
+    std::vector<ADIndex> unused_variables;
+    std::vector<EdgeIndex> unused_edges;
 
-    /// Counter to establish an ordering among variables
-    uint64_t counter = 0;
+    /// Allocation statistics (see ``ad_alloc_stats()``)
+    size_t variables_peak = 0, edges_peak = 0;
+    uint64_t variables_allocated = 0, edges_allocated = 0;
 
-    /// Are memory leak warnings enabled?
-    bool leak_warnings = true;
+    Shard() {
+        // The first entry is unused so that '0' can represent 'no variable'
+        variables.resize(1);
+        edges.resize(1);
+    }
+
+    /// Number of variables that are currently in use
+    size_t variables_used() const {
+        return variables.size() - unused_variables.size() - 1;
+    }
+
+    /// Number of edges that are currently in use
+    size_t edges_used() const {
+        return edges.size() - unused_edges.size() - 1;
+    }
 
-    State() {
+    /**
+     * \brief Reset the variable and edge lists once the shard no longer
+     * contains any variables
+     *
+     * This discards the free lists, so that subsequent allocations are again
+     * contiguous. The storage of both lists is retained. This function must
+     * not be called while the caller still holds references to edges or
+     * variables of this shard.
+     */
+    void compact() {
+        if (variables.size() == 1 || variables_used() != 0 || edges_used() != 0)
+            return;
         variables.resize(1);
         edges.resize(1);
+        unused_variables.clear();
+        unused_edges.clear();
     }
+};
+
+/// Represents the global state of the AD system
+struct State {
+    /**
+     * Lock protecting the state data structure. Operations that are confined
+     * to a single shard acquire it in shared mode (along with the lock of the
+     * shard), while others acquire it in exclusive mode.
+     */
+    std::shared_mutex mutex;
+
+    /// Independently lockable parts of the AD state
+    Shard shards[ShardCount];
+
+    /// Counter to establish an ordering among variables
+    std::atomic<uint64_t> counter { 0 };
+
+    /// Are memory leak warnings enabled?
+    bool leak_warnings = true;
+
+    /// Time of the last reset of the allocation statistics
+    std::chrono::steady_clock::time_point stats_time =
+        std::chrono::steady_clock::now();
 
     ~State() {
-        size_t vars_used  = variables.size() - unused_variables.size() - 1,
-               edges_used = edges.size() - unused_edges.size() - 1;
+        size_t vars_used = 0, edges_used = 0;
+        for (const Shard &s : shards) {
+            vars_used += s.variables_used();
+            edges_used += s.edges_used();
+        }
 
         if (leak_warnings) {
             if (vars_used) {
@@ -409,14 +519,19 @@ struct State {
                         vars_used);
                 size_t count = 0;
 
-                for (size_t i = 0; i < variables.size(); ++i) {
-                    if (variables[i].ref_count == 0)
-                        continue;
+                for (uint32_t j = 0; j < ShardCount && count < 10; ++j) {
+                    const std::vector<Variable> &variables = shards[j].variables;
+                    for (size_t i = 0; i < variables.size(); ++i) {
+                        if (variables[i].ref_count == 0)
+                            continue;
 
-                    ad_warn(" - variable a%zu (%u references)", i, variables[i].ref_count);
-                    if (++count == 10) {
-                        ad_warn(" - (skipping the rest)");
-                        break;
+                        ad_warn(" - variable a%u (%u references)",
+                                (j << ShardShift) | (uint32_t) i,
+                                variables[i].ref_count);
+                        if (++count == 10) {
+                            ad_warn(" - (skipping the rest)");
+                            break;
+                        }
                     }
                 }
             }
@@ -427,10 +542,18 @@ struct State {
         }
     }
 
+    Shard &shard(uint32_t index) { return shards[shard_id(index)]; }
+
     Variable *operator[](ADIndex index) {
-        if (unlikely(index > variables.size() || variables[index].ref_count == 0))
+        std::vector<Variable> &variables = shard(index).variables;
+        uint32_t i = index & ShardMask;
+        if (unlikely(i >= variables.size() || variables[i].ref_count == 0))
             ad_fail("Referenced an unknown variable a%u!", index);
-        return &variables[index];
+        return &variables[i];
+    }
+
+    Edge &edge(EdgeIndex index) {
+        return shard(index).edges[index & ShardMask];
     }
 };
 
@@ -573,6 +696,12 @@ struct Scope {
     }
 };
 
+/// Special values of 'LocalState::lock' (other values refer to a single shard)
+static constexpr uint32_t LockAll = ShardCount, LockNone = (uint32_t) -1;
+
+/// Counter used to assign shards to threads
+static std::atomic<uint32_t> shard_counter { 0 };
+
 // Stores per-thread state
 struct LocalState {
     /// Thread-local edge list used by ad_enqueue_*() and ad_traverse()
@@ -581,6 +710,18 @@ struct LocalState {
     /// Nested scopes that restrict AD to specific variables
     std::vector<Scope> scopes;
 
+    /// Variables whose deallocation was postponed (see 'ad_free()')
+    std::vector<ADIndex> deferred;
+
+    /// Shard, in which this thread creates new variables
+    uint32_t shard = shard_counter++ % ShardCount;
+
+    /// Lock currently held by this thread
+    uint32_t lock = LockNone;
+
+    /// Number of edges skipped by the last traversal with ADFlag::Prune
+    size_t pruned_edges = 0;
+
     ~LocalState() {
         if (!scopes.empty())
             ad_warn("Scope leak detected (%zu scopes remain in use)!",
@@ -591,16 +732,86 @@ struct LocalState {
 static State state;
 static thread_local LocalState local_state;
 
+static void state_lock(uint32_t lock) {
+    if (lock == LockAll) {
+        state.mutex.lock();
+    } else {
+        state.mutex.lock_shared();
+        state.shards[lock].mutex.lock();
+    }
+    local_state.lock = lock;
+}
+
+static void state_unlock() {
+    uint32_t lock = local_state.lock;
+    if (lock == LockAll) {
+        state.mutex.unlock();
+    } else if (lock != LockNone) {
+        state.shards[lock].mutex.unlock();
+        state.mutex.unlock_shared();
+    }
+    local_state.lock = LockNone;
+}
+
+/**
+ * \brief RAII helper to lock the AD state
+ *
+ * The default constructor locks the entire state. The other constructor only
+ * locks the given shard, in which case the caller may only access variables
+ * and edges of this shard.
+ */
+struct StateGuard {
+    StateGuard() { state_lock(LockAll); }
+    explicit StateGuard(uint32_t shard) { state_lock(shard); }
+    ~StateGuard() { state_unlock(); }
+
+    /// Exchange the lock of a single shard for a lock of the entire state
+    void lock_all() {
+        if (local_state.lock != LockAll) {
+            state_unlock();
+            state_lock(LockAll);
+        }
+    }
+
+    StateGuard(const StateGuard &) = delete;
+    StateGuard &operator=(const StateGuard &) = delete;
+};
+
+/// RAII helper to temporarily release the lock held by the current thread
+struct StateUnlock {
+    uint32_t lock;
+    StateUnlock() : lock(local_state.lock) { state_unlock(); }
+    ~StateUnlock() {
+        if (lock != LockNone)
+            state_lock(lock);
+    }
+    StateUnlock(const StateUnlock &) = delete;
+    StateUnlock &operator=(const StateUnlock &) = delete;
+};
+
 #if defined(DRJIT_SANITIZE_INTENSE)
+// Only reallocate shards that are locked by the current thread
+static bool ad_sanitation_locked(const Shard &s) {
+    uint32_t lock = local_state.lock;
+    return lock == LockAll || (lock != LockNone && &state.shards[lock] == &s);
+}
 static void ad_sanitation_checkpoint_variables() {
-    state.variables.emplace_back();
-    state.variables.pop_back();
-    state.variables.shrink_to_fit();
+    for (Shard &s : state.shards) {
+        if (!ad_sanitation_locked(s))
+            continue;
+        s.variables.emplace_back();
+        s.variables.pop_back();
+        s.variables.shrink_to_fit();
+    }
 }
 static void ad_sanitation_checkpoint_edges() {
-    state.edges.emplace_back();
-    state.edges.pop_back();
-    state.edges.shrink_to_fit();
+    for (Shard &s : state.shards) {
+        if (!ad_sanitation_locked(s))
+            continue;
+        s.edges.emplace_back();
+        s.edges.pop_back();
+        s.edges.shrink_to_fit();
+    }
 }
 static void ad_sanitation_checkpoint_both() {
     ad_sanitation_checkpoint_variables();
@@ -610,7 +821,7 @@ static void ad_sanitation_checkpoint_both() {
 
 
 // Forward declarations
-static void ad_free(ADIndex, Variable *);
+static bool ad_free(ADIndex, Variable *);
 static void ad_var_inc_ref_int(ADIndex index, Variable *v) noexcept;
 
 
@@ -637,8 +848,7 @@ static bool ad_var_dec_ref_int(ADIndex index, Variable *v) noexcept {
         else
             return false;
     } else {
-        ad_free(index, v);
-        return true;
+        return ad_free(index, v);
     }
 }
 
@@ -648,7 +858,7 @@ static void ad_free_edges(uint32_t index, Variable *v) {
     (void) index;
 
     while (edge_id) {
-        Edge &edge = state.edges[edge_id];
+        Edge &edge = state.edge(edge_id);
 
         ad_log("ad_free_edges(): freeing edge a%u -> a%u", edge.source,
                edge.target);
@@ -670,7 +880,7 @@ static void ad_free_edges(uint32_t index, Variable *v) {
                 v2->next_fwd = next_fwd;
             } else {
                 while (true) {
-                    Edge &edge2 = state.edges[fwd];
+                    Edge &edge2 = state.edge(fwd);
                     ad_assert(edge2.source == source,
                               "ad_free_edges(): invalid edge connectivity!");
                     if (edge2.next_fwd != edge_id) {
@@ -683,19 +893,71 @@ static void ad_free_edges(uint32_t index, Variable *v) {
             }
         }
 
-        state.unused_edges.push(edge_id);
+        state.shard(edge_id).unused_edges.push_back(edge_id);
 
         edge_id = next_bwd;
     }
 }
 
-static void ad_free(ADIndex index, Variable *v) {
+/// Would freeing the variable 'index' access data outside of its shard?
+static bool ad_free_crosses_shard(ADIndex index, const Variable *v) {
+    EdgeIndex edge_id = v->next_bwd;
+
+    while (edge_id) {
+        const Edge &edge = state.edge(edge_id);
+        if (edge.is_custom || shard_id(edge.source) != shard_id(index))
+            return true;
+
+        const Variable *v2 = state[edge.source];
+        if (v2->flags & ((uint8_t) VariableFlags::CrossShard |
+                         (uint8_t) VariableFlags::CustomOpOutput))
+            return true;
+
+        edge_id = edge.next_bwd;
+    }
+
+    return false;
+}
+
+/// Free a variable, returns 'false' if this was postponed
+static bool ad_free(ADIndex index, Variable *v) {
+    LocalState &ls = local_state;
+
+    if (unlikely(ls.lock != LockAll && ad_free_crosses_shard(index, v))) {
+        /* Only the variable's shard is locked, but freeing it would also
+           modify other parts of the AD graph. Keep the variable alive for
+           now and free it once the entire state can be locked (see
+           ad_free_deferred()) */
+        ad_trace("ad_free(a%u): postponed", index);
+        v->ref_count = 1;
+        ls.deferred.push_back(index);
+        return false;
+    }
+
     ad_trace("ad_free(a%u)", index);
 
     ad_free_edges(index, v);
 
     *v = Variable { };
-    state.unused_variables.push(index);
+    state.shard(index).unused_variables.push_back(index);
+    return true;
+}
+
+/// Free variables, whose deallocation was postponed by ad_free()
+static void ad_free_deferred() {
+    LocalState &ls = local_state;
+    if (likely(ls.deferred.empty()))
+        return;
+
+    StateGuard guard;
+    while (!ls.deferred.empty()) {
+        ADIndex index = ls.deferred.back();
+        ls.deferred.pop_back();
+        ad_var_dec_ref_int(index, state[index]);
+    }
+
+    for (Shard &s : state.shards)
+        s.compact();
 }
 
 Index ad_var_copy_ref_impl(Index index) JIT_NOEXCEPT {
@@ -710,7 +972,7 @@ Index ad_var_copy_ref_impl(Index index) JIT_NOEXCEPT {
             scopes.back().maybe_disable(ad_index);
 
         if (ad_index) {
-            std::lock_guard<std::mutex> guard(state.mutex);
+            StateGuard guard(shard_id(ad_index));
             ad_var_inc_ref_int(ad_index, state[ad_index]);
         }
     }
@@ -725,7 +987,7 @@ Index ad_var_inc_ref_impl(Index index) JIT_NOEXCEPT {
     jit_var_inc_ref(jit_index);
 
     if (unlikely(ad_index)) {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard(shard_id(ad_index));
         ad_var_inc_ref_int(ad_index, state[ad_index]);
     }
 
@@ -737,7 +999,7 @@ uint32_t ad_var_ref(uint64_t index) {
     uint32_t ad_index = ::ad_index(index);
     if (!ad_index)
         return 0;
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard(shard_id(ad_index));
     return state[ad_index]->ref_count;
 }
 
@@ -748,8 +1010,24 @@ void ad_var_dec_ref_impl(Index index) JIT_NOEXCEPT {
     jit_var_dec_ref(jit_index);
 
     if (unlikely(ad_index)) {
-        std::lock_guard<std::mutex> guard(state.mutex);
-        ad_var_dec_ref_int(ad_index, state[ad_index]);
+        bool custom_op_output;
+
+        /* Lock the variable's shard */ {
+            StateGuard guard(shard_id(ad_index));
+            Variable *v = state[ad_index];
+            custom_op_output = v->flags & (uint8_t) VariableFlags::CustomOpOutput;
+            if (!custom_op_output && ad_var_dec_ref_int(ad_index, v))
+                state.shard(ad_index).compact();
+        }
+
+        // The outputs of custom operations require access to the whole state
+        if (unlikely(custom_op_output)) {
+            StateGuard guard;
+            if (ad_var_dec_ref_int(ad_index, state[ad_index]))
+                state.shard(ad_index).compact();
+        }
+
+        ad_free_deferred();
     }
 }
 
@@ -774,28 +1052,35 @@ char *concat(const char *s1, const char *s2) {
 }
 
 /// Allocate a new variable from the pool
-static std::pair<ADIndex, Variable *> ad_var_new(JitBackend backend,
+static std::pair<ADIndex, Variable *> ad_var_new(uint32_t shard,
+                                                 JitBackend backend,
                                                  size_t size, VarType type,
                                                  bool symbolic,
                                                  bool reuse_indices,
                                                  const char *label) {
 
-    auto &unused = state.unused_variables;
+    Shard &s = state.shards[shard];
+    auto &unused = s.unused_variables;
     ADIndex index;
 
     if (unlikely(unused.empty() || !reuse_indices)) {
-        index = (ADIndex) state.variables.size();
-        state.variables.emplace_back();
+        if (unlikely(s.variables.size() > ShardMask))
+            ad_fail("ad_var_new(): too many AD variables!");
+        index = (shard << ShardShift) | (ADIndex) s.variables.size();
+        s.variables.emplace_back();
     } else {
-        index = unused.top();
-        unused.pop();
+        index = unused.back();
+        unused.pop_back();
     }
 
+    s.variables_allocated++;
+    s.variables_peak = std::max(s.variables_peak, s.variables_used());
+
 #if defined(DRJIT_SANITIZE_INTENSE)
     ad_sanitation_checkpoint_variables();
 #endif
 
-    Variable *v = &state.variables[index];
+    Variable *v = &s.variables[index & ShardMask];
     v->ref_count = 1;
     v->size = size;
     v->counter = state.counter++;
@@ -814,19 +1099,25 @@ static std::pair<ADIndex, Variable *> ad_var_new(JitBackend backend,
     return { index, v };
 }
 
-/// Allocate a new edge from the pool
-static EdgeIndex ad_edge_new() {
-    auto &unused = state.unused_edges;
+/// Allocate a new edge from the pool of the given shard
+static EdgeIndex ad_edge_new(uint32_t shard) {
+    Shard &s = state.shards[shard];
+    auto &unused = s.unused_edges;
     EdgeIndex index;
 
     if (unlikely(unused.empty())) {
-        index = (EdgeIndex) state.edges.size();
-        state.edges.emplace_back();
+        if (unlikely(s.edges.size() > ShardMask))
+            ad_fail("ad_edge_new(): too many AD edges!");
+        index = (shard << ShardShift) | (EdgeIndex) s.edges.size();
+        s.edges.emplace_back();
     } else {
-        index = unused.top();
-        unused.pop();
+        index = unused.back();
+        unused.pop_back();
     }
 
+    s.edges_allocated++;
+    s.edges_peak = std::max(s.edges_peak, s.edges_used());
+
 #if defined(DRJIT_SANITIZE_INTENSE)
     ad_sanitation_checkpoint_edges();
 #endif
@@ -838,7 +1129,7 @@ static EdgeIndex ad_edge_new() {
 static void ad_propagate_size(Variable *v) {
     EdgeIndex edge = v->next_bwd;
     while (edge) {
-        Edge &e = state.edges[edge];
+        Edge &e = state.edge(edge);
         Variable *v2 = state[e.source];
         if ((v2->flags & (uint8_t) VariableFlags::Symbolic) &&
             v2->size != v->size && v2->size == 1) {
@@ -950,8 +1241,6 @@ DRJIT_NOINLINE Index ad_var_new_impl(const char *label, JitVar &&result,
     #pragma GCC diagnostic pop
 #endif
 
-    std::lock_guard<std::mutex> guard(state.mutex);
-
     /* Potentially turn off derivative tracking for some of the operands if
        we're within a scope that enables/disables gradient propagation
        (globally, or only for specific variables) */
@@ -979,6 +1268,24 @@ DRJIT_NOINLINE Index ad_var_new_impl(const char *label, JitVar &&result,
     bool symbolic      = flags & (uint32_t) JitFlag::SymbolicScope,
          reuse_indices = flags & (uint32_t) JitFlag::ReuseIndices;
 
+    /* Place the new variable into the shard of its operands. It suffices to
+       lock this shard unless the operands span several shards, or when
+       symbolic operations could record implicit dependencies. */
+    uint32_t shard = ls.shard;
+    bool lock_all = symbolic, first = true;
+    for (size_t i = 0; i < N; ++i) {
+        ADIndex source = args[i].ad_index;
+        if (!source)
+            continue;
+        if (first)
+            shard = shard_id(source);
+        else if (shard_id(source) != shard)
+            lock_all = true;
+        first = false;
+    }
+
+    StateGuard guard(lock_all ? LockAll : shard);
+
     VarInfo info = jit_set_backend(result.index());
     ReleaseHelper rh;
 
@@ -1006,7 +1313,7 @@ DRJIT_NOINLINE Index ad_var_new_impl(const char *label, JitVar &&result,
         }
     }
 
-    auto [ad_index, var] = ad_var_new(info.backend, info.size, info.type,
+    auto [ad_index, var] = ad_var_new(shard, info.backend, info.size, info.type,
                                       symbolic, reuse_indices, label);
     const char *tname = jit_type_name(info.type);
 
@@ -1044,11 +1351,16 @@ DRJIT_NOINLINE Index ad_var_new_impl(const char *label, JitVar &&result,
 
         Variable *v_source = state[source];
 
-        EdgeIndex edge_index_new = ad_edge_new();
-        Edge &edge = state.edges[edge_index_new];
+        EdgeIndex edge_index_new = ad_edge_new(shard);
+        Edge &edge = state.edge(edge_index_new);
         edge.source = source;
         edge.target = ad_index;
 
+        if (unlikely(shard_id(source) != shard)) {
+            v_source->flags |= (uint8_t) VariableFlags::CrossShard;
+            var->flags |= (uint8_t) VariableFlags::CrossShard;
+        }
+
         if constexpr (std::is_same_v<ArgType, SpecialArg>)
             edge.special = std::move(args[i].special);
         else
@@ -1111,7 +1423,7 @@ JitIndex ad_grad(Index index, bool null_ok) {
     size_t size;
 
     if (ad_index) {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard(shard_id(ad_index));
         const Variable *v = state[ad_index];
         result = v->grad;
         backend = (JitBackend) v->backend;
@@ -1144,7 +1456,7 @@ void ad_clear_grad(Index index) {
         return;
     ad_log("ad_clear_grad(a%u)", ad_index);
 
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard(shard_id(ad_index));
     Variable *v = state[ad_index];
     v->grad = JitVar();
 }
@@ -1162,7 +1474,7 @@ void ad_accum_grad(Index index, JitIndex value) {
     if (unlikely(ad_index == 0))
         return;
 
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard(shard_id(ad_index));
     Variable *v = state[ad_index];
 
     JitVar value_v = JitVar::borrow(value);
@@ -1179,7 +1491,7 @@ void ad_accum_grad(Index index, JitIndex value) {
 }
 
 Index ad_var_set_label(Index index, size_t argc, ...) {
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard;
 
     // First, turn the variable-length argument list into a usable label
     va_list ap;
@@ -1251,79 +1563,141 @@ Index ad_var_set_label(Index index, size_t argc, ...) {
 // Enqueuing of variables and edges
 // ==========================================================================
 
-/// Forward-mode DFS starting from 'index'
-static void ad_dfs_fwd(std::vector<EdgeRef> &todo, uint32_t index,
-                       Variable *v) {
+/**
+ * \brief Can the edges of 'v' be accessed while only its shard is locked?
+ *
+ * This is the case unless the variable is connected to another shard, or
+ * when it is the output of a custom operation (whose reference counting
+ * involves other variables)
+ */
+static bool ad_shard_local(const Variable *v) {
+    return !(v->flags & ((uint8_t) VariableFlags::CrossShard |
+                         (uint8_t) VariableFlags::CustomOpOutput));
+}
+
+/**
+ * Forward-mode DFS starting from 'index'. When the caller only holds the lock
+ * of a single shard (``lock != LockAll``), the function stops and returns
+ * ``false`` upon encountering a variable that isn't local to this shard.
+ */
+static bool ad_dfs_fwd(std::vector<EdgeRef> &todo, uint32_t index,
+                       Variable *v, uint32_t lock) {
     DRJIT_MARK_USED(index);
 
     uint32_t edge_id = v->next_fwd;
     while (edge_id) {
-        Edge &edge = state.edges[edge_id];
+        Edge &edge = state.edge(edge_id);
 
         if (!edge.visited) {
+            Variable *v2 = state[edge.target];
+            if (lock != LockAll && !ad_shard_local(v2))
+                return false;
+
             edge.visited = true;
 
             ad_log("ad_dfs_fwd(): enqueuing edge a%u -> a%u", index,
                    edge.target);
 
-            Variable *v2 = state[edge.target];
             ad_var_inc_ref_int(edge.target, v2);
             todo.emplace_back(edge_id, edge.source, edge.target, v->counter,
                               v2->counter);
 
-            ad_dfs_fwd(todo, edge.target, v2);
+            if (!ad_dfs_fwd(todo, edge.target, v2, lock))
+                return false;
         }
 
         edge_id = edge.next_fwd;
     }
+
+    return true;
 }
 
-/// Reverse-mode DFS starting from 'index'
-static void ad_dfs_bwd(std::vector<EdgeRef> &todo, uint32_t index,
-                       Variable *v) {
+/// Reverse-mode DFS starting from 'index' (see ``ad_dfs_fwd()``)
+static bool ad_dfs_bwd(std::vector<EdgeRef> &todo, uint32_t index,
+                       Variable *v, uint32_t lock) {
     uint32_t edge_id = v->next_bwd;
     while (edge_id) {
-        Edge &edge = state.edges[edge_id];
+        Edge &edge = state.edge(edge_id);
 
         if (!edge.visited) {
+            Variable *v2 = state[edge.source];
+            if (lock != LockAll && !ad_shard_local(v2))
+                return false;
+
             edge.visited = true;
 
             ad_log("ad_dfs_bwd(): enqueuing edge a%u -> a%u", index,
                    edge.source);
 
-            Variable *v2 = state[edge.source];
             ad_var_inc_ref_int(index, v);
             todo.emplace_back(edge_id, edge.source, edge.target, v2->counter, v->counter);
-            ad_dfs_bwd(todo, edge.source, v2);
+            if (!ad_dfs_bwd(todo, edge.source, v2, lock))
+                return false;
         }
 
         edge_id = edge.next_bwd;
     }
+
+    return true;
 }
 
-void ad_enqueue(dr::ADMode mode, Index index) {
-    uint32_t ad_index = ::ad_index(index);
-    if (ad_index == 0)
-        return;
+static void ad_clear_todo(std::vector<EdgeRef> &todo, bool remove_edges);
 
-    ad_log("ad_enqueue_node(a%u, mode=%s)", ad_index,
-           mode == dr::ADMode::Forward ? "forward" : "backward");
+/// Enqueue the edges reachable from 'index' while holding the lock 'lock'
+static bool ad_enqueue_locked(dr::ADMode mode, ADIndex index, uint32_t lock) {
+    std::vector<EdgeRef> &todo = local_state.todo;
+    Variable *v = state[index];
 
-    LocalState &ls = local_state;
+    if (lock != LockAll && !ad_shard_local(v))
+        return false;
+
+    size_t size = todo.size();
+    bool success = false;
 
-    std::lock_guard<std::mutex> guard(state.mutex);
     switch (mode) {
         case dr::ADMode::Forward:
-            ad_dfs_fwd(ls.todo, ad_index, state[ad_index]);
+            success = ad_dfs_fwd(todo, index, v, lock);
             break;
 
         case dr::ADMode::Backward:
-            ad_dfs_bwd(ls.todo, ad_index, state[ad_index]);
+            success = ad_dfs_bwd(todo, index, v, lock);
             break;
 
         default:
             ad_raise("ad_enqueue(): invalid mode specified!");
     }
+
+    if (!success) {
+        // Undo the partial traversal
+        std::vector<EdgeRef> partial(todo.begin() + size, todo.end());
+        todo.resize(size);
+        ad_clear_todo(partial, false);
+    }
+
+    return success;
+}
+
+void ad_enqueue(dr::ADMode mode, Index index) {
+    uint32_t ad_index = ::ad_index(index);
+    if (ad_index == 0)
+        return;
+
+    ad_log("ad_enqueue_node(a%u, mode=%s)", ad_index,
+           mode == dr::ADMode::Forward ? "forward" : "backward");
+
+    /* Graphs built by a single thread usually remain within its shard. Try
+       to enqueue them while only locking this shard, and lock the entire
+       state if the traversal reaches other shards. */
+    bool success;
+    /* Lock the variable's shard */ {
+        StateGuard guard(shard_id(ad_index));
+        success = ad_enqueue_locked(mode, ad_index, shard_id(ad_index));
+    }
+
+    if (!success) {
+        StateGuard guard;
+        ad_enqueue_locked(mode, ad_index, LockAll);
+    }
 }
 
 // ==========================================================================
@@ -1369,10 +1743,10 @@ static void ad_clear_todo(std::vector<EdgeRef> &todo, bool remove_edges) {
             continue; // edge has been moved to another todo list
 
         Variable *source, *target;
-        std::tie(source, target) = ad_lookup_edge(er, state.edges[er.id]);
+        std::tie(source, target) = ad_lookup_edge(er, state.edge(er.id));
 
         if (!remove_edges) {
-            state.edges[er.id].visited = 0;
+            state.edge(er.id).visited = 0;
         } else {
             ad_log("ad_clear_todo(): removing edge a%u -> a%u", er.source,
                    er.target);
@@ -1382,14 +1756,14 @@ static void ad_clear_todo(std::vector<EdgeRef> &todo, bool remove_edges) {
                      edge_id_cur = source->next_fwd;
 
             while (edge_id_cur) {
-                Edge &e2 = state.edges[edge_id_cur];
+                Edge &e2 = state.edge(edge_id_cur);
 
                 ad_assert(e2.source == er.source,
                           "ad_clear_todo(): invalid forward edge connectivity!");
 
                 if (edge_id_cur == er.id) {
                     if (edge_id_prev)
-                        state.edges[edge_id_prev].next_fwd = e2.next_fwd;
+                        state.edge(edge_id_prev).next_fwd = e2.next_fwd;
                     else
                         source->next_fwd = e2.next_fwd;
                     break;
@@ -1408,13 +1782,13 @@ static void ad_clear_todo(std::vector<EdgeRef> &todo, bool remove_edges) {
             edge_id_cur = target->next_bwd;
 
             while (edge_id_cur) {
-                Edge &e2 = state.edges[edge_id_cur];
+                Edge &e2 = state.edge(edge_id_cur);
                 ad_assert(e2.target == er.target,
                           "ad_clear_todo(): invalid backward edge connectivity!");
 
                 if (edge_id_cur == er.id) {
                     if (edge_id_prev)
-                        state.edges[edge_id_prev].next_bwd = e2.next_bwd;
+                        state.edge(edge_id_prev).next_bwd = e2.next_bwd;
                     else
                         target->next_bwd = e2.next_bwd;
                     break;
@@ -1428,8 +1802,8 @@ static void ad_clear_todo(std::vector<EdgeRef> &todo, bool remove_edges) {
                       "ad_clear_todo(): could not find backward edge a%u -> a%u",
                       er.source, er.target);
 
-            state.edges[er.id] = Edge { };
-            state.unused_edges.push(er.id);
+            state.edge(er.id) = Edge { };
+            state.shard(er.id).unused_edges.push_back(er.id);
 
             source = state[er.source];
             ad_var_dec_ref_int(er.source, source);
@@ -1442,23 +1816,104 @@ static void ad_clear_todo(std::vector<EdgeRef> &todo, bool remove_edges) {
     todo.clear();
 }
 
-void ad_traverse(dr::ADMode mode, uint32_t flags) {
-    if (mode != dr::ADMode::Forward && mode != dr::ADMode::Backward)
-        ad_raise("ad_traverse(): invalid mode specified!");
+/**
+ * \brief Determine the vertices of a backward traversal whose gradient
+ * could still be observed once the traversal finishes.
+ *
+ * Interior gradients are cleared when ``ADFlag::ClearInterior`` is set, hence
+ * only gradients arriving at input vertices that are still referenced by
+ * something other than the AD graph survive. The same holds for vertices
+ * created before an isolation scope (whose edges are postponed), and for the
+ * outputs of custom operations. A vertex is useful if it is observable in this
+ * sense, or if it has an edge to a useful vertex. Edges whose source (in the
+ * backward sense) isn't useful can be skipped. The function visits edges
+ * in topological order, so that all edges into a vertex are handled before
+ * those leaving it.
+ */
+static void ad_traverse_prune(const std::vector<EdgeRef> &todo,
+                              uint64_t postpone_before,
+                              tsl::robin_set<uint32_t, UInt32Hasher> &useful) {
+    // Cached per-vertex answer, avoids repeatedly walking the edge lists
+    tsl::robin_map<uint32_t, bool, UInt32Hasher> observable;
 
-    LocalState &ls = local_state;
-    std::vector<EdgeRef> &todo_tls = ls.todo, todo;
-    jit_log(LogLevel::InfoSym,
-            "ad_traverse(): processing %zu edges in %s mode ..", todo_tls.size(),
-            mode == dr::ADMode::Forward ? "forward" : "backward");
+    auto is_observable = [&](uint32_t index) -> bool {
+        auto [it, inserted] = observable.try_emplace(index, false);
+        if (!inserted)
+            return it->second;
 
-    if (todo_tls.empty())
-        return;
+        const Variable *v = state[index];
+        bool result = v->counter < postpone_before ||
+                      (v->flags & (uint8_t) VariableFlags::CustomOpOutput);
+
+        if (!result && v->next_bwd == 0) {
+            // Check if there are references besides the outgoing edges
+            size_t edge_count = 0;
+            for (uint32_t ei = v->next_fwd; ei; ei = state.edge(ei).next_fwd)
+                edge_count++;
+            result = v->ref_count > edge_count;
+        }
 
-    todo.swap(todo_tls);
+        it.value() = result;
+        return result;
+    };
+
+    for (auto it = todo.rbegin(); it != todo.rend(); ++it) {
+        const EdgeRef &er = *it;
+        if (!er.id)
+            continue;
+
+        if (useful.contains(er.source) || is_observable(er.source)) {
+            useful.insert(er.source);
+            useful.insert(er.target);
+        } else if (state.edge(er.id).special) {
+            useful.insert(er.target);
+        }
+    }
+}
+
+/// Return the shard containing all edges of 'todo' and their endpoints (if any)
+static uint32_t ad_traverse_shard(const std::vector<EdgeRef> &todo) {
+    uint32_t shard = shard_id(todo[0].id);
+
+    for (const EdgeRef &er : todo) {
+        if (shard_id(er.id) != shard || shard_id(er.source) != shard ||
+            shard_id(er.target) != shard)
+            return LockAll;
+    }
+
+    return shard;
+}
+
+/**
+ * \brief Can the edges of 'todo' be traversed while only holding the lock of
+ * their shard?
+ *
+ * Special edges may invoke callbacks that access arbitrary parts of the AD
+ * graph, and endpoints connected to other shards have edge lists that reach
+ * into them. The caller must hold the shard lock, since other threads could
+ * otherwise connect the endpoints to other shards after the check.
+ */
+static bool ad_traverse_local(const std::vector<EdgeRef> &todo) {
+    for (const EdgeRef &er : todo) {
+        if (state.edge(er.id).special || !ad_shard_local(state[er.source]) ||
+            !ad_shard_local(state[er.target]))
+            return false;
+    }
+
+    return true;
+}
+
+/// Propagate gradients along the edges of 'todo' and clear the list
+static void ad_traverse_edges(dr::ADMode mode, uint32_t flags,
+                              std::vector<EdgeRef> &todo) {
+    LocalState &ls = local_state;
     bool clear_edges = flags & (uint32_t) dr::ADFlag::ClearEdges;
 
-    std::lock_guard<std::mutex> guard(state.mutex);
+    /* Traversals that stay within a single shard only lock this shard, so
+       that threads can differentiate independent graphs concurrently */
+    StateGuard guard(ad_traverse_shard(todo));
+    if (local_state.lock != LockAll && !ad_traverse_local(todo))
+        guard.lock_all();
     try {
         // Bring the edges into the appropriate order
         std::sort(todo.begin(), todo.end(),
@@ -1479,6 +1934,37 @@ void ad_traverse(dr::ADMode mode, uint32_t flags) {
                 postpone_before = scope.counter;
         }
 
+        /* Skip edges that cannot influence any gradient that is observable
+           once the traversal finishes (only in backward mode, and when
+           interior gradients are cleared anyways) */
+        tsl::robin_set<uint32_t, UInt32Hasher> useful;
+        bool prune = mode == dr::ADMode::Backward &&
+                     (flags & (uint32_t) dr::ADFlag::Prune) &&
+                     (flags & (uint32_t) dr::ADFlag::ClearInterior);
+        size_t pruned = 0;
+        if (prune)
+            ad_traverse_prune(todo, postpone_before, useful);
+
+        /* Unreduced gradient contributions to scalar variables that are
+           postponed with ADFlag::FuseAccum. They are reduced and accumulated
+           all at once before the gradient is needed */
+        bool fuse = flags & (uint32_t) dr::ADFlag::FuseAccum;
+        tsl::robin_map<uint32_t, JitVar, UInt32Hasher> partial;
+
+        auto flush = [&](uint32_t index) {
+            auto it = partial.find(index);
+            if (it == partial.end())
+                return;
+            JitVar value = std::move(it.value());
+            partial.erase(it);
+            state[index]->accum(value, value.size());
+        };
+
+        auto flush_all = [&]() {
+            while (!partial.empty())
+                flush(partial.begin()->first);
+        };
+
         tsl::robin_set<uint32_t, UInt32Hasher> pending;
 
         auto postprocess = [&](uint32_t prev_i, uint32_t cur_i) {
@@ -1500,6 +1986,7 @@ void ad_traverse(dr::ADMode mode, uint32_t flags) {
 
             if (prev->flags & (uint8_t) VariableFlags::LoopBoundary &&
                 !(cur && (cur->flags & (uint8_t) VariableFlags::LoopBoundary))) {
+                flush_all();
                 for (uint32_t todo: pending)
                     jit_var_schedule(state[todo]->grad.index());
                 jit_eval();
@@ -1531,7 +2018,7 @@ void ad_traverse(dr::ADMode mode, uint32_t flags) {
 
         // This is the main AD traversal loop
         for (EdgeRef &er : todo) {
-            Edge &edge = state.edges[er.id];
+            Edge &edge = state.edge(er.id);
 
             Variable *v0, *v1;
             uint32_t v0i = edge.source, v1i = edge.target;
@@ -1542,6 +2029,15 @@ void ad_traverse(dr::ADMode mode, uint32_t flags) {
                 std::swap(v0i, v1i);
             }
 
+            if (prune && !edge.special && !useful.contains(v1i)) {
+                ad_log("ad_traverse(): pruning edge a%u -> a%u (gradient is "
+                       "never read).", v0i, v1i);
+                pruned++;
+                continue;
+            }
+
+            flush(v0i);
+
             size_t grad_size = v0->grad.size();
 
             if (unlikely(v0->counter < postpone_before)) {
@@ -1595,6 +2091,9 @@ void ad_traverse(dr::ADMode mode, uint32_t flags) {
             }
 
             if (unlikely(edge.special)) {
+                // Custom operations may access any gradient
+                flush_all();
+
                 if (mode == dr::ADMode::Forward)
                     edge.special->forward(v0, v1);
                 else
@@ -1602,7 +2101,7 @@ void ad_traverse(dr::ADMode mode, uint32_t flags) {
 
                 if (clear_edges) {
                     // Edge may have been invalidated by callback, look up once more
-                    Edge &edge2 = state.edges[er.id];
+                    Edge &edge2 = state.edge(er.id);
 
                     // Don't clear ``CopyGrad`` edges, the custom op does this
                     if (edge2.copy_grad)
@@ -1611,15 +2110,41 @@ void ad_traverse(dr::ADMode mode, uint32_t flags) {
                     edge2.special.reset();
                 }
             } else {
-                v1->mul_accum(v0->grad, edge.weight, v0->size);
+                bool fused = false;
+
+                if (fuse) {
+                    JitVar &p = partial[v1i];
+                    fused = v1->mul_accum_partial(p, v0->grad, edge.weight, v0->size);
+
+                    // A contribution of a different size, reduce the previous ones
+                    if (!fused && p.valid()) {
+                        flush(v1i);
+                        JitVar &p2 = partial[v1i];
+                        fused = v1->mul_accum_partial(p2, v0->grad, edge.weight, v0->size);
+                    }
+
+                    if (!fused)
+                        partial.erase(v1i);
+                }
+
+                if (!fused)
+                    v1->mul_accum(v0->grad, edge.weight, v0->size);
 
                 if (clear_edges)
                     edge.weight = JitVar();
             }
         }
 
-
+        flush_all();
         postprocess(v0i_prev, 0);
+
+        if (prune) {
+            ls.pruned_edges = pruned;
+            jit_log(LogLevel::Info,
+                    "ad_traverse(): pruned %zu/%zu edges whose gradient is "
+                    "never read.", pruned, todo.size());
+        }
+
         ad_log("ad_traverse(): done.");
     } catch (...) {
         ad_clear_todo(todo, false);
@@ -1627,6 +2152,27 @@ void ad_traverse(dr::ADMode mode, uint32_t flags) {
     }
 
     ad_clear_todo(todo, clear_edges);
+}
+
+void ad_traverse(dr::ADMode mode, uint32_t flags) {
+    if (mode != dr::ADMode::Forward && mode != dr::ADMode::Backward)
+        ad_raise("ad_traverse(): invalid mode specified!");
+
+    LocalState &ls = local_state;
+    std::vector<EdgeRef> &todo_tls = ls.todo, todo;
+    ls.pruned_edges = 0;
+    jit_log(LogLevel::InfoSym,
+            "ad_traverse(): processing %zu edges in %s mode ..", todo_tls.size(),
+            mode == dr::ADMode::Forward ? "forward" : "backward");
+
+    if (todo_tls.empty())
+        return;
+
+    todo.swap(todo_tls);
+    ad_traverse_edges(mode, flags, todo);
+
+    // Free variables, whose deallocation required locking the entire state
+    ad_free_deferred();
 
     if (todo_tls.empty())
         todo_tls.swap(todo);
@@ -1688,7 +2234,7 @@ void ad_scope_enter(ADScope type, size_t size, const Index *indices, int symboli
             scope.isolate = true;
 
             /* access state data structure */ {
-                std::lock_guard<std::mutex> guard(state.mutex);
+                StateGuard guard;
                 scope.counter = state.counter;
             }
 
@@ -1723,13 +2269,13 @@ void ad_scope_leave(bool process_postponed) {
     ad_log("ad_scope_leave(%s)", type_name);
 
     if (scopes.size() < 2 || !scopes[scopes.size() - 2].symbolic) {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         for (uint32_t i: scope.implicit_in)
             ad_var_dec_ref_int(i, state[i]);
         for (uint32_t i: scope.implicit_out)
             ad_var_dec_ref_int(i, state[i]);
     } else {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         Scope &prev = scopes[scopes.size() - 2];
         for (uint32_t i : scope.implicit_in) {
             if (!prev.implicit_in.insert(i).second)
@@ -1761,10 +2307,10 @@ void ad_scope_leave(bool process_postponed) {
             ad_traverse(dr::ADMode::Backward,
                         (uint32_t) dr::ADFlag::ClearVertices);
         } else {
-            std::lock_guard<std::mutex> guard(state.mutex);
+            StateGuard guard;
             for (EdgeRef &er: scope.postponed) {
                 ad_var_dec_ref_int(er.target, state[er.target]);
-                state.edges[er.id].visited = 0;
+                state.edge(er.id).visited = 0;
             }
             scopes.pop_back();
         }
@@ -2210,7 +2756,7 @@ Index ad_var_new(JitIndex i0) {
         VarInfo info = jit_set_backend(i0);
         const char *prefix = jit_prefix(info.backend);
 
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard(shard_id(ad_index(result)));
         Variable *v = state[ad_index(result)];
 
         if (!prefix || !label)
@@ -2235,7 +2781,7 @@ Index ad_var_schedule_force(Index index, int *rv) {
 
     jit_index = jit_var_schedule_force(jit_index, rv);
     if (ad_index) {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         ad_var_inc_ref_int(ad_index, state[ad_index]);
     }
 
@@ -2248,7 +2794,7 @@ Index ad_var_data(Index index, void **ptr) {
 
     jit_index = jit_var_data(jit_index, ptr);
     if (ad_index) {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         ad_var_inc_ref_int(ad_index, state[ad_index]);
     }
 
@@ -2258,7 +2804,7 @@ Index ad_var_data(Index index, void **ptr) {
 void ad_mark_loop_boundary(Index index) {
     ADIndex ad_index = ::ad_index(index);
     if (ad_index) {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         state[ad_index]->flags |= (uint8_t) VariableFlags::LoopBoundary;
     }
 }
@@ -2952,13 +3498,13 @@ public:
           mode(mode) { }
 
     ~PacketGather() {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         for (ADIndex index : m_output_indices)
             ad_var_dec_ref_int(index, state[index]);
     }
 
     void forward() override {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         size_t n = m_output_indices.size();
 
         const Variable *v = state[m_input_indices[0]];
@@ -2976,7 +3522,7 @@ public:
     }
 
     void backward() override {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         size_t n = m_output_indices.size();
 
         index32_vector grad_out;
@@ -3008,7 +3554,7 @@ public:
     void add_output(uint32_t index) {
         add_index(m_backend, index, false);
 
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         ad_var_inc_ref_int(index, state[index]);
     }
 
@@ -3072,7 +3618,7 @@ Index ad_var_scatter(Index target, Index value, JitIndex offset, JitIndex mask,
     if (is_detached(value) && (is_detached(target) || perm_scatter)) {
         ADIndex ad_index = ::ad_index(target);
         if (ad_index) {
-            std::lock_guard<std::mutex> guard(state.mutex);
+            StateGuard guard;
             ad_var_inc_ref_int(ad_index, state[ad_index]);
         }
 
@@ -3139,13 +3685,13 @@ public:
     }
 
     ~PacketScatter() {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         for (uint32_t index: m_output_indices)
             ad_var_dec_ref_int(index, state[index]);
     }
 
     void forward() override {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         JitIndex *grad_in = (JitIndex *)  alloca(sizeof(JitIndex) * m_n);
         size_t n_valid = 0;
         JitVar zero = scalar(m_backend, m_type, 0.0);
@@ -3186,7 +3732,7 @@ public:
     }
 
     void backward() override {
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         JitIndex *out = (JitIndex *)  alloca(sizeof(JitIndex) * m_n);
 
         Variable *v = state[m_output_indices[0]];
@@ -3223,7 +3769,7 @@ public:
 
     void add_output(uint32_t index) {
         add_index(m_backend, index, false);
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         ad_var_inc_ref_int(index, state[index]);
     }
 
@@ -3313,7 +3859,7 @@ void ad_var_scatter_add_kahan(Index *target_1, Index *target_2, Index value,
                                    ReduceOp::Add, ReduceMode::Auto)),
             SpecialArg(*target_1, new MaskEdge(JitMask(true))));
 
-        std::lock_guard<std::mutex> guard(state.mutex);
+        StateGuard guard;
         ad_var_dec_ref_int(ad_index_1, state[ad_index_1]);
 
         Index combined_2 = combine(ad_index_2, target_2_jit);
@@ -3378,13 +3924,16 @@ static const char *type_name_short[(int) VarType::Count] {
 
 
 const char *ad_var_whos() {
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard;
 
     std::vector<uint32_t> indices;
-    for (size_t i = 1; i < state.variables.size(); ++i) {
-        if (state.variables[i].ref_count == 0)
-            continue;
-        indices.emplace_back((uint32_t) i);
+    for (uint32_t j = 0; j < ShardCount; ++j) {
+        const std::vector<Variable> &variables = state.shards[j].variables;
+        for (size_t i = 1; i < variables.size(); ++i) {
+            if (variables[i].ref_count == 0)
+                continue;
+            indices.emplace_back((j << ShardShift) | (uint32_t) i);
+        }
     }
 
     std::sort(indices.begin(), indices.end(), [](uint32_t i0, uint32_t i1) {
@@ -3405,13 +3954,16 @@ const char *ad_var_whos() {
 }
 
 const char *ad_var_graphviz() {
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard;
 
     std::vector<uint32_t> indices;
-    for (size_t i = 1; i < state.variables.size(); ++i) {
-        if (state.variables[i].ref_count == 0)
-            continue;
-        indices.emplace_back((uint32_t) i);
+    for (uint32_t j = 0; j < ShardCount; ++j) {
+        const std::vector<Variable> &variables = state.shards[j].variables;
+        for (size_t i = 1; i < variables.size(); ++i) {
+            if (variables[i].ref_count == 0)
+                continue;
+            indices.emplace_back((j << ShardShift) | (uint32_t) i);
+        }
     }
 
     std::sort(indices.begin(), indices.end(), [](uint32_t i0, uint32_t i1) {
@@ -3557,13 +4109,13 @@ const char *ad_var_graphviz() {
 
         uint32_t edge = v->next_bwd, edge_count = 0;
         while (edge) {
-            edge = state.edges[edge].next_bwd;
+            edge = state.edge(edge).next_bwd;
             edge_count++;
         }
         edge = v->next_bwd;
         uint32_t edge_ctr = edge_count;
         while (edge) {
-            const Edge &e = state.edges[edge];
+            const Edge &e = state.edge(edge);
             if (edge_count == 1)
                 buffer.fmt("    %i -> %i%s;\n", e.target, e.source,
                            e.special ? " [color=red]" : "");
@@ -3587,6 +4139,35 @@ const char *ad_var_graphviz() {
     return buffer.get();
 }
 
+size_t ad_pruned_edges() {
+    return local_state.pruned_edges;
+}
+
+void ad_alloc_stats(ADAllocStats *stats, int reset) {
+    StateGuard guard;
+
+    *stats = ADAllocStats { };
+    for (Shard &s : state.shards) {
+        stats->variables += s.variables_used();
+        stats->edges += s.edges_used();
+        stats->variables_peak += s.variables_peak;
+        stats->edges_peak += s.edges_peak;
+        stats->variables_allocated += s.variables_allocated;
+        stats->edges_allocated += s.edges_allocated;
+
+        if (reset) {
+            s.variables_peak = s.variables_used();
+            s.edges_peak = s.edges_used();
+            s.variables_allocated = s.edges_allocated = 0;
+        }
+    }
+
+    auto now = std::chrono::steady_clock::now();
+    stats->elapsed = std::chrono::duration<double>(now - state.stats_time).count();
+    if (reset)
+        state.stats_time = now;
+}
+
 void ad_set_leak_warnings(int value) { state.leak_warnings = (bool) value; }
 int ad_leak_warnings() { return (int) state.leak_warnings; }
 
@@ -3599,7 +4180,7 @@ void ad_var_check_implicit(uint64_t index) {
     if (ad_index == 0 || !jit_flag(JitFlag::SymbolicScope))
         return;
 
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard;
     Variable *v = state[ad_index];
 
     if (!(v->flags & (uint8_t) VariableFlags::Symbolic)) {
@@ -3665,11 +4246,16 @@ uint32_t ad_record_implicit_dependence(LocalState &ls, ReleaseHelper &rh,
             "   please fix the operation referenced in the stack trace.",
             source, v_source->size);
 
-    auto [ad_index, v] = ad_var_new(backend, 1, (VarType) v_source->type,
-                                    true, reuse_indices, "gather");
+    auto [ad_index, v] = ad_var_new(local_state.shard, backend, 1,
+                                    (VarType) v_source->type, true,
+                                    reuse_indices, "gather");
     v_source = state[source];
-    EdgeIndex edge_index_new = ad_edge_new();
-    Edge &edge = state.edges[edge_index_new];
+    if (shard_id(source) != shard_id(ad_index)) {
+        v_source->flags |= (uint8_t) VariableFlags::CrossShard;
+        v->flags |= (uint8_t) VariableFlags::CrossShard;
+    }
+    EdgeIndex edge_index_new = ad_edge_new(shard_id(ad_index));
+    Edge &edge = state.edge(edge_index_new);
     edge.source = source;
     edge.target = ad_index;
     edge.next_fwd = v_source->next_fwd;
@@ -3753,7 +4339,7 @@ struct PushScope {
                 );
             }
 
-            std::lock_guard<std::mutex> guard(state.mutex);
+            StateGuard guard;
             for (uint32_t i: child_scope.implicit_in)
                 ad_var_dec_ref_int(i, state[i]);
             for (uint32_t i: child_scope.implicit_out)
@@ -3796,7 +4382,7 @@ struct CustomOp : Special {
         if (m_op.get()) {
             ref<dr::detail::CustomOpBase> op = std::move(m_op);
             {
-                unlock_guard<std::mutex> guard(state.mutex);
+                StateUnlock guard;
                 ad_log("ad_free(): freeing custom operation \"%s\"", op->name());
                 op.reset();
             }
@@ -3828,7 +4414,7 @@ struct CustomOp : Special {
         if (m_op.get() && !ad_release_one_output(m_op.get())) {
             ref<dr::detail::CustomOpBase> op = std::move(m_op);
             {
-                unlock_guard<std::mutex> guard(state.mutex);
+                StateUnlock guard;
                 ad_log("ad_free(): freeing custom operation \"%s\"", op->name());
                 op.reset();
             }
@@ -3841,14 +4427,14 @@ struct CustomOp : Special {
         uint32_t next_bwd = source->next_bwd;
 
         for (uint32_t ei = next_bwd; ei != 0; ) {
-            const Edge &e = state.edges[ei];
+            const Edge &e = state.edge(ei);
             if (!swap(e, state[e.source]))
                 break;
             ei = e.next_bwd;
         }
 
         /* leave critical section */ {
-            unlock_guard<std::mutex> guard(state.mutex);
+            StateUnlock guard;
             PushScope push(m_scope);
             scoped_set_flags flag_guard(m_flags);
             m_op->forward();
@@ -3859,7 +4445,7 @@ struct CustomOp : Special {
         #endif
 
         for (uint32_t ei = next_bwd; ei != 0; ) {
-            const Edge &e = state.edges[ei];
+            const Edge &e = state.edge(ei);
             if (!clear(e, state[e.source]))
                 break;
             ei = e.next_bwd;
@@ -3873,14 +4459,14 @@ struct CustomOp : Special {
                "operation \"%s\"..", m_op->name());
 
         for (uint32_t ei = next_fwd; ei; ) {
-            const Edge &e = state.edges[ei];
+            const Edge &e = state.edge(ei);
             if (!swap(e, state[e.target]))
                 break;
             ei = e.next_fwd;
         }
 
         /* leave critical section */ {
-            unlock_guard<std::mutex> guard(state.mutex);
+            StateUnlock guard;
             PushScope push(m_scope);
             scoped_set_flags flag_guard(m_flags);
             m_op->backward();
@@ -3891,7 +4477,7 @@ struct CustomOp : Special {
         #endif
 
         for (uint32_t ei = next_fwd; ei; ) {
-            const Edge &e = state.edges[ei];
+            const Edge &e = state.edge(ei);
             if (!clear(e, state[e.target]))
                 break;
             ei = e.next_fwd;
@@ -3907,9 +4493,14 @@ void ad_add_special(uint32_t v0i, uint32_t v1i, bool is_custom,
         ad_fail("ad_add_special(): internal error!");
     ad_log("ad_add_special(a%u <- a%u)", v1i, v0i);
 
-    uint32_t edge_index_new = ad_edge_new();
+    if (shard_id(v0i) != shard_id(v1i)) {
+        v0->flags |= (uint8_t) VariableFlags::CrossShard;
+        v1->flags |= (uint8_t) VariableFlags::CrossShard;
+    }
+
+    uint32_t edge_index_new = ad_edge_new(shard_id(v1i));
 
-    Edge &edge = state.edges[edge_index_new];
+    Edge &edge = state.edge(edge_index_new);
     edge.source = v0i;
     edge.target = v1i;
     edge.special = std::move(special);
@@ -3962,7 +4553,7 @@ bool ad_custom_op(dr::detail::CustomOpBase *op) {
     ad_log("ad_var_custom_op(\"%s\", n_in=%zu, n_out=%zu)",
            name, inputs.size(), outputs.size());
 
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard;
 
     uint32_t flags = jit_flags();
 
@@ -3975,7 +4566,8 @@ bool ad_custom_op(dr::detail::CustomOpBase *op) {
         ad_log(" - in: a%u", v0i);
         ad_var_inc_ref_int(v0i, state[v0i]);
     } else {
-        auto [idx, v0] = ad_var_new(op->m_backend, 1, VarType::Void, symbolic,
+        auto [idx, v0] = ad_var_new(local_state.shard, op->m_backend, 1,
+                                    VarType::Void, symbolic,
                                     reuse_indices, "CustomOp[in]");
         ad_log("ad_var_new(a%u, \"%s [in]\")", idx, name);
         v0->counter = op->m_counter_offset;
@@ -4001,7 +4593,8 @@ bool ad_custom_op(dr::detail::CustomOpBase *op) {
         ad_log(" - out: a%u", v1i);
         ad_var_inc_ref_int(v1i, v1);
     } else {
-        auto [idx, v1] = ad_var_new(op->m_backend, 1, VarType::Void, symbolic,
+        auto [idx, v1] = ad_var_new(local_state.shard, op->m_backend, 1,
+                                    VarType::Void, symbolic,
                                     reuse_indices, "CustomOp[out]");
         ad_log("ad_var_new(a%u, \"%s [in]\")", idx, name);
         v1->counter = op->m_counter_offset + 1;
@@ -4069,12 +4662,12 @@ static bool DRJIT_NOINLINE ad_decref_custom_op_output(Variable *v) {
     if (v->ref_count != 2 || !next_bwd)
         return false;
 
-    Edge *edge = &state.edges[v->next_bwd];
+    Edge *edge = &state.edge(v->next_bwd);
     if (edge->copy_grad) {
         next_bwd = state[edge->source]->next_bwd;
         if (!next_bwd)
             return false;
-        edge = &state.edges[next_bwd];
+        edge = &state.edge(next_bwd);
     }
 
     ad_assert(edge->is_custom, "ad_decref_custom_op_output(): expected to "
@@ -4097,14 +4690,13 @@ NAMESPACE_BEGIN(drjit)
 NAMESPACE_BEGIN(detail)
 
 CustomOpBase::CustomOpBase() {
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard;
     m_backend = JitBackend::None;
-    m_counter_offset = state.counter;
-    state.counter += 2;
+    m_counter_offset = state.counter.fetch_add(2);
 }
 
 CustomOpBase::~CustomOpBase() {
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard;
 
     for (size_t i = 0, size = m_input_indices.size(); i < size; ++i) {
         ADIndex ad_index = m_input_indices[i];
@@ -4135,7 +4727,7 @@ bool CustomOpBase::add_index(JitBackend backend, ADIndex index, bool input) {
     if (!index)
         return false;
 
-    std::lock_guard<std::mutex> guard(state.mutex);
+    StateGuard guard;
     ad_var_inc_ref_int(index, state[index]);
 
     dr::vector<uint32_t> &indices = input ? m_input_indices
@@ -14,12 +14,27 @@
 
 #include "common.h"
 #include <drjit/custom.h>
+#include <algorithm>
 #include <string>
 
 namespace dr = drjit;
 
 using JitVar = GenericArray<void>;
 
+/// Per-iteration (or per-block) active entry counts of the most recent evaluated loop
+static thread_local dr::vector<uint32_t> loop_active_counts;
+
+/// Count the number of active entries of an evaluated loop mask
+static uint32_t ad_loop_count(JitBackend backend, const JitVar &active) {
+    JitVar active_u32 =
+        JitVar::steal(jit_var_cast(active.index(), VarType::UInt32, 0));
+    JitVar count = JitVar::steal(jit_var_reduce(
+        backend, VarType::UInt32, ReduceOp::Add, active_u32.index()));
+    uint32_t result = 0;
+    jit_var_read(count.index(), 0, &result);
+    return result;
+}
+
 static bool ad_loop_symbolic(JitBackend backend, const char *name,
                              void *payload,
                              ad_loop_read read_cb, ad_loop_write write_cb,
@@ -145,13 +160,17 @@ static bool ad_loop_symbolic(JitBackend backend, const char *name,
     return needs_ad;
 }
 
-// Simple wavefront-style evaluated loop that masks inactive entries
+// Simple wavefront-style evaluated loop that masks inactive entries. When
+// 'threshold' is nonnegative, the loop returns early and sets 'compress' once
+// the fraction of active entries drops below this value.
 static size_t ad_loop_evaluated_mask(JitBackend backend, const char *name,
                                      void *payload, ad_loop_read read_cb,
                                      ad_loop_write write_cb,
                                      ad_loop_cond cond_cb, ad_loop_body body_cb,
-                                     index64_vector indices1,
-                                     JitVar active) {
+                                     index64_vector &indices1,
+                                     JitVar &active, float threshold,
+                                     dr::vector<uint32_t> &counts,
+                                     bool &compress) {
     index64_vector indices2;
     JitVar active_it;
     size_t it = 0;
@@ -161,8 +180,30 @@ static size_t ad_loop_evaluated_mask(JitBackend backend, const char *name,
         // Evaluate the loop state
         jit_eval();
 
-        if (!jit_var_any(active.index()))
-            break;
+        if (threshold < 0.f) {
+            if (!jit_var_any(active.index()))
+                break;
+        } else {
+            uint32_t count = ad_loop_count(backend, active);
+            size_t size = active.size();
+
+            if (count == 0)
+                break;
+
+            // Hand over to ad_loop_evaluated_compress(), which records the
+            // count of this iteration
+            if (size > 1 && (float) count < threshold * (float) size) {
+                jit_log(LogLevel::InfoSym,
+                        "ad_loop_evaluated(\"%s\"): %u/%zu entries remain "
+                        "active, switching to loop state compression.",
+                        name, count, size);
+                compress = true;
+                break;
+            }
+
+            // Record the number of active entries at the start of the iteration
+            counts.push_back(count);
+        }
 
         jit_log(LogLevel::InfoSym,
                 "ad_loop_evaluated(\"%s\"): executing loop iteration %zu.",
@@ -226,7 +267,7 @@ ad_loop_evaluated_compress(JitBackend backend, const char *name, void *payload,
                            ad_loop_read read_cb, ad_loop_write write_cb,
                            ad_loop_cond cond_cb, ad_loop_body body_cb,
                            index64_vector indices,
-                           JitVar active) {
+                           JitVar active, dr::vector<uint32_t> &counts) {
     uint32_t size = (uint32_t) active.size(), it = 0;
 
     JitVar true_mask = JitVar::steal(jit_var_bool(backend, true)),
@@ -393,6 +434,9 @@ ad_loop_evaluated_compress(JitBackend backend, const char *name, void *payload,
         if (size_next == 0)
             break; // all done!
 
+        // Record the number of active entries at the start of the iteration
+        counts.push_back(size_next);
+
         if (size != size_next)
             jit_log(LogLevel::InfoSym,
                     "ad_loop_evaluated(\"%s\"): compressed loop state from %u "
@@ -421,12 +465,168 @@ ad_loop_evaluated_compress(JitBackend backend, const char *name, void *payload,
     return it;
 }
 
+/**
+ * Evaluated loops can execute blocks of several iterations per kernel launch.
+ * For this, the loop body of the evaluated loop is replaced by a nested
+ * symbolic loop that runs up to 'iterations' steps of the original loop body
+ * while keeping the loop state in registers. The state is only written back to
+ * memory (and potentially compressed) once per block. The following payload
+ * and callbacks implement this wrapping.
+ *
+ * Blocks are incompatible with derivative tracking. When the loop body
+ * produces differentiable state (e.g., by reading a captured parameter that
+ * has gradients enabled), the nested loop is abandoned, and the evaluated
+ * loop falls back to executing one iteration per kernel launch.
+ */
+struct LoopBlock {
+    JitBackend backend;
+    const char *name;
+    void *payload;
+    ad_loop_read read_cb;
+    ad_loop_write write_cb;
+    ad_loop_cond cond_cb;
+    ad_loop_body body_cb;
+    uint32_t iterations;
+    /// Set once the loop body was found to require derivative tracking
+    bool needs_ad;
+    /// Iteration counter of the nested symbolic loop
+    JitVar counter;
+    /// Holds a reference to the condition of the nested symbolic loop
+    JitVar cond;
+};
+
+static void loop_block_read_cb(void *p, dr::vector<uint64_t> &indices) {
+    LoopBlock *lb = (LoopBlock *) p;
+    lb->read_cb(lb->payload, indices);
+}
+
+static void loop_block_write_cb(void *p, const dr::vector<uint64_t> &indices,
+                                bool restart) {
+    LoopBlock *lb = (LoopBlock *) p;
+    lb->write_cb(lb->payload, indices, restart);
+}
+
+static uint32_t loop_block_cond_cb(void *p) {
+    LoopBlock *lb = (LoopBlock *) p;
+    return lb->cond_cb(lb->payload);
+}
+
+// The nested symbolic loop extends the loop state by the iteration counter
+static void loop_block_inner_read_cb(void *p, dr::vector<uint64_t> &indices) {
+    LoopBlock *lb = (LoopBlock *) p;
+    lb->read_cb(lb->payload, indices);
+    jit_var_inc_ref(lb->counter.index());
+    indices.push_back(lb->counter.index());
+}
+
+static void loop_block_inner_write_cb(void *p,
+                                      const dr::vector<uint64_t> &indices,
+                                      bool restart) {
+    LoopBlock *lb = (LoopBlock *) p;
+    dr::vector<uint64_t> indices2;
+    indices2.reserve(indices.size() - 1);
+    for (size_t i = 0; i + 1 < indices.size(); ++i)
+        indices2.push_back(indices[i]);
+    lb->write_cb(lb->payload, indices2, restart);
+    lb->counter = JitVar::borrow((uint32_t) indices[indices.size() - 1]);
+}
+
+static uint32_t loop_block_inner_cond_cb(void *p) {
+    LoopBlock *lb = (LoopBlock *) p;
+    uint32_t active = lb->cond_cb(lb->payload);
+    JitVar limit = JitVar::steal(jit_var_u32(lb->backend, lb->iterations)),
+           in_block = JitVar::steal(jit_var_lt(lb->counter.index(), limit.index()));
+    lb->cond = JitVar::steal(jit_var_and(active, in_block.index()));
+    return lb->cond.index();
+}
+
+/// Thrown to abandon a nested symbolic loop that requires derivative tracking
+struct LoopBlockNeedsAD { };
+
+static void loop_block_inner_body_cb(void *p) {
+    LoopBlock *lb = (LoopBlock *) p;
+    lb->body_cb(lb->payload);
+
+    /* The body may have mixed differentiable variables into the loop state.
+       Abort here, so that 'ad_loop_symbolic()' discards the recording and
+       restores the state from before the block. */
+    if (!ad_grad_suspended()) {
+        index64_vector indices;
+        lb->read_cb(lb->payload, indices);
+        for (uint64_t index : indices) {
+            if (index >> 32)
+                throw LoopBlockNeedsAD();
+        }
+    }
+
+    JitVar one = JitVar::steal(jit_var_u32(lb->backend, 1));
+    lb->counter = JitVar::steal(jit_var_add(lb->counter.index(), one.index()));
+}
+
+static void loop_block_body_cb(void *p) {
+    LoopBlock *lb = (LoopBlock *) p;
+
+    if (lb->needs_ad) {
+        lb->body_cb(lb->payload);
+        return;
+    }
+
+    // Start a new block with a per-lane iteration counter
+    size_t size = 1;
+    {
+        index64_vector indices;
+        lb->read_cb(lb->payload, indices);
+        for (uint64_t index : indices) {
+            if (index)
+                size = std::max(size, jit_var_size((uint32_t) index));
+        }
+    }
+    lb->counter = JitVar::steal(jit_var_u32(lb->backend, 0));
+    lb->counter.resize(size);
+
+    index64_vector backup;
+    dr::vector<uint32_t> implicit_in, implicit_out;
+    loop_block_inner_read_cb(lb, backup);
+
+    bool needs_ad = false, abandoned = false;
+    try {
+        needs_ad = ad_loop_symbolic(
+            lb->backend, lb->name, lb, loop_block_inner_read_cb,
+            loop_block_inner_write_cb, loop_block_inner_cond_cb,
+            loop_block_inner_body_cb, backup, implicit_in, implicit_out);
+    } catch (const LoopBlockNeedsAD &) {
+        abandoned = true;
+    }
+
+    lb->counter = JitVar();
+    lb->cond = JitVar();
+
+    // The block started from a differentiable state and was already recorded
+    if (needs_ad && !ad_grad_suspended())
+        jit_raise("ad_loop_evaluated(\"%s\"): executing multiple iterations "
+                  "per kernel launch is incompatible with derivative "
+                  "tracking. Specify 'block_iterations=1'.", lb->name);
+
+    if (abandoned) {
+        jit_log(LogLevel::Warn,
+                "ad_loop_evaluated(\"%s\"): executing multiple iterations "
+                "per kernel launch is incompatible with derivative "
+                "tracking, launching a kernel per iteration instead.",
+                lb->name);
+
+        // The nested loop was discarded, run a single iteration instead
+        lb->needs_ad = true;
+        lb->body_cb(lb->payload);
+    }
+}
+
 static void ad_loop_evaluated(JitBackend backend, const char *name,
                               void *payload, ad_loop_read read_cb,
                               ad_loop_write write_cb,
                               ad_loop_cond cond_cb,
                               ad_loop_body body_cb,
-                              bool compress) {
+                              int compress, float compress_threshold,
+                              uint32_t block_iterations) {
     index64_vector indices;
 
     jit_log(LogLevel::InfoSym,
@@ -450,23 +650,76 @@ static void ad_loop_evaluated(JitBackend backend, const char *name,
 
     size_t size = active.size();
 
-    if (compress && size == 1) {
+    if (compress == 1 && size == 1) {
         jit_log(
             LogLevel::Warn,
             "ad_loop_evaluated(\"%s\"): loop state compression requires a "
             "non-scalar loop condition, switching to the default masked mode!");
-        compress = false;
+        compress = 0;
     }
 
-    size_t it;
-    if (compress)
+    // Potentially execute blocks of several iterations per kernel launch
+    LoopBlock lb{};
+    if (block_iterations > 1) {
+        bool needs_ad = false;
+        if (!ad_grad_suspended()) {
+            index64_vector indices2;
+            read_cb(payload, indices2);
+            for (uint64_t index : indices2)
+                needs_ad |= (index >> 32) != 0;
+        }
+
+        if (needs_ad) {
+            jit_log(LogLevel::Warn,
+                    "ad_loop_evaluated(\"%s\"): executing multiple iterations "
+                    "per kernel launch is incompatible with derivative "
+                    "tracking, launching a kernel per iteration instead.", name);
+        } else {
+            jit_log(LogLevel::InfoSym,
+                    "ad_loop_evaluated(\"%s\"): executing up to %u iterations "
+                    "per kernel launch.", name, block_iterations);
+            lb.backend = backend;
+            lb.name = name;
+            lb.payload = payload;
+            lb.read_cb = read_cb;
+            lb.write_cb = write_cb;
+            lb.cond_cb = cond_cb;
+            lb.body_cb = body_cb;
+            lb.iterations = block_iterations;
+
+            payload = &lb;
+            read_cb = loop_block_read_cb;
+            write_cb = loop_block_write_cb;
+            cond_cb = loop_block_cond_cb;
+            body_cb = loop_block_body_cb;
+        }
+    }
+
+    dr::vector<uint32_t> counts;
+
+    size_t it = 0;
+    if (compress == 1) {
         it = ad_loop_evaluated_compress(backend, name, payload, read_cb,
                                         write_cb, cond_cb, body_cb,
-                                        std::move(indices), std::move(active));
-    else
+                                        std::move(indices), std::move(active),
+                                        counts);
+    } else {
+        // Masked mode. The adaptive variant (compress == 2) switches to
+        // compression once the fraction of active entries becomes small
+        bool switch_mode = false;
         it = ad_loop_evaluated_mask(backend, name, payload, read_cb, write_cb,
-                                    cond_cb, body_cb, std::move(indices),
-                                    std::move(active));
+                                    cond_cb, body_cb, indices, active,
+                                    compress == 2 ? compress_threshold : -1.f,
+                                    counts, switch_mode);
+
+        if (switch_mode)
+            it += ad_loop_evaluated_compress(
+                backend, name, payload, read_cb, write_cb, cond_cb, body_cb,
+                std::move(indices), std::move(active), counts);
+    }
+
+    // Published at the end so that nested loops don't overwrite the statistics
+    loop_active_counts = std::move(counts);
 
     jit_log(LogLevel::Debug,
             "ad_loop_evaluated(\"%s\"): loop finished after %zu iterations.", name, it);
@@ -666,7 +919,7 @@ public:
         }
 
         ad_loop(
-            m_backend, 1, 0, 0, fwd_name.c_str(), this,
+            m_backend, 1, 0, 0.f, 0, 1, fwd_name.c_str(), this,
             [](void *p, dr::vector<uint64_t> &i) { ((LoopOp *) p)->read(i); },
             [](void *p, const dr::vector<uint64_t> &i, bool reset) { ((LoopOp *) p)->write(i, reset); },
             [](void *p) { return ((LoopOp *) p)->fwd_cond(); },
@@ -812,7 +1065,7 @@ public:
         }
 
         ad_loop(
-            m_backend, 1, 0, 0, fwd_name.c_str(), this,
+            m_backend, 1, 0, 0.f, 0, 1, fwd_name.c_str(), this,
             [](void *p, dr::vector<uint64_t> &i) { ((LoopOp *) p)->read(i); },
             [](void *p, const dr::vector<uint64_t> &i, bool reset) { ((LoopOp *) p)->write(i, reset); },
             [](void *p) { return ((LoopOp *) p)->fwd_cond(); },
@@ -886,7 +1139,8 @@ private:
 };
 
 bool ad_loop(JitBackend backend, int symbolic, int compress,
-             long long max_iterations, const char *name, void *payload,
+             float compress_threshold, long long max_iterations,
+             uint32_t block_iterations, const char *name, void *payload,
              ad_loop_read read_cb, ad_loop_write write_cb, ad_loop_cond cond_cb,
              ad_loop_body body_cb, ad_loop_delete delete_cb, bool ad) {
     if (name == nullptr)
@@ -917,12 +1171,18 @@ bool ad_loop(JitBackend backend, int symbolic, int compress,
     if (symbolic != 0 && symbolic != 1)
         jit_raise("'symbolic' must equal 0, 1, or -1.");
 
-    if (compress != 0 && compress != 1)
-        jit_raise("'compress' must equal 0, 1, or -1.");
+    if (compress < -1 || compress > 2)
+        jit_raise("'compress' must equal 0, 1, 2, or -1.");
+
+    if (compress == 2 && !(compress_threshold >= 0.f && compress_threshold <= 1.f))
+        jit_raise("'compress_threshold' must be in the interval [0, 1].");
 
     if (max_iterations < -1)
         jit_raise("'max_iterations' must be >= -1.");
 
+    if (block_iterations == 0)
+        jit_raise("'block_iterations' must be positive.");
+
     if (symbolic) {
         index64_vector indices_in;
         read_cb(payload, indices_in);
@@ -1008,9 +1268,15 @@ bool ad_loop(JitBackend backend, int symbolic, int compress,
 
         scoped_isolation_guard guard;
         ad_loop_evaluated(backend, name, payload, read_cb, write_cb,
-                          cond_cb, body_cb, compress);
+                          cond_cb, body_cb, compress, compress_threshold,
+                          block_iterations);
         guard.disarm();
     }
 
     return true; // Caller should directly call delete()
 }
+
+void ad_loop_active_counts(dr::vector<uint32_t> &counts) {
+    counts = loop_active_counts;
+}
+
@@ -16,6 +16,7 @@
 #include "meta.h"
 #include "init.h"
 #include "base.h"
+#include "profile.h"
 
 static void set_grad_enabled(nb::handle h, bool enable_) {
     struct SetGradEnabled : TraverseCallback {
@@ -300,6 +301,7 @@ static void forward_from(nb::handle_t<dr::ArrayBase> h, uint32_t flags) {
         ::clear_grad(h);
         ::accum_grad(h, h.type()(1.0));
         enqueue_impl(dr::ADMode::Forward, h);
+        scoped_trace_event trace("drjit.forward_from", "ad");
         nb::gil_scoped_release r;
         ad_traverse(dr::ADMode::Forward, flags);
     }
@@ -310,6 +312,7 @@ static void backward_from(nb::handle_t<dr::ArrayBase> h, uint32_t flags) {
         ::clear_grad(h);
         ::accum_grad(h, h.type()(1.0));
         enqueue_impl(dr::ADMode::Backward, h);
+        scoped_trace_event trace("drjit.backward_from", "ad");
         nb::gil_scoped_release r;
         ad_traverse(dr::ADMode::Backward, flags);
     }
@@ -318,6 +321,7 @@ static void backward_from(nb::handle_t<dr::ArrayBase> h, uint32_t flags) {
 static nb::object forward_to(nb::handle h, uint32_t flags) {
     if (check_grad_enabled("drjit.forward_to", h, flags)) {
         enqueue_impl(dr::ADMode::Backward, h);
+        scoped_trace_event trace("drjit.forward_to", "ad");
         nb::gil_scoped_release r;
         ad_traverse(dr::ADMode::Forward, flags);
     }
@@ -327,12 +331,18 @@ static nb::object forward_to(nb::handle h, uint32_t flags) {
 static nb::object backward_to(nb::handle h, uint32_t flags) {
     if (check_grad_enabled("drjit.backward_to", h, flags)) {
         enqueue_impl(dr::ADMode::Forward, h);
+        scoped_trace_event trace("drjit.backward_to", "ad");
         nb::gil_scoped_release r;
         ad_traverse(dr::ADMode::Backward, flags);
     }
     return grad(h, true);
 }
 
+static void traverse(dr::ADMode mode, uint32_t flags) {
+    scoped_trace_event trace("drjit.traverse", "ad");
+    ad_traverse(mode, flags);
+}
+
 static nb::object strip_tuple(nb::handle h) {
     return nb::len(h) == 1 ? h[0] : nb::borrow(h);
 }
@@ -568,6 +578,8 @@ void export_autodiff(nb::module_ &m) {
         .value("ClearInterior", dr::ADFlag::ClearInterior, doc_ADFlag_ClearInterior)
         .value("ClearVertices", dr::ADFlag::ClearVertices, doc_ADFlag_ClearVertices)
         .value("AllowNoGrad", dr::ADFlag::AllowNoGrad, doc_ADFlag_AllowNoGrad)
+        .value("FuseAccum", dr::ADFlag::FuseAccum, doc_ADFlag_FuseAccum)
+        .value("Prune", dr::ADFlag::Prune, doc_ADFlag_Prune)
         .value("Default", dr::ADFlag::Default, doc_ADFlag_Default);
 
     m.def("set_grad_enabled", &set_grad_enabled, doc_set_grad_enabled)
@@ -593,7 +605,7 @@ void export_autodiff(nb::module_ &m) {
           [](dr::ADMode mode, nb::args args) {
               enqueue_impl(mode, args);
           }, "mode"_a, "args"_a)
-     .def("traverse", &ad_traverse, "mode"_a, "flags"_a = dr::ADFlag::Default, doc_traverse,
+     .def("traverse", &traverse, "mode"_a, "flags"_a = dr::ADFlag::Default, doc_traverse,
           nb::sig("def traverse(mode: drjit.ADMode, flags: drjit.ADFlag | int = drjit.ADFlag.Default) -> None"))
      .def("forward_from", &::forward_from, "arg"_a, "flags"_a = dr::ADFlag::Default, doc_forward_from,
           nb::sig("def forward_from(arg: drjit.AnyArray, flags: drjit.ADFlag | int = drjit.ADFlag.Default) -> None"))
@@ -737,13 +737,10 @@ nb::object matmul(nb::handle h0, nb::handle h1) {
         if (d0 && d1) {
             const ArraySupplement &s0 = supp(tp0), &s1 = supp(tp1);
 
+            // Tensor products are implemented in Python (drjit/_matmul.py)
             if (s0.is_tensor || s1.is_tensor)
-                nb::raise(
-                    "this operation only handles fixed-sizes arrays. A different "
-                    "approach is needed for multiplications involving potentially "
-                    "large dynamic arrays/tensors. Other other tools like PyTorch, "
-                    "JAX, or Tensorflow will be preferable in such situations "
-                    "(e.g., to train neural networks");
+                return nb::module_::import_("drjit._matmul")
+                    .attr("tensor_matmul")(h0, h1);
 
             if (s0.is_complex || s1.is_complex || s0.is_quaternion || s1.is_quaternion)
                 nb::raise("complex/quaternion-valued inputs not supported.");
@@ -332,6 +332,34 @@ void export_detail(nb::module_ &) {
 
      .def("can_scatter_reduce", &can_scatter_reduce, doc_detail_can_scatter_reduce)
 
+     .def("loop_active_counts",
+          []() {
+              dr::vector<uint32_t> counts;
+              ad_loop_active_counts(counts);
+              return counts;
+          }, doc_detail_loop_active_counts)
+
+     .def("ad_alloc_stats",
+          [](bool reset) {
+              ADAllocStats stats;
+              ad_alloc_stats(&stats, reset);
+              double elapsed = stats.elapsed > 0 ? stats.elapsed : 1.0;
+
+              nb::dict result;
+              result["variables"] = stats.variables;
+              result["edges"] = stats.edges;
+              result["variables_peak"] = stats.variables_peak;
+              result["edges_peak"] = stats.edges_peak;
+              result["variables_allocated"] = stats.variables_allocated;
+              result["edges_allocated"] = stats.edges_allocated;
+              result["variable_rate"] = stats.variables_allocated / elapsed;
+              result["edge_rate"] = stats.edges_allocated / elapsed;
+              result["elapsed"] = stats.elapsed;
+              return result;
+          }, "reset"_a = false, doc_detail_ad_alloc_stats)
+
+     .def("ad_pruned_edges", &ad_pruned_edges, doc_detail_ad_pruned_edges)
+
      .def("cuda_compute_capability", &jit_cuda_compute_capability)
 
      .def("new_scope", &jit_new_scope, "backend"_a, doc_detail_new_scope)
@@ -11,6 +11,7 @@
 #include "eval.h"
 #include "apply.h"
 #include "local.h"
+#include "profile.h"
 
 bool schedule(nb::handle h) {
     bool result_ = false;
@@ -79,6 +80,7 @@ static void make_opaque(nb::handle h) {
 static void make_opaque_2(nb::args args) { return make_opaque(args); }
 
 bool eval(nb::handle h) {
+    scoped_trace_event trace("drjit.eval", "eval");
     if (schedule(h)) {
         nb::gil_scoped_release guard;
         jit_eval();
@@ -88,6 +90,7 @@ bool eval(nb::handle h) {
 }
 
 static bool eval_2(nb::args args) {
+    scoped_trace_event trace("drjit.eval", "eval");
     bool rv = schedule(args);
     if (rv || nb::len(args) == 0) {
         nb::gil_scoped_release guard;
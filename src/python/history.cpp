@@ -9,13 +9,195 @@
 */
 
 #include "history.h"
+#include "profile.h"
+#include <nanobind/ndarray.h>
+#include <tsl/robin_map.h>
+#include <algorithm>
+
+/// Identifies a row of the aggregated kernel statistics table
+struct KernelStatsKey {
+    JitBackend backend;
+    KernelType type;
+    uint64_t hash[2];
+
+    bool operator==(const KernelStatsKey &k) const {
+        return backend == k.backend && type == k.type &&
+               hash[0] == k.hash[0] && hash[1] == k.hash[1];
+    }
+};
+
+struct KernelStatsKeyHash {
+    size_t operator()(const KernelStatsKey &k) const {
+        // The kernel hash is already well-distributed; just mix in the rest
+        return (size_t) (k.hash[0] ^ (k.hash[1] * 0x9E3779B97F4A7C15ull) ^
+                         ((uint64_t) k.backend << 8) ^ (uint64_t) k.type);
+    }
+};
+
+/// Aggregated statistics of all launches of a specific kernel
+struct KernelStats {
+    KernelStatsKey key;
+
+    /// IR of the first recorded launch (owned, only captured for JIT kernels)
+    char *ir;
+
+    uint64_t launches;
+    uint64_t cache_hits;
+    uint64_t cache_disk;
+    uint64_t size;
+    uint64_t operation_count;
+    double execution_time;
+    double execution_time_min;
+    double execution_time_max;
+    double codegen_time;
+    double backend_time;
+};
+
+/// Native table storing aggregated statistics in first-launch order
+struct KernelStatsTable {
+    tsl::robin_map<KernelStatsKey, size_t, KernelStatsKeyHash> index;
+    dr::vector<KernelStats> rows;
+
+    ~KernelStatsTable() { clear(); }
+
+    void clear() {
+        for (KernelStats &ks : rows)
+            free(ks.ir);
+        rows.clear();
+        index.clear();
+    }
+
+    /// Move the pending entries of Dr.Jit's kernel history into the table
+    void update() {
+        KernelHistoryEntry *data  = trace_kernel_history();
+        KernelHistoryEntry *entry = data;
+
+        while (entry && (uint32_t) entry->backend) {
+            KernelStatsKey key { entry->backend, entry->type, { 0, 0 } };
+            if (entry->type == KernelType::JIT) {
+                key.hash[0] = entry->hash[0];
+                key.hash[1] = entry->hash[1];
+            }
+
+            auto [it, inserted] = index.try_emplace(key, rows.size());
+            if (inserted) {
+                KernelStats ks;
+                memset(&ks, 0, sizeof(KernelStats));
+                ks.key = key;
+                ks.execution_time_min = entry->execution_time;
+                ks.execution_time_max = entry->execution_time;
+
+                // Steal the IR string instead of copying it
+                if (entry->type == KernelType::JIT) {
+                    ks.ir = entry->ir;
+                    entry->ir = nullptr;
+                }
+
+                rows.push_back(ks);
+            }
+
+            KernelStats &ks = rows[it->second];
+            ks.launches++;
+            ks.size += entry->size;
+            ks.execution_time += entry->execution_time;
+            ks.execution_time_min =
+                std::min(ks.execution_time_min, (double) entry->execution_time);
+            ks.execution_time_max =
+                std::max(ks.execution_time_max, (double) entry->execution_time);
+
+            if (entry->type == KernelType::JIT) {
+                ks.cache_hits += entry->cache_hit;
+                ks.cache_disk += entry->cache_disk;
+                ks.operation_count = entry->operation_count;
+                ks.codegen_time += entry->codegen_time;
+                ks.backend_time += entry->backend_time;
+            }
+
+            free(entry->ir);
+            entry++;
+        }
+
+        free(data);
+    }
+};
+
+static KernelStatsTable kernel_stats_table;
+
+/// Copy a column of the statistics table into a NumPy array
+template <typename T, typename Func>
+static nb::object kernel_stats_column(Func func) {
+    const dr::vector<KernelStats> &rows = kernel_stats_table.rows;
+    size_t size = rows.size();
+
+    T *data = new T[size > 0 ? size : 1];
+    for (size_t i = 0; i < size; ++i)
+        data[i] = (T) func(rows[i]);
+
+    nb::capsule owner(data, [](void *p) noexcept { delete[] (T *) p; });
+    return nb::cast(nb::ndarray<nb::numpy, T, nb::ndim<1>>(data, { size }, owner));
+}
+
+static nb::dict kernel_stats(bool ir, bool clear) {
+    kernel_stats_table.update();
+
+    const dr::vector<KernelStats> &rows = kernel_stats_table.rows;
+    nb::list hashes, irs;
+    for (const KernelStats &ks : rows) {
+        if (ks.key.type == KernelType::JIT) {
+            char kernel_hash[33];
+            snprintf(kernel_hash, sizeof(kernel_hash), "%016llx%016llx",
+                     (unsigned long long) ks.key.hash[1],
+                     (unsigned long long) ks.key.hash[0]);
+            hashes.append(kernel_hash);
+        } else {
+            hashes.append(nb::none());
+        }
+
+        if (ir)
+            irs.append(ks.ir ? nb::str(ks.ir) : nb::none());
+    }
+
+    nb::dict result;
+    result["hash"] = hashes;
+    result["backend"] = kernel_stats_column<uint32_t>(
+        [](const KernelStats &ks) { return ks.key.backend; });
+    result["type"] = kernel_stats_column<uint32_t>(
+        [](const KernelStats &ks) { return ks.key.type; });
+    result["launches"] = kernel_stats_column<uint64_t>(
+        [](const KernelStats &ks) { return ks.launches; });
+    result["cache_hits"] = kernel_stats_column<uint64_t>(
+        [](const KernelStats &ks) { return ks.cache_hits; });
+    result["cache_disk"] = kernel_stats_column<uint64_t>(
+        [](const KernelStats &ks) { return ks.cache_disk; });
+    result["size"] = kernel_stats_column<uint64_t>(
+        [](const KernelStats &ks) { return ks.size; });
+    result["operation_count"] = kernel_stats_column<uint64_t>(
+        [](const KernelStats &ks) { return ks.operation_count; });
+    result["execution_time"] = kernel_stats_column<double>(
+        [](const KernelStats &ks) { return ks.execution_time; });
+    result["execution_time_min"] = kernel_stats_column<double>(
+        [](const KernelStats &ks) { return ks.execution_time_min; });
+    result["execution_time_max"] = kernel_stats_column<double>(
+        [](const KernelStats &ks) { return ks.execution_time_max; });
+    result["codegen_time"] = kernel_stats_column<double>(
+        [](const KernelStats &ks) { return ks.codegen_time; });
+    result["backend_time"] = kernel_stats_column<double>(
+        [](const KernelStats &ks) { return ks.backend_time; });
+    if (ir)
+        result["ir"] = irs;
+
+    if (clear)
+        kernel_stats_table.clear();
+
+    return result;
+}
 
 void export_history(nb::module_ &m) {
     nb::object io = nb::module_::import_("io").attr("StringIO");
     m.def(
         "kernel_history",
         [io](dr::vector<KernelType> types) {
-            KernelHistoryEntry *data  = jit_kernel_history();
+            KernelHistoryEntry *data  = trace_kernel_history();
             KernelHistoryEntry *entry = data;
             nb::list history;
             while (entry && (uint32_t) entry->backend) {
@@ -59,9 +241,18 @@ void export_history(nb::module_ &m) {
         },
         "types"_a = nb::list(), doc_kernel_history);
 
-    m.def("kernel_history_clear", &jit_kernel_history_clear,
+    m.def("kernel_history_clear", &trace_kernel_history_clear,
           doc_kernel_history_clear);
 
+    m.def("kernel_stats", &kernel_stats, "ir"_a = false, "clear"_a = true,
+          doc_kernel_stats);
+
+    m.def("kernel_stats_update", []() { kernel_stats_table.update(); },
+          doc_kernel_stats_update);
+
+    m.def("kernel_stats_clear", []() { kernel_stats_table.clear(); },
+          doc_kernel_stats_clear);
+
     nb::enum_<KernelType>(m, "KernelType")
         .value("JIT", KernelType::JIT)
         .value("Reduce", KernelType::Reduce)
@@ -208,7 +208,8 @@ nb::object gather(nb::type_object dtype, nb::object source,
 
 static void scatter_generic(const char *name, ReduceOp op, nb::object target,
                             nb::object value, nb::object index,
-                            nb::object active, ReduceMode mode) {
+                            nb::object active, ReduceMode mode,
+                            bool deterministic = false) {
     nb::handle target_tp = target.type(),
                 value_tp = value.type();
 
@@ -240,13 +241,14 @@ static void scatter_generic(const char *name, ReduceOp op, nb::object target,
         if (is_seq) {
             for (size_t i = 0, l = len; i < l; ++i)
                 scatter_generic(name, op, target[i], value[i], index, active,
-                                mode);
+                                mode, deterministic);
             return;
         }
 
         if (is_dict) {
             for (nb::handle k : nb::borrow<nb::dict>(value).keys())
-                scatter_generic(name, op, target[k], value[k], index, active, mode);
+                scatter_generic(name, op, target[k], value[k], index, active,
+                                mode, deterministic);
             return;
         }
 
@@ -256,7 +258,8 @@ static void scatter_generic(const char *name, ReduceOp op, nb::object target,
 
             for (auto [k, v] : dstruct_dict)
                 scatter_generic(name, op, nb::getattr(target, k),
-                                nb::getattr(value, k), index, active, mode);
+                                nb::getattr(value, k), index, active, mode,
+                                deterministic);
 
             return;
         }
@@ -325,6 +328,14 @@ static void scatter_generic(const char *name, ReduceOp op, nb::object target,
     }
 
     if (value_meta == target_meta) {
+        // Floating point atomics are the only source of nondeterminism here
+        if (deterministic && op == ReduceOp::Add && is_float(target_meta) &&
+            (JitBackend) target_meta.backend != JitBackend::None) {
+            nb::module_::import_("drjit._reduce")
+                .attr("scatter_add_deterministic")(target, value, index, active);
+            return;
+        }
+
         target_supp.scatter_reduce(op, mode, inst_ptr(value), inst_ptr(index),
                                    inst_ptr(active), inst_ptr(target));
         return;
@@ -348,7 +359,7 @@ static void scatter_generic(const char *name, ReduceOp op, nb::object target,
 
         // Potentially perform a packet scatter
         if ((JitBackend) m.backend != JitBackend::None && m.ndim == 2 &&
-            size != 1 && (size & (size - 1)) == 0 &&
+            size != 1 && (size & (size - 1)) == 0 && !deterministic &&
             (op == ReduceOp::Identity || op == ReduceOp::Add)) {
             const ArraySupplement &sub_s = supp(value_supp.value);
             uint64_t target_index = target_supp.index(inst_ptr(target));
@@ -368,7 +379,8 @@ static void scatter_generic(const char *name, ReduceOp op, nb::object target,
             nb::int_ size_o(size);
             for (size_t i = 0; i < size; ++i)
                 scatter_generic(name, op, target, value[i],
-                                index * size_o + nb::int_(i), active, mode);
+                                index * size_o + nb::int_(i), active, mode,
+                                deterministic);
         }
         return;
     }
@@ -389,15 +401,16 @@ void scatter(nb::object target, nb::object value, nb::object index,
 }
 
 void scatter_reduce(ReduceOp op, nb::object target, nb::object value,
-                    nb::object index, nb::object active, ReduceMode mode) {
+                    nb::object index, nb::object active, ReduceMode mode,
+                    bool deterministic) {
     scatter_generic("scatter_reduce", op, std::move(target), std::move(value),
-                    std::move(index), std::move(active), mode);
+                    std::move(index), std::move(active), mode, deterministic);
 }
 
 void scatter_add(nb::object target, nb::object value, nb::object index,
-                 nb::object active, ReduceMode mode) {
+                 nb::object active, ReduceMode mode, bool deterministic) {
     scatter_generic("scatter_add", ReduceOp::Add, std::move(target), std::move(value),
-                    std::move(index), std::move(active), mode);
+                    std::move(index), std::move(active), mode, deterministic);
 }
 
 nb::object scatter_inc(nb::handle_t<dr::ArrayBase> target, nb::object index,
@@ -1107,11 +1120,11 @@ void export_memop(nb::module_ &m) {
           doc_scatter)
      .def("scatter_reduce", &scatter_reduce, "op"_a,
           "target"_a, "value"_a, "index"_a, "active"_a = true,
-          "mode"_a = ReduceMode::Auto,
+          "mode"_a = ReduceMode::Auto, "deterministic"_a = false,
           doc_scatter_reduce)
      .def("scatter_add", &scatter_add,
           "target"_a, "value"_a, "index"_a, "active"_a = true,
-          "mode"_a = ReduceMode::Auto,
+          "mode"_a = ReduceMode::Auto, "deterministic"_a = false,
           doc_scatter_add)
      .def("scatter_inc", &scatter_inc,
           "target"_a, "index"_a, "active"_a = true,
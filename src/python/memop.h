@@ -24,7 +24,7 @@ extern void scatter(nb::object target, nb::object value, nb::object index,
 
 extern void scatter_reduce(ReduceOp op, nb::object target, nb::object value,
                            nb::object index, nb::object active,
-                           ReduceMode mode);
+                           ReduceMode mode, bool deterministic = false);
 
 extern nb::object ravel(nb::handle h, char order,
                         vector<size_t> *shape_out = nullptr,
@@ -9,25 +9,381 @@
 */
 
 #include "profile.h"
+#include <nanobind/stl/string.h>
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <mutex>
+#include <cstring>
+#include <string>
+#include <vector>
+
+using trace_clock = std::chrono::steady_clock;
+
+/// A single entry of a Chrome/Perfetto timeline trace
+struct TraceEvent {
+    std::string name;
+    const char *category;
+    char phase; // 'B': begin, 'E': end, 'X': complete, 'i': instant
+    uint32_t tid;
+    double ts, dur;
+
+    /// Preformatted JSON object with extra information (may be empty)
+    std::string args;
+};
+
+std::atomic<bool> trace_active { false };
+static std::mutex trace_mutex;
+static std::vector<TraceEvent> trace_events;
+static trace_clock::time_point trace_start_time;
+
+/// Timeline position at which the next kernel will be placed
+static double trace_kernel_cursor = 0.0;
+
+/// Kernels are shown on a separate track with this thread ID
+static constexpr uint32_t trace_kernel_tid = 0;
+
+/// Kernel history entries of the user that were set aside by profile_trace
+static std::vector<KernelHistoryEntry> trace_saved_history;
+
+/// Should kernels launched during the trace also be kept in the history?
+static bool trace_keep_history = false;
+
+static uint32_t trace_thread_id() {
+    static std::atomic<uint32_t> counter { 1 };
+    thread_local uint32_t id = counter++;
+    return id;
+}
+
+/// Begin timestamps of regions that are currently open on this thread
+static thread_local std::vector<double> trace_stack;
+
+static double trace_now() {
+    return std::chrono::duration<double, std::micro>(trace_clock::now() -
+                                                     trace_start_time).count();
+}
+
+/// Move pending entries of the kernel history into 'trace_saved_history' (lock held)
+static void trace_save_history() {
+    KernelHistoryEntry *data  = jit_kernel_history();
+    KernelHistoryEntry *entry = data;
+
+    while (entry && (uint32_t) entry->backend)
+        trace_saved_history.push_back(*entry++);
+
+    free(data);
+}
+
+/// Move the kernel history into the trace, starting at time 'ts' (lock held)
+static void trace_drain_kernels(double ts) {
+    KernelHistoryEntry *data  = jit_kernel_history();
+    KernelHistoryEntry *entry = data;
+
+    double cursor = std::max(ts, trace_kernel_cursor);
+
+    while (entry && (uint32_t) entry->backend) {
+        char name[64], args[256];
+        double total = entry->execution_time;
+
+        if (entry->type == KernelType::JIT) {
+            snprintf(name, sizeof(name), "kernel %016llx%016llx",
+                     (unsigned long long) entry->hash[1],
+                     (unsigned long long) entry->hash[0]);
+            total += entry->codegen_time + entry->backend_time;
+            snprintf(args, sizeof(args),
+                     "{\"size\": %u, \"operation_count\": %u, "
+                     "\"cache_hit\": %s, \"cache_disk\": %s, "
+                     "\"codegen_time\": %.3f, \"backend_time\": %.3f, "
+                     "\"execution_time\": %.3f}",
+                     entry->size, entry->operation_count,
+                     entry->cache_hit ? "true" : "false",
+                     entry->cache_disk ? "true" : "false",
+                     (double) entry->codegen_time, (double) entry->backend_time,
+                     (double) entry->execution_time);
+        } else {
+            const char *type_name;
+            switch (entry->type) {
+                case KernelType::Reduce:     type_name = "reduce"; break;
+                case KernelType::CallReduce: type_name = "call reduce"; break;
+                default:                     type_name = "other"; break;
+            }
+            snprintf(name, sizeof(name), "%s", type_name);
+            snprintf(args, sizeof(args),
+                     "{\"size\": %u, \"execution_time\": %.3f}", entry->size,
+                     (double) entry->execution_time);
+        }
+
+        trace_events.push_back({ name, "kernel", 'X', trace_kernel_tid,
+                                 cursor, total, args });
+
+        if (entry->type == KernelType::JIT) {
+            // Nested regions showing the individual phases
+            double t = cursor;
+            trace_events.push_back({ "codegen", "kernel", 'X', trace_kernel_tid,
+                                     t, entry->codegen_time, { } });
+            t += entry->codegen_time;
+            if (!entry->cache_hit) {
+                trace_events.push_back({ "backend", "kernel", 'X',
+                                         trace_kernel_tid, t,
+                                         entry->backend_time, { } });
+            }
+            t += entry->backend_time;
+            trace_events.push_back({ "execute", "kernel", 'X', trace_kernel_tid,
+                                     t, entry->execution_time, { } });
+        }
+
+        cursor += total;
+        if (trace_keep_history)
+            trace_saved_history.push_back(*entry);
+        else
+            free(entry->ir);
+        entry++;
+    }
+
+    free(data);
+    trace_kernel_cursor = cursor;
+}
+
+void trace_push(const char *name, const char *category) {
+    double ts = trace_now();
+    trace_stack.push_back(ts);
+
+    std::lock_guard<std::mutex> guard(trace_mutex);
+    if (!trace_active)
+        return;
+    trace_events.push_back({ name, category, 'B', trace_thread_id(), ts, 0, { } });
+}
+
+void trace_pop() {
+    double begin = 0.0;
+    if (!trace_stack.empty()) {
+        begin = trace_stack.back();
+        trace_stack.pop_back();
+    }
+
+    std::lock_guard<std::mutex> guard(trace_mutex);
+    if (!trace_active)
+        return;
+    trace_drain_kernels(begin);
+    trace_events.push_back({ { }, nullptr, 'E', trace_thread_id(), trace_now(), 0, { } });
+}
+
+KernelHistoryEntry *trace_kernel_history() {
+    std::lock_guard<std::mutex> guard(trace_mutex);
+    if (trace_active || trace_saved_history.empty())
+        return jit_kernel_history();
+
+    trace_save_history();
+
+    // Zero-initialized sentinel marks the end of the list
+    size_t size = trace_saved_history.size();
+    KernelHistoryEntry *data = (KernelHistoryEntry *)
+        calloc(size + 1, sizeof(KernelHistoryEntry));
+    memcpy(data, trace_saved_history.data(), size * sizeof(KernelHistoryEntry));
+    trace_saved_history.clear();
+
+    return data;
+}
+
+void trace_kernel_history_clear() {
+    std::lock_guard<std::mutex> guard(trace_mutex);
+    if (!trace_active) {
+        for (KernelHistoryEntry &entry : trace_saved_history)
+            free(entry.ir);
+        trace_saved_history.clear();
+    }
+    jit_kernel_history_clear();
+}
+
+/// Drop unmatched end events and close regions that are still open
+static void trace_balance(std::vector<TraceEvent> &events, double ts) {
+    std::vector<std::pair<uint32_t, size_t>> depth;
+    size_t out = 0;
+
+    for (size_t i = 0; i < events.size(); ++i) {
+        TraceEvent &e = events[i];
+        if (e.phase == 'B' || e.phase == 'E') {
+            auto it = std::find_if(
+                depth.begin(), depth.end(),
+                [&](const std::pair<uint32_t, size_t> &d) { return d.first == e.tid; });
+            if (it == depth.end()) {
+                depth.emplace_back(e.tid, 0);
+                it = depth.end() - 1;
+            }
+
+            if (e.phase == 'B') {
+                it->second++;
+            } else if (it->second == 0) {
+                continue;
+            } else {
+                it->second--;
+            }
+        }
+
+        if (out != i)
+            events[out] = std::move(e);
+        out++;
+    }
+
+    events.resize(out);
+
+    for (const std::pair<uint32_t, size_t> &d : depth) {
+        for (size_t i = 0; i < d.second; ++i)
+            events.push_back({ { }, nullptr, 'E', d.first, ts, 0, { } });
+    }
+}
+
+static void json_escape(std::string &out, const std::string &s) {
+    for (char c : s) {
+        switch (c) {
+            case '"':  out += "\\\""; break;
+            case '\\': out += "\\\\"; break;
+            case '\n': out += "\\n"; break;
+            case '\t': out += "\\t"; break;
+            default:
+                if ((unsigned char) c < 0x20) {
+                    char buf[8];
+                    snprintf(buf, sizeof(buf), "\\u%04x", (unsigned) c);
+                    out += buf;
+                } else {
+                    out += c;
+                }
+        }
+    }
+}
+
+static void trace_write(const std::string &filename,
+                        const std::vector<TraceEvent> &events) {
+    std::string out = "{\"displayTimeUnit\": \"ms\", \"traceEvents\": [\n";
+    char buf[128];
+
+    // Name the kernel track so that it is easy to find in the viewer
+    snprintf(buf, sizeof(buf),
+             "{\"name\": \"thread_name\", \"ph\": \"M\", \"pid\": 0, \"tid\": "
+             "%u, \"args\": {\"name\": \"Kernels\"}}", trace_kernel_tid);
+    out += buf;
+
+    for (const TraceEvent &e : events) {
+        out += ",\n{\"ph\": \"";
+        out += e.phase;
+        snprintf(buf, sizeof(buf), "\", \"pid\": 0, \"tid\": %u, \"ts\": %.3f",
+                 e.tid, e.ts);
+        out += buf;
+
+        if (e.phase != 'E') {
+            out += ", \"name\": \"";
+            json_escape(out, e.name);
+            out += "\", \"cat\": \"";
+            out += e.category;
+            out += "\"";
+        }
+
+        if (e.phase == 'X') {
+            snprintf(buf, sizeof(buf), ", \"dur\": %.3f", e.dur);
+            out += buf;
+        } else if (e.phase == 'i') {
+            out += ", \"s\": \"t\"";
+        }
+
+        if (!e.args.empty()) {
+            out += ", \"args\": ";
+            out += e.args;
+        }
+
+        out += "}";
+    }
+
+    out += "\n]}\n";
+
+    FILE *f = fopen(filename.c_str(), "wb");
+    if (!f)
+        nb::raise("drjit.profile_trace(): could not open \"%s\" for writing!",
+                  filename.c_str());
+    size_t written = fwrite(out.data(), 1, out.size(), f);
+    fclose(f);
+    if (written != out.size())
+        nb::raise("drjit.profile_trace(): could not write \"%s\"!",
+                  filename.c_str());
+}
 
 void export_profile(nb::module_ &m) {
     struct profile_range {
         const char *value;
+        bool traced = false;
+
+        profile_range(const char *value) : value(value) { }
 
         void __enter__() {
             jit_profile_range_push(value);
+            traced = trace_active.load(std::memory_order_relaxed);
+            if (traced)
+                trace_push(value, "range");
         }
 
         void __exit__(nb::handle, nb::handle, nb::handle) {
+            if (traced)
+                trace_pop();
             jit_profile_range_pop();
         }
     };
 
+    struct profile_trace {
+        std::string filename;
+        bool backup = false;
+
+        void __enter__() {
+            std::lock_guard<std::mutex> guard(trace_mutex);
+            if (trace_active)
+                nb::raise("drjit.profile_trace(): a trace is already being recorded!");
+
+            // Set the user's kernel history aside, it is restored in __exit__
+            backup = jit_flag(JitFlag::KernelHistory);
+            trace_save_history();
+            trace_keep_history = backup;
+            jit_set_flag(JitFlag::KernelHistory, true);
+
+            trace_events.clear();
+            trace_kernel_cursor = 0.0;
+            trace_start_time = trace_clock::now();
+            trace_active = true;
+        }
+
+        void __exit__(nb::handle, nb::handle, nb::handle) {
+            std::vector<TraceEvent> events;
+            {
+                std::lock_guard<std::mutex> guard(trace_mutex);
+                double ts = trace_now();
+                trace_drain_kernels(ts);
+                trace_active = false;
+                trace_keep_history = false;
+                events.swap(trace_events);
+                jit_set_flag(JitFlag::KernelHistory, backup);
+                trace_balance(events, ts);
+            }
+            trace_write(filename, events);
+        }
+    };
+
     nb::class_<profile_range>(m, "profile_range", doc_profile_range)
         .def(nb::init<const char *>())
         .def("__enter__", &profile_range::__enter__)
         .def("__exit__", &profile_range::__exit__, nb::arg().none(),
              nb::arg().none(), nb::arg().none());
 
-    m.def("profile_mark", &jit_profile_mark, doc_profile_mark);
+    nb::class_<profile_trace>(m, "profile_trace", doc_profile_trace)
+        .def(nb::init<std::string>(), "filename"_a)
+        .def("__enter__", &profile_trace::__enter__)
+        .def("__exit__", &profile_trace::__exit__, nb::arg().none(),
+             nb::arg().none(), nb::arg().none());
+
+    m.def("profile_mark",
+          [](const char *value) {
+              jit_profile_mark(value);
+              if (trace_active.load(std::memory_order_relaxed)) {
+                  std::lock_guard<std::mutex> guard(trace_mutex);
+                  if (trace_active)
+                      trace_events.push_back(
+                          { value, "mark", 'i', trace_thread_id(), trace_now(), 0, { } });
+              }
+          }, doc_profile_mark);
 }
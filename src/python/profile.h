@@ -11,5 +11,42 @@
 #pragma once
 
 #include "common.h"
+#include <atomic>
+
+/// Is a timeline trace currently being recorded? (see drjit.profile_trace)
+extern std::atomic<bool> trace_active;
+
+/// Record the beginning of a region on the timeline trace
+extern void trace_push(const char *name, const char *category);
+
+/// Record the end of the most recent region on the timeline trace
+extern void trace_pop();
+
+/// Fetch and clear the kernel history, including entries that were set aside
+/// by drjit.profile_trace (replaces jit_kernel_history())
+extern KernelHistoryEntry *trace_kernel_history();
+
+/// Clear the kernel history, including entries that were set aside by
+/// drjit.profile_trace (replaces jit_kernel_history_clear())
+extern void trace_kernel_history_clear();
+
+/// RAII helper that records a region on the timeline trace, if active
+struct scoped_trace_event {
+    bool active;
+
+    scoped_trace_event(const char *name, const char *category)
+        : active(trace_active.load(std::memory_order_relaxed)) {
+        if (active)
+            trace_push(name, category);
+    }
+
+    ~scoped_trace_event() {
+        if (active)
+            trace_pop();
+    }
+
+    scoped_trace_event(const scoped_trace_event &) = delete;
+    scoped_trace_event &operator=(const scoped_trace_event &) = delete;
+};
 
 extern void export_profile(nb::module_&);
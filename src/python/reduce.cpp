@@ -331,9 +331,13 @@ nb::object reduce(uint32_t op, nb::handle h, nb::handle axis_, nb::handle mode)
                     symbolic = 1;
                 else if (strcmp(s_, "evaluated") == 0)
                     symbolic = 0;
+                else if (strcmp(s_, "autotune") == 0)
+                    symbolic = 2; // only relevant for tensors, use default policy
             }
             if (symbolic == -1)
-                nb::raise("'mode' must be \'symbolic\", \"evaluated\", or None.");
+                nb::raise("'mode' must be \'symbolic\", \"evaluated\", \"autotune\", or None.");
+            else if (symbolic == 2)
+                symbolic = -1;
         }
 
         // Reduce along the first specified axis
@@ -460,8 +464,21 @@ nb::object reduce(uint32_t op, nb::handle h, nb::handle axis_, nb::handle mode)
     return nb::object();
 }
 
-nb::object sum(nb::handle value, nb::handle axis, nb::handle mode) {
-    return reduce((uint32_t) ReduceOp::Add, value, axis, mode);
+nb::object sum(nb::handle value, nb::handle axis, nb::handle mode,
+               bool deterministic) {
+    nb::object mode_o = nb::borrow(mode);
+
+    if (deterministic) {
+        // Only symbolic reductions rely on (nondeterministic) atomics
+        if (mode.is_none())
+            mode_o = nb::str("evaluated");
+        else if (!(nb::isinstance<nb::str>(mode) &&
+                   strcmp(nb::borrow<nb::str>(mode).c_str(), "evaluated") == 0))
+            nb::raise("drjit.sum(): 'deterministic=True' requires "
+                      "'mode=\"evaluated\"' or 'mode=None'.");
+    }
+
+    return reduce((uint32_t) ReduceOp::Add, value, axis, mode_o);
 }
 
 nb::object prod(nb::handle value, nb::handle axis, nb::handle mode) {
@@ -705,8 +722,8 @@ void export_reduce(nb::module_ & m) {
           nb::sig("def none(value: object, axis: int | tuple[int, ...] | ... | None = ...) -> object"))
      .def("count", &count, "value"_a, "axis"_a.none() = nb::ellipsis(), doc_count,
           nb::sig("def count(value: object, axis: int | tuple[int, ...] | ... | None = ...) -> object"))
-     .def("sum", &sum, "value"_a, "axis"_a.none() = nb::ellipsis(), "mode"_a = nb::none(), doc_sum,
-          nb::sig("def sum(value: object, axis: int | tuple[int, ...] | ... | None = ..., mode: str | None = None) -> object"))
+     .def("sum", &sum, "value"_a, "axis"_a.none() = nb::ellipsis(), "mode"_a = nb::none(), "deterministic"_a = false, doc_sum,
+          nb::sig("def sum(value: object, axis: int | tuple[int, ...] | ... | None = ..., mode: str | None = None, deterministic: bool = False) -> object"))
      .def("prod", &prod, "value"_a, "axis"_a.none() = nb::ellipsis(), "mode"_a = nb::none(), doc_prod,
           nb::sig("def prod(value: object, axis: int | tuple[int, ...] | ... | None = ..., mode: str | None = None) -> object"))
      .def("min", &min, "value"_a, "axis"_a.none() = nb::ellipsis(), "mode"_a = nb::none(), doc_min,
@@ -16,7 +16,8 @@ extern void export_reduce(nb::module_ &);
 
 extern nb::object all (nb::handle, nb::handle axis);
 extern nb::object any (nb::handle, nb::handle axis);
-extern nb::object sum (nb::handle, nb::handle axis, nb::handle mode = Py_None);
+extern nb::object sum (nb::handle, nb::handle axis, nb::handle mode = Py_None,
+                       bool deterministic = false);
 extern nb::object prod(nb::handle, nb::handle axis, nb::handle mode = Py_None);
 extern nb::object min (nb::handle, nb::handle axis, nb::handle mode = Py_None);
 extern nb::object max (nb::handle, nb::handle axis, nb::handle mode = Py_None);
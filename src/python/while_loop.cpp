@@ -114,11 +114,38 @@ nb::tuple while_loop(nb::tuple state, nb::callable cond, nb::callable body,
                      std::optional<dr::string> name,
                      std::optional<dr::string> mode,
                      bool strict,
-                     std::optional<bool> compress,
-                     std::optional<long long> max_iterations) {
+                     nb::handle compress,
+                     std::optional<long long> max_iterations,
+                     std::optional<uint32_t> block_iterations,
+                     nb::object reverse_body) {
     try {
         JitBackend backend = JitBackend::None;
 
+        // Loops with a user-provided reverse step are handled in Python
+        if (!reverse_body.is_none()) {
+            nb::list labels_l;
+            for (const dr::string &l : labels)
+                labels_l.append(nb::str(l.c_str()));
+
+            nb::dict kwargs;
+            kwargs["labels"] = labels_l;
+            kwargs["strict"] = strict;
+            kwargs["compress"] = compress;
+            if (name.has_value())
+                kwargs["label"] = nb::str(name.value().c_str());
+            if (mode.has_value())
+                kwargs["mode"] = nb::str(mode.value().c_str());
+            if (max_iterations.has_value())
+                kwargs["max_iterations"] = max_iterations.value();
+            if (block_iterations.has_value())
+                kwargs["block_iterations"] = block_iterations.value();
+
+            return nb::borrow<nb::tuple>(
+                nb::module_::import_("drjit._checkpoint")
+                    .attr("reversible_loop")(state, cond, body, reverse_body,
+                                             **kwargs));
+        }
+
         nb::object cond_val = tuple_call(cond, state);
         nb::handle cond_tp = cond_val.type();
 
@@ -163,20 +190,40 @@ nb::tuple while_loop(nb::tuple state, nb::callable cond, nb::callable body,
             nb::raise("invalid 'mode' argument (must equal None, "
                       "\"scalar\", \"symbolic\", or \"evaluated\")");
 
+        // A floating point 'compress' value selects the adaptive mode
+        int compress_i = -1;
+        float threshold = -1.f;
+        if (compress.is_none()) {
+            compress_i = -1;
+        } else if (compress.type().is(&PyBool_Type)) {
+            compress_i = (int) nb::cast<bool>(compress);
+        } else if (compress.type().is(&PyFloat_Type)) {
+            threshold = nb::cast<float>(compress);
+            if (!(threshold >= 0.f && threshold <= 1.f))
+                nb::raise("the adaptive compression threshold specified via "
+                          "'compress' must be in the interval [0, 1]");
+            compress_i = 2;
+        } else {
+            nb::raise("invalid 'compress' argument (must equal None, a "
+                      "bool, or a float)");
+        }
+
+        if (block_iterations.has_value() && block_iterations.value() == 0)
+            nb::raise("'block_iterations' must be positive");
+
         const char *name_cstr =
             name.has_value() ? name.value().c_str() : "unnamed";
 
         dr::unique_ptr<LoopState> ls(
             new LoopState(std::move(state), std::move(cond), std::move(body),
-                          std::move(labels), strict,
-                          !compress.has_value() || !compress.value()));
+                          std::move(labels), strict, compress_i <= 0));
 
-        bool rv = ad_loop(backend, symbolic,
-                          compress.has_value() ? (int) compress.value() : -1,
-                          max_iterations.has_value() ? max_iterations.value() : 0,
-                          name_cstr, ls.get(), while_loop_read_cb,
-                          while_loop_write_cb, while_loop_cond_cb,
-                          while_loop_body_cb, while_loop_delete_cb, true);
+        bool rv = ad_loop(
+            backend, symbolic, compress_i, threshold,
+            max_iterations.has_value() ? max_iterations.value() : 0,
+            block_iterations.has_value() ? block_iterations.value() : 1,
+            name_cstr, ls.get(), while_loop_read_cb, while_loop_write_cb,
+            while_loop_cond_cb, while_loop_body_cb, while_loop_delete_cb, true);
 
         ls->tracker.restore(ls->labels);
 
@@ -210,7 +257,8 @@ void export_while_loop(nb::module_ &m) {
           "labels"_a = nb::make_tuple(), "label"_a = nb::none(),
           "mode"_a = nb::none(), "strict"_a = true,
           "compress"_a = nb::none(), "max_iterations"_a = nb::none(),
-          doc_while_loop,
+          "block_iterations"_a = nb::none(),
+          "reverse_body"_a = nb::none(), doc_while_loop,
           // Complicated signature to type-check while_loop via TypeVarTuple
           nb::sig(
             "def while_loop(state: tuple[*Ts], "
@@ -220,8 +268,10 @@ void export_while_loop(nb::module_ &m) {
                            "label: str | None = None, "
                            "mode: typing.Literal['scalar', 'symbolic', 'evaluated', None] = None, "
                            "strict: bool = True, "
-                           "compress: bool | None = None, "
-                           "max_iterations: int | None = None) "
+                           "compress: bool | float | None = None, "
+                           "max_iterations: int | None = None, "
+                           "block_iterations: int | None = None, "
+                           "reverse_body: typing.Callable[[*Ts], tuple[*Ts]] | None = None) "
             "-> tuple[*Ts]"
     ));
 }
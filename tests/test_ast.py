@@ -23,3 +23,59 @@ def test01_comprehensions(t):
         i += 1
 
     assert result[0] == 3
+
+
+@pytest.test_arrays('shape=(*), uint32, jit')
+def test02_hoist_invariants(t):
+    # Loop-invariant assignments are moved out of the loop when requested
+    class Counter:
+        count = 0
+
+        @property
+        def value(self):
+            Counter.count += 1
+            return 2
+
+        def sqrt(self, x):
+            # Same name as dr.sqrt(), but not a Dr.Jit function
+            Counter.count += 1
+            return x
+
+    @dr.syntax
+    def f(t, c):
+        i = dr.zeros(t, 3)
+        while dr.hint(i < 5, mode='evaluated', hoist=True):
+            step = c.value * 1 # invariant
+            j = i * step       # depends on the loop state
+            i += step + j - j
+        return i
+
+    @dr.syntax
+    def g(t, c):
+        i = dr.zeros(t, 3)
+        while dr.hint(i < 5, mode='evaluated'):
+            step = c.value * 1
+            i += step
+        return i
+
+    @dr.syntax
+    def h(t, c):
+        i = dr.zeros(t, 3)
+        while dr.hint(i < 5, mode='evaluated', hoist=True):
+            step = c.sqrt(2)
+            i += step
+        return i
+
+    c = Counter()
+    assert dr.all(f(t, c) == 6)
+    assert Counter.count == 1
+
+    # Hoisting is disabled by default
+    Counter.count = 0
+    assert dr.all(g(t, c) == 6)
+    assert Counter.count == 3
+
+    # Calls on objects other than the 'drjit' module are never hoisted
+    Counter.count = 0
+    assert dr.all(h(t, c) == 6)
+    assert Counter.count == 3
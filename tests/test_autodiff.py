@@ -2067,3 +2067,169 @@ def test131_prefix_sum_tensor(t, axis):
         assert dr.all(x.grad == t([[3, 2, 1], [3, 2, 1], [3, 2, 1]]))
     else:
         assert dr.all(x.grad == t([[3, 3, 3], [2, 2, 2], [1, 1, 1]]))
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test132_ad_multithreaded(t):
+    # Threads that build and differentiate independent graphs concurrently
+    import threading
+
+    def worker(i, results):
+        x = dr.arange(t, 10) + i
+        dr.enable_grad(x)
+        y = x
+        for _ in range(20):
+            y = dr.sin(y) * 0.5 + x
+        dr.backward_from(y)
+        results[i] = (x, y, x.grad)
+
+    results = [None] * 8
+    threads = [threading.Thread(target=worker, args=(i, results))
+               for i in range(len(results))]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    # Compare against a serial evaluation
+    for i, (x, y, grad) in enumerate(results):
+        ref = [None] * len(results)
+        worker(i, ref)
+        assert dr.allclose(y, ref[i][1])
+        assert dr.allclose(grad, ref[i][2])
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test133_ad_alloc_stats(t):
+    dr.detail.ad_alloc_stats(reset=True)
+    stats = dr.detail.ad_alloc_stats()
+    assert stats['variables_allocated'] == 0
+    base = stats['variables']
+
+    x = t(1, 2, 3)
+    dr.enable_grad(x)
+    y = x
+    for _ in range(10):
+        y = y * x
+
+    stats = dr.detail.ad_alloc_stats()
+    assert stats['variables'] == base + 11
+    assert stats['variables_allocated'] == 11
+    assert stats['edges_allocated'] >= 10
+
+    del x, y
+    stats = dr.detail.ad_alloc_stats(reset=True)
+    assert stats['variables'] == base
+    assert stats['variables_peak'] >= base + 11
+    assert dr.detail.ad_alloc_stats()['variables_peak'] == base
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test134_ad_fuse_accum(t):
+    # A scalar parameter used many times requires a reduction per edge,
+    # which ADFlag.FuseAccum merges into a single one
+    def run(flags):
+        p = t(2)
+        x = dr.arange(t, 100)
+        dr.enable_grad(p)
+        y = x * p
+        for i in range(5):
+            y = y + dr.sin(x * i) * p
+
+        with dr.scoped_set_flag(dr.JitFlag.KernelHistory):
+            dr.backward_from(y, flags=flags)
+            dr.eval(p.grad)
+            return p.grad, len(dr.kernel_history())
+
+    grad_1, kernels_1 = run(dr.ADFlag.Default)
+    grad_2, kernels_2 = run(dr.ADFlag.Default | dr.ADFlag.FuseAccum)
+    assert dr.allclose(grad_1, grad_2)
+    assert kernels_2 < kernels_1
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test135_ad_prune(t):
+    x, y = t(1, 2, 3), t(4, 5, 6)
+    dr.enable_grad(x, y)
+    z = x * 2 + y * 3
+
+    # The gradient of 'y' can no longer be read, skip its subgraph
+    del y
+    dr.backward_from(z, flags=dr.ADFlag.Default | dr.ADFlag.Prune)
+    assert dr.detail.ad_pruned_edges() == 2
+    assert dr.all(x.grad == 2)
+
+    # Pruning is disabled when interior gradients are not cleared
+    x, y = t(1, 2, 3), t(4, 5, 6)
+    dr.enable_grad(x, y)
+    z = x * 2 + y * 3
+    del y
+    dr.backward_from(z, flags=dr.ADFlag.ClearEdges | dr.ADFlag.Prune)
+    assert dr.detail.ad_pruned_edges() == 0
+    assert dr.all(x.grad == 2)
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test136_ad_multithreaded_shared(t):
+    # Threads that differentiate graphs with a common input concurrently
+    import threading
+
+    x = dr.arange(t, 10)
+    dr.enable_grad(x)
+
+    def worker(i):
+        y = x * (i + 1)
+        for _ in range(10):
+            y = y * 0.5 + x
+        dr.backward(y)
+
+    n = 8
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    ref = sum((i + 1) * 0.5**10 + (2 - 0.5**9) for i in range(n))
+    assert dr.allclose(x.grad, ref)
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test137_ad_multithreaded_cross_shard(t):
+    # Some threads connect their variables to a variable of another thread
+    # (and hence, another shard) while others traverse shard-local graphs
+    import threading
+
+    x = dr.arange(t, 10)
+    dr.enable_grad(x)
+    results = []
+
+    def local(i):
+        for _ in range(10):
+            a = dr.arange(t, 10) + i
+            dr.enable_grad(a)
+            y = a
+            for _ in range(10):
+                y = y * 0.5 + a
+            dr.backward(y)
+            results.append(dr.allclose(a.grad, 0.5**10 + (2 - 0.5**9)))
+
+    def mixed(i):
+        for _ in range(10):
+            a = dr.arange(t, 10) + i
+            dr.enable_grad(a)
+            y = a * x
+            for _ in range(10):
+                y = y * 0.5 + a
+            dr.backward(y * a)
+            ref = dr.detach(2 * a * x) * 0.5**10 + dr.detach(2 * a) * (2 - 0.5**9)
+            results.append(dr.allclose(a.grad, ref))
+
+    threads = [threading.Thread(target=local if i % 2 else mixed, args=(i,))
+               for i in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    assert len(results) == 80 and all(results)
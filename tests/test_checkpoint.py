@@ -0,0 +1,79 @@
+import drjit as dr
+import pytest
+
+
+def step(x, y, scale=1):
+    for _ in range(5):
+        x = dr.sin(x * y) + x
+    return x * scale
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test01_checkpoint_bwd(t):
+    x, y = t(1, 2, 3), t(0.5)
+    dr.enable_grad(x, y)
+    z = dr.checkpoint(step, x, y, scale=t(2))
+    dr.backward_from(z)
+
+    x2, y2 = t(1, 2, 3), t(0.5)
+    dr.enable_grad(x2, y2)
+    z2 = step(x2, y2, scale=2)
+    dr.backward_from(z2)
+
+    assert dr.allclose(z, z2)
+    assert dr.allclose(x.grad, x2.grad)
+    assert dr.allclose(y.grad, y2.grad)
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test02_checkpoint_fwd(t):
+    x, y = t(1, 2, 3), t(0.5)
+    dr.enable_grad(x)
+    z = dr.checkpoint(step, x, y)
+    assert dr.allclose(dr.forward_to(z), dr.forward_to(step(x, y)))
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test03_checkpoint_no_grad(t):
+    x = t(1, 2, 3)
+    z = dr.checkpoint(step, x, t(0.5))
+    assert not dr.grad_enabled(z)
+    assert dr.allclose(z, step(x, t(0.5)))
+
+
+@pytest.mark.parametrize('interval', [None, 1, 3])
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test04_checkpoint_loop(t, interval):
+    UInt32 = dr.uint32_array_t(t)
+
+    def run(loop, **kwargs):
+        x, y = t(1, 0.5, 2), t(0.25)
+        dr.enable_grad(x, y)
+        _, z, _ = loop(
+            state=(UInt32(0, 4, 10), x, y),
+            cond=lambda i, z, y: i < 20,
+            body=lambda i, z, y: (i + 1, dr.fma(z, y, dr.sin(z)), y),
+            **kwargs
+        )
+        dr.backward_from(z)
+        return z, x.grad, y.grad
+
+    ref = run(dr.while_loop, mode='evaluated')
+    dr.detail.ad_alloc_stats(reset=True)
+    res = run(dr.checkpoint_loop, interval=interval)
+    peak = dr.detail.ad_alloc_stats()['variables_peak']
+
+    for a, b in zip(ref, res):
+        assert dr.allclose(a, b)
+
+    # Labels refer to the user's state, not the internal iteration counter
+    res = run(dr.checkpoint_loop, interval=interval, labels=('i', 'z', 'y'))
+    for a, b in zip(ref, res):
+        assert dr.allclose(a, b)
+
+    # Checkpointing longer segments should reduce the size of the AD graph
+    if interval == 1:
+        return
+    dr.detail.ad_alloc_stats(reset=True)
+    run(dr.while_loop, mode='evaluated')
+    assert peak < dr.detail.ad_alloc_stats()['variables_peak']
@@ -0,0 +1,60 @@
+import drjit as dr
+import pytest
+import sys
+
+
+@pytest.test_arrays('is_jit, float32, shape=(*)')
+def test01_discrete(t):
+    UInt32 = dr.uint32_array_t(t)
+    d = dr.DiscreteDistribution(t(1, 3, 0, 4))
+    assert dr.allclose(d.sum, 8)
+    assert dr.allclose(d.eval_pmf_normalized(UInt32(0, 1, 2, 3)),
+                       t(.125, .375, 0, .5))
+
+    u = t(0, .1, .124, .126, .49, .51, .99)
+    index, u2, pmf = d.sample_reuse_pmf(u)
+    assert dr.all(index == UInt32(0, 0, 0, 1, 1, 3, 3))
+    assert dr.allclose(u2, t(0, .8, .992, .00266667, .97333333, .02, .98))
+    assert dr.allclose(pmf, t(.125, .125, .125, .375, .375, .5, .5))
+
+
+@pytest.test_arrays('is_jit, float32, shape=(*)')
+def test02_continuous(t):
+    d = dr.ContinuousDistribution((1, 3), t(0, 1, 1))
+    assert dr.allclose(d.integral, 1.5)
+    assert dr.allclose(d.eval_pdf_normalized(t(1, 1.5, 2.5, 4)),
+                       t(0, 1/3, 2/3, 0))
+
+    # The CDF and sampling are inverse operations
+    u = dr.linspace(t, 0, 1, 21)
+    x = d.sample(u)
+    assert dr.allclose(d.eval_cdf_normalized(x), u, atol=1e-5)
+
+
+@pytest.test_arrays('is_jit, float32, shape=(*)')
+def test03_distr_2d(t):
+    mod = sys.modules[t.__module__]
+    tt = dr.tensor_t(t)
+    data = tt([[1, 0, 1], [2, 4, 0]])
+    d = dr.Distribution2D(data)
+
+    rng = mod.PCG32(1000)
+    pos, pdf = d.sample(mod.Array2f(rng.next_float32(), rng.next_float32()))
+    assert dr.all((pos.x >= 0) & (pos.x < 1) & (pos.y >= 0) & (pos.y < 1))
+    assert dr.allclose(pdf, d.eval(pos))
+
+    # Never sample cells with zero density
+    assert dr.all(pdf > 0)
+    assert dr.allclose(d.eval(mod.Array2f(.5, .75)), 4 / 8 * 6)
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test04_discrete_ad(t):
+    UInt32 = dr.uint32_array_t(t)
+    pmf = t(1, 3)
+    dr.enable_grad(pmf)
+    d = dr.DiscreteDistribution(pmf)
+    p = d.eval_pmf_normalized(UInt32(1))
+    dr.backward_from(p)
+    # p = b/(a+b) -> dp/da = -b/(a+b)^2, dp/db = a/(a+b)^2
+    assert dr.allclose(dr.grad(pmf), t(-3/16, 1/16))
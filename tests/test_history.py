@@ -24,3 +24,89 @@ def test01_kernel_history(t):
 
     # Kernel history should be erased after queried
     assert len(dr.kernel_history()) == 0
+
+@pytest.test_arrays('float32,shape=(*),jit,-diff')
+def test02_kernel_stats(t):
+    pytest.importorskip("numpy")
+    dr.kernel_stats_clear()
+
+    with dr.scoped_set_flag(dr.JitFlag.KernelHistory, True):
+        for i in range(3):
+            dr.eval(dr.arange(t, 16) * 2)
+            dr.kernel_stats_update()
+
+        # Aggregated statistics should include the not-yet-folded history
+        dr.eval(dr.arange(t, 16) * 2)
+        stats = dr.kernel_stats(ir=True)
+
+    assert len(stats['hash']) == 1
+    assert stats['launches'][0] == 4
+    assert stats['cache_hits'][0] >= 3
+    assert stats['size'][0] == 64
+    assert stats['execution_time_min'][0] <= stats['execution_time_max'][0]
+    assert isinstance(stats['ir'][0], str)
+
+    # Statistics should be erased after queried
+    assert len(dr.kernel_stats()['hash']) == 0
+
+@pytest.test_arrays('float32,shape=(*),jit,is_diff')
+def test03_profile_trace(t, tmp_path):
+    import json
+    fname = str(tmp_path / 'trace.json')
+
+    x = dr.arange(t, 16)
+    dr.enable_grad(x)
+
+    with dr.profile_trace(fname):
+        with dr.profile_range('outer'):
+            dr.profile_mark('mark')
+            y = dr.square(x)
+            dr.eval(y)
+        dr.backward(y)
+
+    assert not dr.flag(dr.JitFlag.KernelHistory)
+
+    with open(fname) as f:
+        events = json.load(f)['traceEvents']
+
+    names = [e.get('name') for e in events]
+    assert 'outer' in names
+    assert 'mark' in names
+    assert 'drjit.eval' in names
+    assert 'drjit.backward_from' in names
+
+    kernels = [e for e in events if e.get('cat') == 'kernel'
+               and e['name'].startswith('kernel ')]
+    assert len(kernels) >= 1
+    assert all('execution_time' in e['args'] for e in kernels)
+
+    # Begin and end events must be balanced
+    assert sum(e['ph'] == 'B' for e in events) == \
+           sum(e['ph'] == 'E' for e in events)
+
+
+@pytest.test_arrays('float32,shape=(*),jit,-diff')
+def test04_profile_trace_history(t, tmp_path):
+    import json
+    fname = str(tmp_path / 'trace.json')
+
+    with dr.scoped_set_flag(dr.JitFlag.KernelHistory):
+        dr.eval(dr.arange(t, 16) + 1)
+
+        r = dr.profile_range('open')
+        with dr.profile_trace(fname):
+            r.__enter__()
+            dr.eval(dr.arange(t, 16) + 2)
+        r.__exit__(None, None, None)
+
+        # The kernel history of the user is preserved by the trace
+        history = dr.kernel_history((dr.KernelType.JIT,))
+        assert len(history) == 2
+
+    with open(fname) as f:
+        events = json.load(f)['traceEvents']
+
+    # The region that was still open is closed when the trace ends
+    assert 'open' in [e.get('name') for e in events]
+    assert sum(e['ph'] == 'B' for e in events) == \
+           sum(e['ph'] == 'E' for e in events)
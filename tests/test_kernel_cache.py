@@ -0,0 +1,85 @@
+import drjit as dr
+import pytest
+import os
+import time
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = dr.KernelCache()
+    c.path = str(tmp_path / 'cache')
+    os.makedirs(c.path)
+
+    # Populate the cache with fake entries with increasing access times
+    for i in range(4):
+        fname = os.path.join(c.path, '%032x.llvm.bin' % i)
+        with open(fname, 'wb') as f:
+            f.write(b'x' * 100)
+        t = time.time() - 100 + i
+        os.utime(fname, (t, t))
+
+    # Unrelated files must be left untouched
+    with open(os.path.join(c.path, 'optix7cache.db'), 'wb') as f:
+        f.write(b'y' * 1000)
+
+    return c
+
+
+def test01_list_evict(cache):
+    entries = cache.entries()
+    assert [e['hash'] for e in entries] == ['%032x' % i for i in range(4)]
+    assert entries[0]['backend'] == dr.JitBackend.LLVM
+    assert cache.size() == 400
+
+    assert cache.evict('%032x' % 2) == 1
+    assert cache.evict(['%032x' % 2, '%032x' % 3]) == 1
+    assert [e['hash'] for e in cache.entries()] == ['%032x' % i for i in range(2)]
+    assert os.path.exists(os.path.join(cache.path, 'optix7cache.db'))
+
+
+def test02_lru_budget(cache):
+    assert cache.trim(250) == 2
+    assert [e['hash'] for e in cache.entries()] == ['%032x' % i for i in (2, 3)]
+
+    cache.budget = 100
+    assert [e['hash'] for e in cache.entries()] == ['%032x' % 3]
+
+    with pytest.raises(ValueError):
+        cache.budget = -1
+
+
+def test03_bundle(cache, tmp_path):
+    bundle = str(tmp_path / 'kernels.tar.gz')
+    assert cache.export_bundle(bundle, hashes=['%032x' % 1, '%032x' % 3]) == 2
+
+    other = dr.KernelCache()
+    other.path = str(tmp_path / 'other')
+    assert other.import_bundle(bundle) == 2
+    assert sorted(e['hash'] for e in other.entries()) == ['%032x' % 1, '%032x' % 3]
+
+    # Existing entries are skipped unless 'overwrite' is specified
+    assert other.import_bundle(bundle) == 0
+    assert other.import_bundle(bundle, overwrite=True) == 2
+
+
+def test04_manifest(cache, tmp_path, monkeypatch):
+    import io
+    monkeypatch.setattr(dr.kernel_cache, '_path', cache.path)
+
+    history = [
+        { 'type': dr.KernelType.JIT, 'backend': dr.JitBackend.LLVM,
+          'hash': '%032x' % i, 'ir': io.StringIO('kernel %i' % i) }
+        for i in (0, 1, 1, 7)
+    ]
+    history.append({ 'type': dr.KernelType.Other,
+                     'backend': dr.JitBackend.LLVM })
+
+    manifest = str(tmp_path / 'manifest.tar.gz')
+    assert dr.dump_manifest(manifest, history) == 2
+
+    # Kernels with a cached binary are reinstalled
+    dr.kernel_cache.clear()
+    assert dr.kernel_cache.entries() == []
+    assert dr.kernel_cache.import_bundle(manifest) == 2
+    assert sorted(e['hash'] for e in dr.kernel_cache.entries()) == \
+        ['%032x' % i for i in (0, 1)]
@@ -243,4 +243,81 @@ def test18_init_upcast(t):
     assert dr.all(Matrix43f(2) == t(2), axis=None)
     assert dr.all(Matrix41f(2) == t(2), axis=None)
     with pytest.raises(TypeError):
-        t(Matrix41f(2))
\ No newline at end of file
+        t(Matrix41f(2))
+
+@pytest.test_arrays('-float16, matrix,shape=(3, 3, *)', '-float16, matrix,shape=(3, 3)')
+def test19_solve_lu(t):
+    v = dr.value_t(t)
+    # Requires pivoting (zero in the top left entry)
+    a = t([[0, 2, 1], [1, 1, 0], [3, 0, 1]])
+    x = v(1, -2, 3)
+    b = a @ x
+    assert dr.allclose(dr.solve(a, b), x)
+    assert dr.allclose(dr.solve(a, a @ a), a)
+    assert dr.allclose(dr.inverse(a, pivoting=True), dr.rcp(a))
+    assert dr.allclose(dr.inverse(a), dr.rcp(a))
+
+    p, l, u = dr.lu(a)
+    assert dr.allclose(p @ a, l @ u)
+    assert dr.allclose(dr.diag(l), 1)
+    assert l[0, 1] == 0 and l[0, 2] == 0 and l[1, 2] == 0
+    assert u[1, 0] == 0 and u[2, 0] == 0 and u[2, 1] == 0
+
+    with pytest.raises(TypeError):
+        dr.solve(a, dr.value_t(v)(1))
+
+
+@pytest.test_arrays('-float16, matrix,shape=(4, 4, *)', '-float16, matrix,shape=(4, 4)')
+def test20_cholesky_eigh(t):
+    v = dr.value_t(t)
+    m = t(*range(1, 17))
+    a = m @ m.T + dr.identity(t)
+
+    l = dr.cholesky(a)
+    assert dr.allclose(l @ l.T, a, rtol=1e-4)
+    assert l[0, 1] == 0 and l[0, 3] == 0 and l[2, 3] == 0
+
+    w, q = dr.eigh(a)
+    assert dr.allclose(q @ dr.diag(w) @ q.T, a, rtol=1e-4, atol=1e-3)
+    assert dr.allclose(q.T @ q, dr.identity(t), atol=1e-5)
+    assert dr.all((w[0] <= w[1]) & (w[1] <= w[2]) & (w[2] <= w[3]))
+
+    w, q = dr.eigh(t(v(2, 0, 0, 0), v(0, 1, 0, 0), v(0, 0, 4, 0), v(0, 0, 0, 3)))
+    assert dr.allclose(w, v(1, 2, 3, 4))
+
+
+@pytest.test_arrays('is_jit, float32, matrix, shape=(3, 3, *)')
+def test21_solve_fused(t):
+    mod = sys.modules[t.__module__]
+    rng = mod.PCG32(1000)
+    v = dr.value_t(t)
+    a = t(*[rng.next_float32() for i in range(9)]) + dr.identity(t)
+    b = v(*[rng.next_float32() for i in range(3)])
+    dr.eval(a, b)
+
+    with dr.scoped_set_flag(dr.JitFlag.KernelHistory):
+        x = dr.solve(a, b)
+        w, q = dr.eigh(a @ a.T)
+        dr.eval(x, w, q)
+        assert len(dr.kernel_history((dr.KernelType.JIT,))) == 1
+
+    assert dr.allclose(a @ x, b, atol=1e-5)
+
+
+@pytest.test_arrays('is_diff, float32, matrix, shape=(3, 3, *)')
+def test22_solve_ad(t):
+    v = dr.value_t(t)
+    a = t([[0, 2, 1], [1, 1, 0], [3, 0, 1]])
+    b = v(1, 2, 3)
+    dr.enable_grad(a, b)
+
+    x = dr.solve(a, b)
+    dr.backward_from(x)
+
+    # Adjoint system: grad_b = A^-T 1, grad_A = -grad_b x^T
+    gb = dr.rcp(a).T @ v(1)
+    x = dr.detach(x)
+    assert dr.allclose(dr.grad(b), dr.detach(gb))
+    for i in range(3):
+        for j in range(3):
+            assert dr.allclose(dr.grad(a)[i, j], -gb[i] * x[j])
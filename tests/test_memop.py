@@ -814,3 +814,73 @@ def test34_ravel_builtin(t, order):
 
     assert type(x) is type(y)
     assert x == y
+
+@pytest.test_arrays('is_jit, float32, shape=(*)')
+def test35_scatter_add_deterministic(t):
+    np = pytest.importorskip("numpy")
+    mod = sys.modules[t.__module__]
+    UInt32 = dr.uint32_array_t(t)
+
+    size, target_size = 10000, 37
+    rng = mod.PCG32(size)
+    value = rng.next_float32() * 1000 - 500
+    index = UInt32(rng.next_float32() * target_size)
+    active = rng.next_float32() < .9
+
+    # Reproduce the segmented scan with recursive doubling in float32
+    a = active.numpy()
+    key = np.where(a, index.numpy(), target_size)
+    order = np.argsort(key, kind='stable')
+    key, v = key[order], value.numpy()[order]
+    count = np.bincount(key, minlength=target_size + 1)[:target_size]
+    step = 1
+    while step < count.max():
+        same = np.zeros(size, dtype=bool)
+        same[step:] = key[step:] == key[:-step]
+        v[step:] = np.where(same[step:], v[:-step] + v[step:], v[step:])
+        step *= 2
+    end = np.cumsum(count)
+    ref = np.where(count > 0, v[np.maximum(end, 1) - 1], 0).astype(np.float32)
+
+    # Sequential accumulation only differs due to rounding
+    ref_seq = np.zeros(target_size, dtype=np.float32)
+    np.add.at(ref_seq, index.numpy()[a], value.numpy()[a])
+
+    for i in range(2):
+        target = dr.zeros(t, target_size)
+        dr.scatter_add(target, value, index, active, deterministic=True)
+        assert np.all(target.numpy() == ref)
+        assert np.allclose(target.numpy(), ref_seq, rtol=1e-4, atol=1e-2)
+
+    # Scalar arguments broadcast as usual
+    target = t(1, 2, 3)
+    dr.scatter_reduce(dr.ReduceOp.Add, target, 1, UInt32(2, 0, 2),
+                      deterministic=True)
+    assert dr.all(target == t(2, 2, 5))
+
+    # Out-of-range indices are ignored (their low bits must not be used
+    # to sort them into the segment of a valid index)
+    target = dr.zeros(t, 4)
+    dr.scatter_add(target, t(1, 2, 4, 8, 16), UInt32(1, 9, 1, 100, 3),
+                   deterministic=True)
+    assert dr.all(target == t(0, 5, 0, 16))
+
+    # Tensor reductions
+    tt = dr.tensor_t(t)
+    x = tt(value, shape=(100, 100))
+    assert dr.all(dr.sum(x, axis=0, deterministic=True) ==
+                  dr.sum(x, axis=0, mode='evaluated'))
+    with pytest.raises(RuntimeError, match='deterministic'):
+        dr.sum(x, axis=0, mode='symbolic', deterministic=True)
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test36_scatter_add_deterministic_ad(t):
+    UInt32 = dr.uint32_array_t(t)
+    value = t(1, 2, 3, 4)
+    dr.enable_grad(value)
+    target = dr.zeros(t, 2)
+    dr.scatter_add(target, value, UInt32(1, 0, 1, 1), deterministic=True)
+    assert dr.all(target == t(2, 8))
+    dr.backward_from(target * t(10, 100))
+    assert dr.all(dr.grad(value) == t(100, 10, 100, 100))
@@ -460,3 +460,121 @@ def test13_test_prefix_reduction(t, reverse, exclusive):
     test_red((9, 5, 7), 1)
     test_red((9, 5, 7), 2)
     test_red((9, 5, 7), -1)
+
+@pytest.test_arrays('float32, tensor, jit, -diff')
+def test14_tensor_reduce_autotune(t, tmp_path, monkeypatch):
+    import drjit._reduce as rd
+    import json
+
+    path = str(tmp_path / 'reduce_autotune.json')
+    monkeypatch.setattr(rd, '_autotune_cache_path', lambda: path)
+    monkeypatch.setattr(rd, '_autotune_cache', None)
+    monkeypatch.setattr(rd, '_autotune_reps', 1)
+
+    x = dr.reshape(t, dr.arange(dr.array_t(t), 3*5*7), (3, 5, 7))
+    ref = dr.sum(x, axis=(0, 2), mode='evaluated')
+
+    # The first call benchmarks the candidates and stores the winner
+    y = dr.sum(x, axis=(0, 2), mode='autotune')
+    assert dr.all(y == ref, axis=None)
+
+    with open(path) as f:
+        cache = json.load(f)
+    assert len(cache) == 1
+    assert list(cache.values())[0] in ('evaluated', 'symbolic', 'block')
+
+    # Later calls (including ones from a fresh process) reuse the choice
+    monkeypatch.setattr(rd, '_autotune_cache', None)
+    calls = []
+    impl = rd._reduce_impl
+    def reduce_impl(*args):
+        calls.append(args[0])
+        return impl(*args)
+    monkeypatch.setattr(rd, '_reduce_impl', reduce_impl)
+
+    y = dr.mean(x, axis=(0, 2), mode='autotune')
+    assert dr.allclose(y, ref / 21)
+    assert calls == list(cache.values())
+
+@pytest.mark.parametrize('op', [dr.ReduceOp.Add, dr.ReduceOp.Max])
+@pytest.test_arrays('float32, tensor, jit, -diff')
+def test15_tensor_reduce_tree(t, op, monkeypatch):
+    import drjit._reduce as rd
+    np = pytest.importorskip("numpy")
+
+    # Force a small partition so that the test exercises uneven chunks
+    monkeypatch.setattr(rd, '_tree_min_chunk', 3)
+
+    # Record the strategies chosen by tensor_reduce()
+    used = []
+    reduce_impl = rd._reduce_impl
+
+    def spy(strategy, *args):
+        used.append(strategy)
+        return reduce_impl(strategy, *args)
+
+    monkeypatch.setattr(rd, '_reduce_impl', spy)
+
+    x = dr.reshape(t, dr.arange(dr.array_t(t), 61*7*3), (61, 7, 3))
+    xnp = x.numpy()
+    func = dr.sum if op is dr.ReduceOp.Add else dr.max
+    for axis in [(0,), (0, 1), (1,)]:
+        if op is dr.ReduceOp.Add:
+            ref = xnp.sum(axis=axis)
+        else:
+            ref = xnp.max(axis=axis)
+
+        used.clear()
+        y = func(x, axis=axis)
+        assert used[0] == 'tree'
+        assert np.allclose(y.numpy(), ref)
+
+        # An explicitly requested mode is respected
+        used.clear()
+        y = func(x, axis=axis, mode='evaluated')
+        assert used[0] == 'evaluated'
+        assert np.allclose(y.numpy(), ref)
+
+@pytest.test_arrays('float32, shape=(*), jit')
+def test16_segment_reduce(t):
+    UInt32 = dr.uint32_array_t(t)
+    x = t(1, 5, 2, 3, 4, 8, 7)
+    offsets = UInt32(0, 3, 3, 4, 7)
+
+    assert dr.all(dr.segment_sum(x, offsets) == t(8, 0, 3, 19))
+    assert dr.all(dr.segment_reduce(dr.ReduceOp.Max, x, offsets) == t(5, -dr.inf, 3, 8))
+    assert dr.all(dr.segment_reduce(dr.ReduceOp.Min, x, [1, 3, 7]) == t(2, 3))
+
+    # Long segments are reduced in a logarithmic number of passes
+    y = dr.arange(t, 1000)
+    assert dr.all(dr.segment_sum(y, UInt32(0, 1, 1000)) == t(0, 499500))
+    assert dr.all(dr.segment_reduce(dr.ReduceOp.Max, y, UInt32(0, 999, 1000)) == t(998, 999))
+
+    keys = UInt32(4, 4, 1, 1, 1, 4, 2)
+    k, v = dr.reduce_by_key(dr.ReduceOp.Add, keys, x)
+    assert dr.all(k == UInt32(4, 1, 4, 2))
+    assert dr.all(v == t(6, 9, 8, 7))
+
+@pytest.mark.parametrize('op', [dr.ReduceOp.Add, dr.ReduceOp.Max])
+@pytest.test_arrays('float32, shape=(*), is_diff')
+def test17_segment_reduce_ad(t, op):
+    UInt32 = dr.uint32_array_t(t)
+    x = t(1, 5, 2, 3, 4, 8, 7)
+    offsets = UInt32(1, 3, 3, 6)
+    dr.enable_grad(x)
+
+    y = dr.segment_reduce(op, x, offsets)
+    dr.backward_from(y * t(1, 10, 100))
+
+    if op is dr.ReduceOp.Add:
+        assert dr.all(dr.grad(x) == t(0, 1, 1, 100, 100, 100, 0))
+    else:
+        assert dr.all(dr.grad(x) == t(0, 1, 0, 0, 0, 100, 0))
+
+    dr.set_grad(x, t(1, 2, 3, 4, 5, 6, 7))
+    y = dr.segment_reduce(op, x, offsets)
+    dr.forward_to(y)
+    if op is dr.ReduceOp.Add:
+        assert dr.all(dr.grad(y) == t(5, 0, 15))
+    else:
+        assert dr.all(dr.grad(y) == t(2, 0, 6))
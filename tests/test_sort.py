@@ -0,0 +1,161 @@
+import drjit as dr
+import pytest
+import sys
+
+
+@pytest.test_arrays('is_jit, -bool, shape=(*)')
+def test01_sort_1d(t):
+    np = pytest.importorskip("numpy")
+    mod = sys.modules[t.__module__]
+    rng = mod.PCG32(1000)
+
+    if dr.is_float_v(t):
+        value = t(rng.next_float32() * 200 - 100)
+    elif dr.is_signed_v(t):
+        value = t(dr.int32_array_t(t)(rng.next_uint32()) >> 20)
+    else:
+        value = t(rng.next_uint32() >> 20)
+
+    value_np = value.numpy()
+    ref = np.argsort(value_np, kind='stable')
+
+    assert np.all(dr.sort(value).numpy() == value_np[ref])
+    assert np.all(dr.argsort(value).numpy() == ref)
+    assert np.all(dr.sort(value, descending=True).numpy() ==
+                  value_np[ref][::-1])
+
+
+@pytest.test_arrays('is_jit, float32, shape=(*)')
+def test02_sort_special(t):
+    # Signed zero, infinities, and a larger input that requires many chunks
+    x = t(3, -0.0, dr.inf, -2, 0.0, -dr.inf, 1)
+    assert dr.all(dr.sort(x) == t(-dr.inf, -2, -0.0, 0.0, 1, 3, dr.inf))
+    assert dr.all(dr.argsort(x) == dr.uint32_array_t(t)(5, 3, 1, 4, 6, 0, 2))
+
+    n = 100000
+    x = dr.arange(t, n)
+    x = dr.gather(t, x, (dr.arange(dr.uint32_array_t(t), n) * 7919) % n)
+    assert dr.all(dr.sort(x) == dr.arange(t, n))
+
+
+@pytest.test_arrays('is_jit, float32, shape=(*)')
+def test03_sort_stable(t):
+    UInt32 = dr.uint32_array_t(t)
+    keys = t(2, 1, 2, 1, 0, 2)
+    values = UInt32(0, 1, 2, 3, 4, 5)
+    k, v = dr.sort_by_key(keys, values)
+    assert dr.all(k == t(0, 1, 1, 2, 2, 2))
+    assert dr.all(v == UInt32(4, 1, 3, 0, 2, 5))
+
+    k, v = dr.sort_by_key(keys, values, descending=True)
+    assert dr.all(k == t(2, 2, 2, 1, 1, 0))
+    assert dr.all(v == UInt32(0, 2, 5, 1, 3, 4))
+
+
+@pytest.mark.parametrize('axis', [0, 1, 2, -1])
+@pytest.test_arrays('is_jit, float32, shape=(*)')
+def test04_sort_tensor(t, axis):
+    np = pytest.importorskip("numpy")
+    mod = sys.modules[t.__module__]
+    tt = dr.tensor_t(t)
+    rng = mod.PCG32(2*3*50)
+    x = tt(rng.next_float32(), shape=(2, 3, 50))
+    x_np = x.numpy()
+
+    assert np.all(dr.sort(x, axis=axis).numpy() == np.sort(x_np, axis=axis))
+    assert np.all(dr.argsort(x, axis=axis).numpy() ==
+                  np.argsort(x_np, axis=axis, kind='stable'))
+
+
+@pytest.test_arrays('is_diff, float32, shape=(*)')
+def test05_sort_ad(t):
+    x = t(3, 1, 2)
+    dr.enable_grad(x)
+    y = dr.sort(x)
+    dr.backward_from(y * t(1, 10, 100))
+    assert dr.all(dr.grad(x) == t(100, 1, 10))
+
+
+@pytest.test_arrays('is_jit, uint32, shape=(*)')
+def test06_unique_rle(t):
+    x = t(5, 5, 1, 1, 1, 5)
+    v, c = dr.run_length_encode(x)
+    assert dr.all(v == t(5, 1, 5)) and dr.all(c == t(2, 3, 1))
+
+    v, c = dr.unique(x, return_counts=True)
+    assert dr.all(v == t(1, 5)) and dr.all(c == t(3, 3))
+    assert dr.all(dr.unique(t(3, 2, 3)) == t(2, 3))
+
+
+@pytest.mark.parametrize('size', [10, 100000])
+@pytest.test_arrays('is_jit, float32, shape=(*)')
+def test07_histogram(t, size):
+    np = pytest.importorskip("numpy")
+    mod = sys.modules[t.__module__]
+
+    # Integer-valued inputs never lie close to a bin edge, where float32 and
+    # float64 (used by NumPy) arithmetic could disagree
+    x = dr.floor(mod.PCG32(size).next_float32() * 12) - 1
+
+    hist, edges = dr.histogram(x, 7, range=(0, 10))
+    hist_np, edges_np = np.histogram(x.numpy(), 7, range=(0, 10))
+    assert np.all(hist.numpy() == hist_np)
+    assert np.allclose(edges.numpy(), edges_np)
+
+    i = dr.uint32_array_t(t)(dr.maximum(x, 0))
+    w = x * 2
+    assert np.all(dr.bincount(i).numpy() == np.bincount(i.numpy()))
+    assert np.all(dr.bincount(i, minlength=20).numpy() ==
+                  np.bincount(i.numpy(), minlength=20))
+    assert np.allclose(dr.bincount(i, weights=w).numpy(),
+                       np.bincount(i.numpy(), weights=w.numpy()), rtol=1e-4)
+
+    # Invalid inputs raise an error instead of producing bogus results
+    with pytest.raises(RuntimeError, match='negative'):
+        dr.bincount(dr.int32_array_t(t)(x))
+    with pytest.raises(RuntimeError, match='range'):
+        dr.histogram(x, 7, range=(10, 0))
+    with pytest.raises(RuntimeError, match='range'):
+        dr.histogram(x, 7, range=(1, 1))
+
+
+@pytest.test_arrays('is_jit, float32, shape=(*)')
+def test08_binary_search(t):
+    UInt32 = dr.uint32_array_t(t)
+    data = t(0, 1, 1, 3, 7, 8)
+    x = t(-1, 0, 0.5, 1, 5, 8, 9)
+
+    idx = dr.binary_search(0, len(data), lambda i: dr.gather(t, data, i) < x)
+    assert dr.all(idx == UInt32(0, 0, 1, 1, 4, 5, 6))
+
+    # Per-lane ranges
+    idx = dr.binary_search(UInt32(0, 3), UInt32(3, 6),
+                           lambda i: dr.gather(t, data, i) < t(1, 7.5))
+    assert dr.all(idx == UInt32(1, 5))
+
+    # Array bounds of width 1, the loop state must match the predicate
+    for mode in ('symbolic', 'evaluated'):
+        idx = dr.binary_search(UInt32(0), UInt32(len(data)),
+                               lambda i: dr.gather(t, data, i) < x, mode=mode)
+        assert dr.all(idx == UInt32(0, 0, 1, 1, 4, 5, 6))
+
+
+@pytest.mark.parametrize('side', ['left', 'right'])
+@pytest.test_arrays('is_jit, float32, shape=(*)')
+def test09_searchsorted(t, side):
+    np = pytest.importorskip("numpy")
+    tt = dr.tensor_t(t)
+    seq = t(0, 1, 1, 3, 7, 8)
+    v = t(-1, 0, 0.5, 1, 5, 8, 9)
+    ref = np.searchsorted(seq.numpy(), v.numpy(), side=side)
+    assert np.all(dr.searchsorted(seq, v, side=side).numpy() == ref)
+
+    # Batched search along the last axis
+    seq = tt([[0, 1, 2, 3], [0, 0, 5, 6]])
+    v = tt([[1, 2.5, 9], [0, 5, 4]])
+    r = dr.searchsorted(seq, v, side=side)
+    assert r.shape == (2, 3)
+    ref = np.stack([np.searchsorted(seq.numpy()[i], v.numpy()[i], side=side)
+                    for i in range(2)])
+    assert np.all(r.numpy() == ref)
+
@@ -565,3 +565,53 @@ def test18_tensor_index_signed_vec(t):
     x = t([1, 2, 3], shape=(1, 3))
     A = dr.int32_array_t(dr.array_t(x))
     assert dr.all(x[:, A([-1, 0])] == t([3, 1]))
+
+
+@pytest.mark.parametrize('shapes', [
+    ((5, 3), (3, 7)),
+    ((2, 1, 5, 20), (3, 20, 2)),
+    ((6,), (2, 6, 3)),
+    ((4, 9), (9,)),
+])
+@pytest.test_arrays('is_tensor, jit, float32')
+def test19_tensor_matmul(t, shapes):
+    np = pytest.importorskip("numpy")
+    mod = sys.modules[t.__module__]
+    sa, sb = shapes
+    a = t(mod.PCG32(int(np.prod(sa))).next_float32(), shape=sa)
+    b = t(mod.PCG32(int(np.prod(sb)), 1).next_float32(), shape=sb)
+
+    ref = np.matmul(a.numpy(), b.numpy())
+    c = a @ b
+    assert c.shape == ref.shape
+    assert np.allclose(c.numpy(), ref, rtol=1e-5)
+    assert np.allclose(dr.matmul(a, b).numpy(), ref, rtol=1e-5)
+
+    with pytest.raises(RuntimeError, match='incompatible'):
+        dr.matmul(b, t([1, 2, 3, 4, 5, 6, 7, 8], shape=(8,)))
+
+
+@pytest.test_arrays('is_tensor, is_diff, float32')
+def test20_tensor_matmul_ad(t):
+    np = pytest.importorskip("numpy")
+    mod = sys.modules[t.__module__]
+    a = t(mod.PCG32(2*4*3).next_float32(), shape=(2, 4, 3))
+    b = t(mod.PCG32(3*5, 1).next_float32(), shape=(3, 5))
+    dr.enable_grad(a, b)
+
+    c = a @ b
+    w = dr.arange(dr.array_t(t), 2*4*5)
+    dr.backward_from(c * t(w, shape=c.shape))
+
+    g = dr.detach(t(w, shape=c.shape)).numpy()
+    a_np, b_np = dr.detach(a).numpy(), dr.detach(b).numpy()
+    assert np.allclose(dr.grad(a).numpy(), g @ b_np.T, rtol=1e-5)
+    assert np.allclose(dr.grad(b).numpy(), np.sum(a_np.transpose(0, 2, 1) @ g, axis=0), rtol=1e-5)
+
+    # Forward mode
+    a, b = dr.detach(a), dr.detach(b)
+    dr.enable_grad(a, b)
+    dr.set_grad(a, 1)
+    c = a @ b
+    dr.forward_to(c)
+    assert np.allclose(dr.grad(c).numpy(), np.ones((2, 4, 3)) @ b_np, rtol=1e-5)
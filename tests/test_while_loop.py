@@ -692,3 +692,113 @@ def test29_preserve_differentiability_suspend(t, mode):
     assert not dr.grad_enabled(x)
     assert dr.grad_enabled(y)
     assert y.index_ad == y_id
+
+
+@pytest.mark.parametrize("compress", [True, 0.5, 0.0, 1.0])
+@pytest.test_arrays('uint32,is_jit,shape=(*)')
+def test30_compress_adaptive(t, compress):
+    # Adaptive loop state compression on the Collatz sequence
+    state = dr.arange(t, 10000) + 1
+    it_count = dr.zeros(t, 10000)
+
+    def body(state, it_count):
+        state = dr.select(state & 1 == 0, state // 2, 3*state + 1)
+        return state, it_count + 1
+
+    state, it_count = dr.while_loop(
+        state=(state, it_count),
+        cond=lambda state, it_count: state != 1,
+        body=body,
+        mode='evaluated',
+        compress=compress
+    )
+
+    assert dr.sum(it_count) == 849666
+
+    # Per-iteration active counts are available for profiling
+    counts = dr.detail.loop_active_counts()
+    n_iter = dr.max(it_count)[0]
+    assert len(counts) == n_iter
+    assert counts[0] == 9999 and counts[-1] == 1
+    assert sum(counts) == 849666
+
+    # Entry 'i' specifies the number of elements that run iteration 'i'
+    hist = dr.zeros(t, n_iter + 1)
+    dr.scatter_add(hist, t(1), it_count)
+    expected = 10000 - dr.cumsum(hist)
+    assert counts == [expected[i] for i in range(n_iter)]
+
+    with pytest.raises(RuntimeError, match='interval'):
+        dr.while_loop(state=(state,), cond=lambda s: s != 1,
+                      body=lambda s: (s,), mode='evaluated', compress=2.0)
+
+
+@pytest.mark.parametrize("compress", [False, True, 0.5])
+@pytest.test_arrays('uint32,is_jit,shape=(*)')
+def test31_block_iterations(t, compress):
+    # Run blocks of several iterations of an evaluated loop per kernel launch
+    state = dr.arange(t, 10000) + 1
+    it_count = dr.zeros(t, 10000)
+
+    def body(state, it_count):
+        state = dr.select(state & 1 == 0, state // 2, 3*state + 1)
+        return state, it_count + 1
+
+    with dr.scoped_set_flag(dr.JitFlag.KernelHistory):
+        state, it_count = dr.while_loop(
+            state=(state, it_count),
+            cond=lambda state, it_count: state != 1,
+            body=body,
+            mode='evaluated',
+            compress=compress,
+            block_iterations=16
+        )
+        dr.eval(state, it_count)
+        launches = len(dr.kernel_history((dr.KernelType.JIT,)))
+
+    assert dr.sum(it_count) == 849666
+    assert dr.all(state == 1)
+
+    # 261 iterations are needed, which requires far fewer launches
+    assert launches < 100
+
+    # Active elements are counted once per block
+    if compress is not False:
+        counts = dr.detail.loop_active_counts()
+        assert len(counts) == (dr.max(it_count)[0] + 15) // 16
+        assert counts[0] == 9999
+
+    with pytest.raises(RuntimeError, match='block_iterations'):
+        dr.while_loop(state=(state,), cond=lambda s: s != 1,
+                      body=lambda s: (s,), mode='evaluated', block_iterations=0)
+
+
+@pytest.test_arrays('float32,is_diff,shape=(*)')
+def test32_block_iterations_ad(t):
+    # Blocks of iterations fall back to one iteration per launch when the
+    # body reads a captured differentiable parameter
+    UInt32 = dr.uint32_array_t(t)
+    param = t(2)
+    dr.enable_grad(param)
+    x = dr.arange(t, 4)
+
+    def run():
+        return dr.while_loop(
+            state=(dr.zeros(UInt32, 4), dr.zeros(t, 4)),
+            cond=lambda i, acc: i < 10,
+            body=lambda i, acc: (i + 1, acc + param * x),
+            mode='evaluated',
+            block_iterations=4
+        )[1]
+
+    acc = run()
+    assert dr.grad_enabled(acc)
+    assert dr.allclose(acc, 20 * x)
+    dr.backward_from(acc)
+    assert dr.allclose(param.grad, 60)
+
+    # Blocks remain usable when gradients are suspended
+    with dr.suspend_grad():
+        acc = run()
+    assert not dr.grad_enabled(acc)
+    assert dr.allclose(acc, 20 * x)
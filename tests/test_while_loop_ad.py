@@ -240,3 +240,37 @@ def test09_sum_loop_extra(t, mode):
 
         dr.backward(loss)
 
+
+
+@pytest.mark.parametrize('bwd', [True, False])
+@pytest.test_arrays('float32,is_diff,shape=(*)')
+def test10_reverse_body(t, bwd):
+    # Differentiate a loop by walking it backwards via 'reverse_body'
+    Int = dr.int32_array_t(t)
+
+    def run(**kwargs):
+        x, y = t(1, 2, 3), t(1.5, 1.25, 2)
+        dr.enable_grad(x, y)
+        if not bwd:
+            dr.set_grad(x, t(1, 2, 3))
+            dr.set_grad(y, t(0.5, 1, 2))
+
+        _, z, _ = dr.while_loop(
+            state=(Int(0), x, y),
+            cond=lambda i, x, y: i < Int(2, 5, 0),
+            body=lambda i, x, y: (i + 1, dr.fma(x, y, dr.sin(y)), y),
+            mode='evaluated',
+            **kwargs
+        )
+
+        if bwd:
+            dr.backward_from(z * t(1, 2, 3))
+            return z, x.grad, y.grad
+        else:
+            return z, dr.forward_to(z)
+
+    ref = run()
+    res = run(reverse_body=lambda i, x, y: (i - 1, (x - dr.sin(y)) / y, y))
+
+    for a, b in zip(ref, res):
+        assert dr.allclose(a, b)